@@ -11,6 +11,7 @@ from sqlalchemy.engine import URL
 
 from alembic import context
 
+from epic_events_crm.database import get_backend, make_db_url
 from epic_events_crm.models import Base
 
 WANTED_MODULES = (
@@ -19,6 +20,9 @@ WANTED_MODULES = (
     "epic_events_crm.models.clients",
     "epic_events_crm.models.contracts",
     "epic_events_crm.models.events",
+    "epic_events_crm.models.archives",
+    "epic_events_crm.models.sessions",
+    "epic_events_crm.models.audit",
 )
 
 for module in WANTED_MODULES:
@@ -95,6 +99,23 @@ def run_migrations_online() -> None:
     #     poolclass=pool.NullPool,
     # )
 
+    # SQLite backend: the URL of the database, set by init sqlite-db or from config.ini
+    sqlite_url = config.get_main_option("sqlalchemy.url")
+    if not sqlite_url and get_backend() == "sqlite":
+        sqlite_url = make_db_url()
+    if sqlite_url:
+        connectable = create_engine(sqlite_url, poolclass=pool.NullPool)
+        with connectable.connect() as connection:
+            # SQLite cannot alter columns: tables are copied and recreated instead
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                render_as_batch=True,
+            )
+            with context.begin_transaction():
+                context.run_migrations()
+        return
+
     # Load infos from the .env file
     db_user = os.getenv("MIGRATIONS_USER")
     db_host = os.getenv("DB_HOST")
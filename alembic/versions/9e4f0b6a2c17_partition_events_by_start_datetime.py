@@ -0,0 +1,83 @@
+"""Partition events table by range of start_datetime
+
+Revision ID: 9e4f0b6a2c17
+Revises: 7a1d2e9c4b53
+Create Date: 2026-10-19 11:02:37.540931
+
+MySQL requires every unique key of a partitioned table to include the partitioning
+column and doesn't support foreign keys on partitioned tables. So the primary key
+becomes (id, start_datetime), the unique key on contract_id becomes a plain index
+and the foreign keys are dropped, their indexes being kept.
+The model keeps the unique constraint, for the other backends. On MySQL, one event
+per contract is then only checked by EventController.create, which reads the
+contract's event before inserting: two concurrent creations for the same contract
+can both pass the check. Run
+    SELECT contract_id FROM events GROUP BY contract_id HAVING COUNT(*) > 1
+to find duplicates. Autogenerated migrations will propose to add the unique key
+back on MySQL: remove it from them.
+New partitions are then added with the `init roll-partitions` command.
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from epic_events_crm.partitioning import (
+    build_partitions,
+    get_partitioning_config,
+    next_period,
+    partitions_clause,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4f0b6a2c17'
+down_revision: Union[str, None] = '7a1d2e9c4b53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "mysql":
+        return
+    inspector = sa.inspect(bind)
+
+    for foreign_key in inspector.get_foreign_keys("events"):
+        op.drop_constraint(foreign_key["name"], "events", type_="foreignkey")
+    for unique in inspector.get_unique_constraints("events"):
+        if unique["column_names"] == ["contract_id"]:
+            op.drop_constraint(unique["name"], "events", type_="unique")
+    op.create_index("ix_events_contract_id", "events", ["contract_id"], unique=False)
+    op.execute(
+        "ALTER TABLE events DROP PRIMARY KEY, ADD PRIMARY KEY (id, start_datetime)"
+    )
+
+    # Partitions from the oldest event up to some periods ahead, then pmax
+    granularity, periods_ahead = get_partitioning_config()
+    today = datetime.date.today()
+    oldest = bind.execute(sa.text("SELECT MIN(start_datetime) FROM events")).scalar()
+    first = oldest.date() if oldest is not None else today
+    last = next_period(today, granularity, periods_ahead)
+    partitions = build_partitions(first, last, granularity)
+    op.execute(
+        "ALTER TABLE events PARTITION BY RANGE (TO_DAYS(start_datetime)) (\n"
+        f"{partitions_clause(partitions)}\n)"
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "mysql":
+        return
+    op.execute("ALTER TABLE events REMOVE PARTITIONING")
+    op.execute("ALTER TABLE events DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+    op.create_unique_constraint("contract_id", "events", ["contract_id"])
+    op.create_foreign_key(
+        "events_ibfk_1", "events", "contracts", ["contract_id"], ["id"]
+    )
+    op.create_foreign_key(
+        "events_ibfk_2", "events", "employees", ["support_person_id"], ["id"]
+    )
+    op.drop_index("ix_events_contract_id", table_name="events")
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark of the per-call Python overhead of hot repository lookups, built
+inline on each call (before) or once at import with bound parameters (after).
+
+Without option, only what SQLAlchemy does in Python before reaching the database is
+measured: building the statement and computing its cache key, used to find its
+compiled SQL. With --db, whole repository calls run against the test database.
+
+Run from the project root: python -m benchmarks.lookups [--db] [--number N]
+"""
+
+import timeit
+
+import click
+from sqlalchemy import select
+
+from epic_events_crm.models.clients import Client
+from epic_events_crm.models.contracts import Contract
+from epic_events_crm.models.departments_permissions import Department
+from epic_events_crm.models.employees import Employee
+from epic_events_crm.models.events import Event
+from epic_events_crm.repositories import clients, contracts, departments_permissions
+from epic_events_crm.repositories import employees
+
+# (name, statement as built inline, prebuilt statement, parameters of the latter)
+LOOKUPS = [
+    (
+        "ClientRepo.get_by_email",
+        lambda: select(Client).filter_by(email="jdoe@mail.com"),
+        clients.SELECT_BY_EMAIL,
+        {"email": "jdoe@mail.com"},
+    ),
+    (
+        "EmployeeRepo.get_by_email",
+        lambda: select(Employee).filter_by(email="flionel@manager.com"),
+        employees.SELECT_BY_EMAIL,
+        {"email": "flionel@manager.com"},
+    ),
+    (
+        "DepartmentRepo.get_by_name",
+        lambda: select(Department).filter_by(name="Sales"),
+        departments_permissions.SELECT_DEPARTMENT_BY_NAME,
+        {"name": "Sales"},
+    ),
+    (
+        "ContractRepo.get_by_salesperson_and_wo_event",
+        lambda: select(Contract)
+        .join(Client)
+        .outerjoin(Event, Contract.id == Event.contract_id)
+        .filter(Client.salesperson_id == 4, Event.contract_id == None),  # noqa: E711
+        contracts.SELECT_BY_SALESPERSON_WITHOUT_EVENT,
+        {"salesperson_id": 4},
+    ),
+]
+
+
+def per_call(function, number: int) -> float:
+    """Return the best time of one call, in microseconds, over 5 runs."""
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+@click.command()
+@click.option("--db", is_flag=True, help="Run the lookups on the test database.")
+@click.option("--number", "-n", type=int, default=2000, help="Calls per run.")
+def main(db, number):
+    """Print the per-call time of each lookup, inline vs prebuilt statement."""
+    if db:
+        from epic_events_crm.database import get_test_session
+
+        session = get_test_session()
+        number = max(number // 10, 1)
+    click.echo(f"{'lookup':48} {'inline':>10} {'prebuilt':>10}  (µs per call)")
+    for name, build, statement, parameters in LOOKUPS:
+        if db:
+            before = per_call(lambda: session.execute(build()).all(), number)
+            after = per_call(
+                lambda: session.execute(statement, parameters).all(), number
+            )
+        else:
+            before = per_call(lambda: build()._generate_cache_key(), number)
+            after = per_call(lambda: statement._generate_cache_key(), number)
+        click.echo(f"{name:48} {before:10.1f} {after:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+"""
+Benchmark suite: seeds a database at a given scale, then times repository methods,
+controllers create/update methods and end-to-end eecrm commands (each one in its
+own process, as users run them). Results are written as JSON and compared with a
+stored baseline, so that performance regressions show up in numbers.
+
+The database is EMPTIED before seeding (departments and permissions are kept). It is
+the test database by default, which the tests also empty after each run.
+
+Run from the project root, for instance:
+    python -m benchmarks.suite --scale 1k --scale 100k --output results.json
+    python -m benchmarks.suite --scale 1k --save-baseline
+"""
+
+import datetime
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import click
+import sqlalchemy
+from sqlalchemy import create_engine, delete, select
+
+from epic_events_crm.database import make_test_db_url
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# Rows of the events table for each scale, other tables are sized after it
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+PASSWORD = "Passw0rd"
+# Timings under this many milliseconds are too noisy to flag a regression
+NOISE_FLOOR_MS = 1.0
+
+
+def scale_counts(events: int) -> Dict[str, int]:
+    """Return how many rows to seed in each table for a number of events."""
+    return {
+        "employees": max(events // 500, 20),
+        "clients": max(events // 5, 10),
+        "contracts": events + events // 4,
+        "events": events,
+    }
+
+
+def clear_database(connection) -> None:
+    """Delete all rows but departments and permissions, children first."""
+    from epic_events_crm.models.archives import ContractArchive, EventArchive
+    from epic_events_crm.models.audit import AuditRecord
+    from epic_events_crm.models.clients import Client
+    from epic_events_crm.models.contracts import Contract
+    from epic_events_crm.models.employees import Employee
+    from epic_events_crm.models.events import Event
+    from epic_events_crm.models.sessions import RefreshToken
+
+    for model in (
+        EventArchive,
+        ContractArchive,
+        Event,
+        Contract,
+        Client,
+        RefreshToken,
+        AuditRecord,
+        Employee,
+    ):
+        connection.execute(delete(model))
+    connection.commit()
+
+
+def measure(function: Callable, repeat: int, after: Optional[Callable] = None) -> dict:
+    """Call function repeat times, return its min and median times in ms."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - started) * 1000)
+        if after is not None:
+            after()
+    return {
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "repeat": repeat,
+    }
+
+
+def get_sample(session) -> dict:
+    """Return ids and values of seeded rows that the benchmarks work on."""
+    from epic_events_crm.models.clients import Client
+    from epic_events_crm.models.contracts import Contract
+    from epic_events_crm.models.events import Event
+
+    client = session.scalars(select(Client).order_by(Client.id).limit(1)).one()
+    salesperson = client.salesperson
+    contract = session.scalars(
+        select(Contract).filter_by(client_id=client.id).limit(1)
+    ).first()
+    event = session.scalars(
+        select(Event).filter(Event.support_person_id.is_not(None)).limit(1)
+    ).one()
+    return {
+        "salesperson_id": salesperson.id,
+        "salesperson_email": salesperson.email,
+        "support_id": event.support_person_id,
+        "client_id": client.id,
+        "client_email": client.email,
+        "client_phone": client.phone,
+        "contract_id": contract.id if contract else None,
+        "event_id": event.id,
+        "event_start": event.start_datetime,
+    }
+
+
+def repository_benchmarks(session, sample: dict) -> List[Tuple[str, Callable]]:
+    """Return (name, function) of each repository method to time."""
+    from epic_events_crm.repositories.archives import ArchiveRepo
+    from epic_events_crm.repositories.clients import ClientRepo
+    from epic_events_crm.repositories.contracts import ContractRepo
+    from epic_events_crm.repositories.employees import EmployeeRepo
+    from epic_events_crm.repositories.events import EventRepo
+
+    clients, contracts = ClientRepo(session), ContractRepo(session)
+    employees, events = EmployeeRepo(session), EventRepo(session)
+    archives = ArchiveRepo(session)
+    start = sample["event_start"]
+    return [
+        ("ClientRepo.get_all", clients.get_all),
+        ("ClientRepo.get_by_id", lambda: clients.get_by_id(sample["client_id"])),
+        (
+            "ClientRepo.get_by_email",
+            lambda: clients.get_by_email(sample["client_email"]),
+        ),
+        (
+            "ClientRepo.get_by_phone",
+            lambda: clients.get_by_phone(sample["client_phone"]),
+        ),
+        (
+            "ClientRepo.get_clients_assigned_to",
+            lambda: clients.get_clients_assigned_to(sample["salesperson_id"]),
+        ),
+        ("ContractRepo.get_all", contracts.get_all),
+        ("ContractRepo.get_unsigned", contracts.get_unsigned),
+        ("ContractRepo.get_unpaid", contracts.get_unpaid),
+        ("ContractRepo.get_unsigned_or_unpaid", contracts.get_unsigned_or_unpaid),
+        (
+            "ContractRepo.get_by_salesperson",
+            lambda: contracts.get_by_salesperson(sample["salesperson_id"]),
+        ),
+        ("ContractRepo.get_without_event", contracts.get_without_event),
+        (
+            "ContractRepo.get_by_salesperson_and_wo_event",
+            lambda: contracts.get_by_salesperson_and_wo_event(
+                sample["salesperson_id"]
+            ),
+        ),
+        ("EmployeeRepo.get_all", employees.get_all),
+        (
+            "EmployeeRepo.get_by_email",
+            lambda: employees.get_by_email(sample["salesperson_email"]),
+        ),
+        (
+            "EmployeeRepo.get_by_department_name",
+            lambda: employees.get_by_department_name("Support"),
+        ),
+        ("EventRepo.get_all", events.get_all),
+        ("EventRepo.get_by_id", lambda: events.get_by_id(sample["event_id"])),
+        (
+            "EventRepo.get_events_assigned_to",
+            lambda: events.get_events_assigned_to(sample["support_id"]),
+        ),
+        (
+            "EventRepo.get_events_assigned_to(None)",
+            lambda: events.get_events_assigned_to(None),
+        ),
+        (
+            "EventRepo.get_starting_between",
+            lambda: events.get_starting_between(
+                start, start + datetime.timedelta(days=30)
+            ),
+        ),
+        ("EventRepo.search_by_name", lambda: events.search_by_name("Gala")),
+        (
+            "EventRepo.get_unassigned_windows",
+            lambda: events.get_unassigned_windows(start),
+        ),
+        (
+            "EventRepo.get_assigned_windows",
+            lambda: events.get_assigned_windows(start),
+        ),
+        (
+            "ArchiveRepo.get_archivable_contract_ids",
+            lambda: archives.get_archivable_contract_ids(start, 500),
+        ),
+    ]
+
+
+def controller_benchmarks(session, sample: dict) -> List[Tuple[str, Callable]]:
+    """
+    Return (name, function) of each controller create/update method to time. The
+    current user is the salesperson of the sample client, allowed to do all of them.
+    """
+    from epic_events_crm.controllers.main import MainController
+
+    controller = MainController(session)
+    numbers = itertools.count(1)
+
+    def create_event():
+        contract_id = controller.contracts.create(sample["client_id"], 1000.0)
+        controller.events.create(
+            f"Benchmark {next(numbers)}",
+            "2030-01-01 10:00",
+            "2030-01-01 18:00",
+            "1 rue du Test",
+            "Paris",
+            "France",
+            "75001",
+            50,
+            contract_id,
+        )
+
+    return [
+        (
+            "EmployeeController.create",
+            lambda: controller.employees.create(
+                "Bench", "Mark", f"bench{next(numbers)}@bench.test", "hash", 4
+            ),
+        ),
+        (
+            "EmployeeController.update",
+            lambda: controller.employees.update(
+                sample["support_id"], fname=f"Bench{next(numbers)}"
+            ),
+        ),
+        (
+            "ClientController.create",
+            lambda: controller.clients.create(
+                "Bench",
+                "Mark",
+                f"client{next(numbers)}@bench.test",
+                sample["salesperson_id"],
+            ),
+        ),
+        (
+            "ClientController.update",
+            lambda: controller.clients.update(
+                sample["client_id"], company_name=f"Bench {next(numbers)}"
+            ),
+        ),
+        (
+            "ContractController.create",
+            lambda: controller.contracts.create(sample["client_id"], 1000.0),
+        ),
+        (
+            "ContractController.update",
+            lambda: controller.contracts.update(sample["contract_id"], paid_amount=0),
+        ),
+        ("ContractController.create + EventController.create", create_event),
+        (
+            "EventController.update",
+            lambda: controller.events.update(
+                sample["event_id"], attendees_number=next(numbers)
+            ),
+        ),
+    ]
+
+
+def command_benchmarks(sample: dict) -> List[Tuple[str, List[str]]]:
+    """Return (name, arguments) of each eecrm command to time."""
+    start = sample["event_start"]
+    until = start + datetime.timedelta(days=30)
+    return [
+        ("eecrm list-emp", ["list-emp"]),
+        ("eecrm list-clients", ["list-clients"]),
+        ("eecrm list-clients --mine", ["list-clients", "--mine"]),
+        ("eecrm list-contracts", ["list-contracts"]),
+        ("eecrm list-contracts --unpaid", ["list-contracts", "--unpaid"]),
+        ("eecrm list-contracts --mine --noevent", ["list-contracts", "-m", "-ne"]),
+        ("eecrm list-events", ["list-events"]),
+        ("eecrm list-events --nosupport", ["list-events", "--nosupport"]),
+        (
+            "eecrm list-events --since --until",
+            ["list-events", "-si", f"{start:%Y-%m-%d}", "-un", f"{until:%Y-%m-%d}"],
+        ),
+        ("eecrm search-events", ["search-events", "Gala"]),
+        (
+            "eecrm update-client",
+            ["update-client", "-id", str(sample["client_id"]), "-c", "Bench Co"],
+        ),
+    ]
+
+
+def run_eecrm(arguments: List[str]) -> None:
+    """Run an eecrm command in its own process, failing if it displays an error."""
+    result = subprocess.run(
+        [sys.executable, str(ROOT / "eecrm.py"), *arguments],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0 or "Error" in result.stdout:
+        raise RuntimeError(f"eecrm {' '.join(arguments)} failed: {result.stdout}")
+
+
+def run_scale(url: str, scale: str, repeat: int, seed: int) -> dict:
+    """Empty and seed the database at the given scale, then run all benchmarks."""
+    from sqlalchemy.orm import Session
+
+    from epic_events_crm.seeding import seed_database
+
+    engine = create_engine(url)
+    counts = scale_counts(SCALES[scale])
+    results = {"counts": counts, "seeding": {}, "benchmarks": {}}
+    click.echo(f"Seeding {scale}: {counts}")
+    with engine.connect() as connection:
+        clear_database(connection)
+        for table_name, count, seconds in seed_database(connection, counts, seed):
+            results["seeding"][table_name] = {"rows": count, "seconds": seconds}
+
+    session = Session(engine)
+    sample = get_sample(session)
+    # Log in as the sample salesperson: controllers and commands need a current user
+    from epic_events_crm.authentication import log_in
+
+    if not log_in(sample["salesperson_email"], PASSWORD):
+        raise RuntimeError("Could not log in as a seeded salesperson.")
+
+    benchmarks = results["benchmarks"]
+    for name, function in repository_benchmarks(session, sample):
+        benchmarks[name] = measure(function, repeat, after=session.rollback)
+        click.echo(f"{name:60} {benchmarks[name]['median_ms']:12.2f} ms")
+    for name, function in controller_benchmarks(session, sample):
+        benchmarks[name] = measure(function, repeat, after=session.rollback)
+        click.echo(f"{name:60} {benchmarks[name]['median_ms']:12.2f} ms")
+    session.close()
+
+    # Listings are cached on disk: clear the cache so that each run does the work,
+    # then time a run reusing the cached output
+    list_cache = Path(os.environ["HOME"]) / ".cache" / "eecrm"
+    for name, arguments in command_benchmarks(sample):
+        benchmarks[name] = measure(
+            lambda: run_eecrm(arguments),
+            repeat,
+            after=lambda: shutil.rmtree(list_cache, ignore_errors=True),
+        )
+        click.echo(f"{name:60} {benchmarks[name]['median_ms']:12.2f} ms")
+    run_eecrm(["list-contracts"])
+    name = "eecrm list-contracts (cached)"
+    benchmarks[name] = measure(lambda: run_eecrm(["list-contracts"]), repeat)
+    click.echo(f"{name:60} {benchmarks[name]['median_ms']:12.2f} ms")
+    engine.dispose()
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Return a line for each benchmark whose median is more than threshold times the
+    one of the baseline, at the same scale.
+    """
+    regressions = []
+    for scale, scale_results in results["scales"].items():
+        reference = baseline.get("scales", {}).get(scale, {}).get("benchmarks", {})
+        for name, timing in scale_results["benchmarks"].items():
+            if name not in reference:
+                continue
+            before, after = reference[name]["median_ms"], timing["median_ms"]
+            if after < NOISE_FLOOR_MS or after <= before * threshold:
+                continue
+            regressions.append(
+                f"[{scale}] {name}: {before:.2f} ms -> {after:.2f} ms "
+                f"(x{after / max(before, 0.001):.2f})"
+            )
+    return regressions
+
+
+@click.command()
+@click.option(
+    "--scale",
+    "-s",
+    "scales",
+    type=click.Choice(list(SCALES)),
+    multiple=True,
+    default=["1k"],
+    help="Scale(s) to run, by number of events.",
+)
+@click.option("--url", help="Database URL, the test database by default.")
+@click.option("--repeat", "-r", type=int, default=5, help="Runs of each benchmark.")
+@click.option("--seed", type=int, default=0, help="Random seed of the data.")
+@click.option("--output", "-o", type=click.Path(), help="Write results to this file.")
+@click.option(
+    "--baseline",
+    "-b",
+    type=click.Path(),
+    default=str(DEFAULT_BASELINE),
+    help="Baseline to compare with.",
+)
+@click.option("--save-baseline", is_flag=True, help="Store results as the baseline.")
+@click.option("--threshold", "-t", type=float, default=1.25, help="Slowdown ratio.")
+@click.option("--yes", "-y", is_flag=True, help="Do not ask before emptying the db.")
+def main(scales, url, repeat, seed, output, baseline, save_baseline, threshold, yes):
+    """Run the benchmarks, exit with status 1 if a regression is found."""
+    url = url or make_test_db_url().render_as_string(hide_password=False)
+    safe_url = sqlalchemy.engine.make_url(url).render_as_string(hide_password=True)
+    if not yes:
+        click.confirm(f"All data of {safe_url} will be deleted. Continue?", abort=True)
+    # Everything, subprocesses included, uses that database and a throwaway home
+    # directory, so that the token and listings cache of the user are left alone
+    home = tempfile.mkdtemp(prefix="eecrm-bench-")
+    os.environ["EECRM_DB_URL"] = url
+    os.environ["HOME"] = home
+
+    results = {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "database": sqlalchemy.engine.make_url(url).get_backend_name(),
+        "scales": {},
+    }
+    try:
+        for scale in scales:
+            results["scales"][scale] = run_scale(url, scale, repeat, seed)
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+    if output:
+        Path(output).write_text(json.dumps(results, indent=2))
+    if save_baseline:
+        Path(baseline).write_text(json.dumps(results, indent=2))
+        click.echo(f"Baseline saved to {baseline}.")
+        return
+    if not Path(baseline).exists():
+        click.echo("No baseline to compare with, use --save-baseline to create one.")
+        return
+    regressions = compare(results, json.loads(Path(baseline).read_text()), threshold)
+    if regressions:
+        click.echo("Regressions:\n" + "\n".join(regressions))
+        sys.exit(1)
+    click.echo("No regression.")
+
+
+if __name__ == "__main__":
+    main()
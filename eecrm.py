@@ -1,14 +1,39 @@
+import contextlib
+import datetime
 import importlib
+import itertools
 import click
-import sentry_sdk
-import os
-
-from epic_events_crm.authentication import log_in, requires_auth, get_current_user
+import shlex
+import time
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from epic_events_crm import audit
+from epic_events_crm.authentication import (
+    log_in,
+    log_out,
+    revoke_sessions,
+    requires_auth,
+    get_current_user,
+    REFRESH_HOURS,
+)
 from epic_events_crm.permissions import requires_permissions
 from epic_events_crm.controllers.main import MainController
+from epic_events_crm.database import deferred_commits, is_deferred
+from epic_events_crm.list_cache import ListCache
+from epic_events_crm.metrics import metrics, parse_window
+from epic_events_crm.profiling import QueryProfiler, raise_on_lazy_loads
+from epic_events_crm.slowlog import slow_query_log, summarize
+from epic_events_crm.startup import COLD_START_BUDGET, measure
+from epic_events_crm.tracing import ENABLED as TRACING, command_transaction
+from epic_events_crm.tracing import init_sentry
+from epic_events_crm.views.base import BaseView
+from epic_events_crm.views.console import PLAIN_THRESHOLD, interactive
 from epic_events_crm.views.main import MainView
+from epic_events_crm.views.plain import display_plain
 
-sentry_sdk.init(dsn=os.environ.get("SENTRY_DSN"))
+init_sentry()
 
 NEEDED_MODULES = (
     "epic_events_crm.models.departments_permissions",
@@ -16,6 +41,9 @@ NEEDED_MODULES = (
     "epic_events_crm.models.contracts",
     "epic_events_crm.models.events",
     "epic_events_crm.models.employees",
+    "epic_events_crm.models.archives",
+    "epic_events_crm.models.sessions",
+    "epic_events_crm.models.audit",
 )
 for module in NEEDED_MODULES:
     try:
@@ -27,11 +55,98 @@ for module in NEEDED_MODULES:
 
 controller = MainController()
 view = MainView()
+list_cache = ListCache(controller.session)
+
+
+def drain_audit_log(recorded_before: int) -> None:
+    """
+    Forward the audit records of a command once it is done and its output shown.
+    Nothing to do if it recorded none, or in batch mode before the batch commits.
+    """
+    if audit.recorded_count == recorded_before or is_deferred(controller.session):
+        return
+    try:
+        with Session(controller.session.get_bind()) as session:
+            audit.drain(session)
+    except Exception as e:
+        # the records stay pending: sent after the next command or by audit-drain
+        view.base.display_as(f"Audit log not forwarded yet: {e}", "warning")
+
+
+def display_lazily(listing, list_view, display, title: str) -> None:
+    """
+    Display a listing in an interactive terminal. Up to PLAIN_THRESHOLD rows, the
+    whole listing is the first page, displayed as usual. Longer ones go through the
+    pager, their next pages fetched as the user scrolls (see controllers/listings.py).
+    """
+    pages = controller.listings.get_pages(listing, PLAIN_THRESHOLD + 1)
+    with contextlib.closing(pages):
+        first = next(pages, [])
+        if len(first) <= PLAIN_THRESHOLD:
+            display(first)
+            return
+        rows = (
+            row
+            for page in itertools.chain([first], pages)
+            for row in list_view.plain_rows(page)
+        )
+        display_plain(title, list_view.PLAIN_COLUMNS, rows)
+
+
+def startup_report(ctx, param, value):
+    """Display the cold start report of eecrm and exit, without any command."""
+    if not value or ctx.resilient_parsing:
+        return
+    try:
+        report = measure()
+    except Exception as e:
+        view.base.display_as(f"Error: {e}", "error")
+    else:
+        view.profiler.display_startup_report(report, COLD_START_BUDGET)
+    ctx.exit()
 
 
 @click.group()
-def eecrm():
-    pass
+@click.option(
+    "--startup-report",
+    is_flag=True,
+    expose_value=False,
+    is_eager=True,
+    callback=startup_report,
+    help="Break down the startup time of eecrm, then exit.",
+)
+@click.option("--profile", is_flag=True, help="Report the queries of the command.")
+@click.option("--raise-lazy", is_flag=True, help="Fail on unplanned lazy loads.")
+@click.pass_context
+def eecrm(ctx, profile, raise_lazy):
+    """
+    With --profile, the queries count and time, the slowest ones and the repeated
+    ones (often lazy loads in a loop, N+1) are reported after the command.
+    --raise-lazy (test mode) makes relationships raise when lazy loaded.
+    """
+    if ctx.invoked_subcommand and audit.DRAIN_AFTER_COMMANDS:
+        # registered first to run last, after the metrics and reports
+        recorded_before = audit.recorded_count
+        ctx.call_on_close(lambda: drain_audit_log(recorded_before))
+    if TRACING and ctx.invoked_subcommand:
+        ctx.with_resource(command_transaction(f"eecrm {ctx.invoked_subcommand}"))
+    if ctx.invoked_subcommand:
+        issues_count = BaseView.issues_count
+        metrics.start(ctx.invoked_subcommand)
+        ctx.call_on_close(lambda: metrics.stop(BaseView.issues_count != issues_count))
+    if raise_lazy:
+        raise_on_lazy_loads()
+    if profile or raise_lazy:
+        list_cache.enabled = False  # the command must really run
+    if profile:
+        profiler = QueryProfiler()
+        profiler.attach()
+
+        def report():
+            profiler.detach()
+            view.profiler.display_report(profiler)
+
+        ctx.call_on_close(report)
 
 
 @eecrm.command(name="login", short_help="Log in an employee.")
@@ -39,11 +154,23 @@ def eecrm():
 @click.option("--password", "-p", prompt=True, hide_input=True)
 def login(email, password):
     if log_in(email, password):
-        view.base.display_as("Logged in for 15 minutes.", "info")
+        view.base.display_as(
+            f"Logged in. The session ends after {REFRESH_HOURS} hours of inactivity.",
+            "info",
+        )
     else:
         view.base.display_as("Invalid credentials.", "error")
 
 
+@eecrm.command(name="logout", short_help="Log out the current employee.")
+def logout():
+    try:
+        log_out()
+        view.base.display_as("Logged out.", "info")
+    except Exception as e:
+        view.base.display_as(f"Error: {e}", "error")
+
+
 # ############### EMPLOYEES ###############
 @eecrm.command(name="add-emp", short_help="Add employee. Options are prompts friendly.")
 @click.option("--fname", "-fn", help="First name.", prompt="First name")
@@ -99,9 +226,10 @@ def update_employee(empid, email, fname, lname, did):
 @eecrm.command(name="delete-emp", short_help="Delete an employee.")
 @click.option("--empid", "-id", type=int, help="Employee id.")
 @click.option("--email", "-e", help="Employee email.")
+@click.option("--yes", "-y", is_flag=True, help="Do not ask for confirmation.")
 @requires_auth
 @requires_permissions(["delete_employee"])
-def delete_employee(empid, email):
+def delete_employee(empid, email, yes):
     """Delete an employee. Employee is identified by id or email."""
     # Get employee by id or email
     if empid is not None:
@@ -117,7 +245,7 @@ def delete_employee(empid, email):
         return
     # Confirm deletion of the right employee before proceeding
     else:
-        if click.confirm(f"Please confirm deletion of {employee}", abort=True):
+        if yes or click.confirm(f"Please confirm deletion of {employee}", abort=True):
             try:
                 controller.employees.delete(employee)
                 view.base.display_as("Employee successfully deleted.", "info")
@@ -125,11 +253,59 @@ def delete_employee(empid, email):
                 view.base.display_as(f"Error: {e}", "error")
 
 
+@eecrm.command(name="revoke-sessions", short_help="Log out an employee everywhere.")
+@click.argument("empid", type=int)
+@requires_auth
+@requires_permissions(["update_employee"])
+def revoke_employee_sessions(empid):
+    """
+    Revoke the refresh tokens of an employee: their sessions end once their current
+    access token expires.
+    """
+    try:
+        count = revoke_sessions(empid)
+        view.base.display_as(f"{count} session(s) revoked.", "info")
+    except Exception as e:
+        view.base.display_as(f"Error: {e}", "error")
+
+
+@eecrm.command(name="reassign", short_help="Reassign clients/events of an employee.")
+@click.option("--from", "-f", "from_id", type=int, required=True, help="Current id.")
+@click.option("--to", "-t", "to_id", type=int, required=True, help="New employee id.")
+@click.option("--clients", "-c", is_flag=True, help="Reassign clients.")
+@click.option("--events", "-ev", is_flag=True, help="Reassign events.")
+@requires_auth
+@requires_permissions(["update_employee"])
+def reassign(from_id, to_id, clients, events):
+    """
+    Move all clients and/or events of an employee to another one in one transaction,
+    e.g. before deleting the employee. Without --clients nor --events, what is moved
+    depends on the department of the employee.
+    """
+    try:
+        clients_count, events_count = controller.employees.reassign(
+            from_id, to_id, clients=clients, events=events
+        )
+        view.base.display_as(
+            f"{clients_count} client(s) and {events_count} event(s) reassigned.",
+            "info",
+        )
+    except Exception as e:
+        view.base.display_as(f"Error: {e}", "error")
+
+
 @eecrm.command(name="list-emp", short_help="List employees.")
 @requires_auth
+@list_cache.listing(("employees", "departments"))
 def list_employees():
     """List employees."""
     try:
+        if interactive():
+            listing = controller.listings.employees()
+            display_lazily(
+                listing, view.employee, view.employee.display_employees, "EMPLOYEES"
+            )
+            return
         employees = controller.employees.get_all()
         view.employee.display_employees(employees)
     except Exception as e:
@@ -201,9 +377,10 @@ def update_client(clientid, email, fname, lname, salesid, phone, company):
 @eecrm.command(name="delete-client", short_help="Delete a client.")
 @click.option("--clientid", "-id", type=int, help="Client id.")
 @click.option("--email", "-e", help="Client email.")
+@click.option("--yes", "-y", is_flag=True, help="Do not ask for confirmation.")
 @requires_auth
 @requires_permissions(["delete_client"])
-def delete_client(clientid, email):
+def delete_client(clientid, email, yes):
     """Delete a client. Client is identified by id or email."""
     # Get client by id or email
     if clientid is not None:
@@ -219,7 +396,7 @@ def delete_client(clientid, email):
         return
     # Confirm deletion of the right client before proceeding
     else:
-        if click.confirm(f"Please confirm deletion of {client}", abort=True):
+        if yes or click.confirm(f"Please confirm deletion of {client}", abort=True):
             try:
                 controller.clients.delete(client)
                 view.base.display_as("Client successfully deleted.", "info")
@@ -230,9 +407,16 @@ def delete_client(clientid, email):
 @eecrm.command(name="list-clients", short_help="List clients.")
 @click.option("--mine", "-m", is_flag=True, help="Clients assigned to current user.")
 @requires_auth
+@list_cache.listing(("clients", "employees"))
 def list_clients(mine):
     """List clients. With --mine, list clients assigned to current user."""
-    if mine:
+    if interactive():
+        try:
+            listing = controller.listings.clients(mine)
+            display_lazily(listing, view.client, view.client.display_clients, "CLIENTS")
+        except Exception as e:
+            view.base.display_as(f"Error: {e}", "error")
+    elif mine:
         try:
             clients = controller.clients.get_clients_assigned_to_current_user()
             view.client.display_clients(clients)
@@ -283,15 +467,31 @@ def update_contract(contract_id, amount, paid, signed, clientmail):
 @click.option("--unsigned", "-us", is_flag=True, help="List unsigned contracts.")
 @click.option("--mine", "-m", is_flag=True, help="List contracts on clients of user.")
 @click.option("--noevent", "-ne", is_flag=True, help="List contracts without events.")
+@click.option("--include-archived", "-ia", is_flag=True, help="Add archived ones.")
 @requires_auth
-def list_contracts(unpaid, unsigned, mine, noevent):
+@list_cache.listing(
+    ("contracts", "clients", "events"), ("contracts_archive", "events_archive")
+)
+def list_contracts(unpaid, unsigned, mine, noevent, include_archived):
     """
     List contracts. --unpaid, --unsigned and --noevent are mutually exclusive.
     --mine can be used alone or combined with --noevent.
+    With --include-archived, archived contracts (all paid, signed and with an event)
+    are listed too.
     """
-    if mine:
+    if interactive() and not (mine or include_archived):
         try:
-            contracts = controller.contracts.get_salesperson_supervised(noevent)
+            listing = controller.listings.contracts(unpaid, unsigned, noevent)
+            display_lazily(
+                listing, view.contract, view.contract.display_contracts, "CONTRACTS"
+            )
+        except Exception as e:
+            view.base.display_as(f"Error: {e}", "error")
+    elif mine:
+        try:
+            contracts = controller.contracts.get_salesperson_supervised(
+                noevent, include_archived
+            )
             view.contract.display_contracts(contracts)
         except Exception as e:
             view.base.display_as(f"Error: {e}", "error")
@@ -305,7 +505,7 @@ def list_contracts(unpaid, unsigned, mine, noevent):
             view.base.display_as(f"Error: {e}", "error")
     else:
         try:
-            contracts = controller.contracts.get_all()
+            contracts = controller.contracts.get_all(include_archived)
             view.contract.display_contracts(contracts)
         except Exception as e:
             view.base.display_as(f"Error: {e}", "error")
@@ -427,31 +627,309 @@ def update_event(
 @click.option(
     "--mine", "-m", is_flag=True, help="List events assigned to current user."
 )
+@click.option("--include-archived", "-ia", is_flag=True, help="Add archived ones.")
+@click.option(
+    "--since",
+    "-si",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Events starting from this date (YYYY-MM-DD).",
+)
+@click.option(
+    "--until",
+    "-un",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Events starting before this date (YYYY-MM-DD).",
+)
 @requires_auth
-def list_events(nosupport, mine):
+@list_cache.listing(("events", "employees"), ("events_archive",))
+def list_events(nosupport, mine, include_archived, since, until):
     """
     List events. With --nosupport, list events without support person.
     With --mine, list events assigned to current user.
+    With --include-archived, archived events are listed too.
+    With --since and/or --until, list events by start date (other options ignored).
     """
-    if nosupport:
+    if interactive() and not (include_archived and not (since or until)):
+        try:
+            listing = controller.listings.events(nosupport, mine, since, until)
+            display_lazily(listing, view.event, view.event.display_events, "EVENTS")
+        except Exception as e:
+            view.base.display_as(f"Error: {e}", "error")
+    elif since or until:
+        try:
+            events = controller.events.get_starting_between(since, until)
+            view.event.display_events(events)
+        except Exception as e:
+            view.base.display_as(f"Error: {e}", "error")
+    elif nosupport:
         try:
-            events = controller.events.get_events_without_support()
+            events = controller.events.get_events_without_support(include_archived)
             view.event.display_events(events)
         except Exception as e:
             view.base.display_as(f"Error: {e}", "error")
     elif mine:
         try:
-            events = controller.events.get_events_assigned_to_current_user()
+            events = controller.events.get_events_assigned_to_current_user(
+                include_archived
+            )
             view.event.display_events(events)
         except Exception as e:
             view.base.display_as(f"Error: {e}", "error")
     else:
         try:
-            events = controller.events.get_all()
+            events = controller.events.get_all(include_archived)
             view.event.display_events(events)
         except Exception as e:
             view.base.display_as(f"Error: {e}", "error")
 
 
+@eecrm.command(name="search-events", short_help="Search events by name.")
+@click.argument("text")
+@click.option("--include-archived", "-ia", is_flag=True, help="Search archives too.")
+@requires_auth
+def search_events(text, include_archived):
+    """List events whose name contains TEXT, archived ones too with -ia."""
+    try:
+        events = controller.events.search(text, include_archived)
+        view.event.display_events(events)
+    except Exception as e:
+        view.base.display_as(f"Error: {e}", "error")
+
+
+@eecrm.command(name="auto-assign", short_help="Assign support to events without one.")
+@click.option("--dry-run", "-dr", is_flag=True, help="Only preview the assignments.")
+@requires_auth
+@requires_permissions(["update_event"])
+def auto_assign(dry_run):
+    """
+    Assign a support person to every upcoming event without one. Load is balanced
+    between support people, and no one gets overlapping events.
+    """
+    try:
+        planned, unassigned = controller.events.auto_assign(dry_run=dry_run)
+        view.event.display_assignments(planned, unassigned)
+        if dry_run:
+            view.base.display_as("Dry run: nothing was saved.", "warning", issue=False)
+        elif planned:
+            view.base.display_as(f"{len(planned)} event(s) assigned.", "info")
+    except Exception as e:
+        view.base.display_as(f"Error: {e}", "error")
+
+
+# ############### DASHBOARD ###############
+@eecrm.command(name="today", short_help="Show the lists of the day for your role.")
+@requires_auth
+def today():
+    """
+    Display at once the lists your department starts the day with: your clients,
+    your contracts without event and unsigned contracts for sales, your events and
+    events without support for support, events without support and unsigned or
+    unpaid contracts for managers. Their queries run concurrently.
+    """
+    try:
+        user = get_current_user()
+        started = time.perf_counter()
+        sections = controller.dashboard.get_today(user)
+        view.dashboard.display_today(user, sections, time.perf_counter() - started)
+    except Exception as e:
+        view.base.display_as(f"Error: {e}", "error")
+
+
+# ############### METRICS ###############
+@eecrm.command(name="metrics", short_help="Show latency percentiles per command.")
+@click.option("--since", "-s", default="24h", help="Window, e.g. 30m, 24h or 7d.")
+@click.option("--command", "-c", "command_name", help="Only this command.")
+def show_metrics(since, command_name):
+    """
+    Display the local metrics of the commands run in the window: p50/p95/p99
+    latency, queries per run, cache hit ratios and Argon2 verification time.
+    """
+    try:
+        window = parse_window(since)
+        stats = metrics.store.stats(time.time() - window, command_name)
+        view.metrics.display_stats(stats, since)
+    except Exception as e:
+        view.base.display_as(f"Error: {e}", "error")
+
+
+@eecrm.command(name="slowlog", short_help="Summarize the slow query log.")
+@click.option("--since", "-s", default="7d", help="Window, e.g. 30m, 24h or 7d.")
+@click.option("--limit", "-l", type=int, default=10, help="Statements to show.")
+def slowlog(since, limit):
+    """
+    Display the statements of the slow query log by fingerprint, those costing the
+    most time first, with the code that sent them and their last query plan.
+    """
+    try:
+        start = datetime.datetime.now() - datetime.timedelta(
+            seconds=parse_window(since)
+        )
+        statements = summarize(slow_query_log.entries(), start.isoformat())
+        view.profiler.display_slow_statements(statements[:limit], since)
+    except Exception as e:
+        view.base.display_as(f"Error: {e}", "error")
+
+
+# ############### AUDIT ###############
+@eecrm.command(name="audit-drain", short_help="Forward the pending audit records.")
+@click.option(
+    "--sink", "-s", type=click.Choice(list(audit.SINKS)), help="Default in config."
+)
+@click.option("--batch-size", "-bs", type=int, help="Records per transaction.")
+@click.option("--follow", "-f", type=float, help="Drain again every N seconds.")
+def audit_drain(sink, batch_size, follow):
+    """
+    Forward the audit records not sent yet to the sink (config [audit] sink), by
+    batches. They are usually sent after the commands that made them: this is for a
+    cron job or after a failure. With --follow, drain again every N seconds until
+    interrupted.
+    """
+    try:
+        sink_function = audit.get_sink(sink)
+        if sink_function is None:
+            view.base.display_as("No audit sink (is SENTRY_DSN set?).", "warning")
+            return
+        while True:
+            sent = audit.drain(controller.session, sink_function, batch_size)
+            view.base.display_as(f"{sent} audit record(s) forwarded.", "info")
+            if not follow:
+                break
+            time.sleep(follow)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        view.base.display_as(f"Error: {e}", "error")
+
+
+# ############### API ###############
+@eecrm.command(name="serve", short_help="Serve the HTTP/JSON API.")
+@click.option("--host", "-h", help="Interface to listen on (config [api] host).")
+@click.option("--port", "-p", type=int, help="Port to listen on (config [api] port).")
+def serve(host, port):
+    """
+    Serve the controllers as a JSON API until interrupted, for the intranet
+    dashboard. Clients get a token from POST /login, then send it as a Bearer
+    token; each route needs the permissions of the matching command.
+    """
+    try:
+        from epic_events_crm import api
+
+        api.serve(host, port)
+    except Exception as e:
+        view.base.display_as(f"Error: {e}", "error")
+
+
+# ############### ARCHIVES ###############
+@eecrm.command(name="archive", short_help="Archive closed contracts and their events.")
+@click.option(
+    "--before",
+    "-b",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    required=True,
+    help="Events ended before this date (YYYY-MM-DD).",
+)
+@click.option("--chunk-size", "-cs", type=int, default=500, help="Per transaction.")
+@requires_auth
+@requires_permissions(["delete_contract", "delete_event"])
+def archive(before, chunk_size):
+    """
+    Move signed and fully paid contracts whose event ended before the given date,
+    and their events, to the archive tables. Done by chunks of contracts, each one
+    in its own transaction.
+    """
+    try:
+        archived = controller.archives.archive(before, chunk_size)
+        view.base.display_as(f"{archived} contract(s) archived.", "info")
+    except Exception as e:
+        view.base.display_as(f"Error: {e}", "error")
+
+
+# ############### BATCH ###############
+def batch_refusal(args: List[str]) -> Optional[str]:
+    """
+    Return why a batch line cannot run, None if it can: a nested batch, or a command
+    that would ask for input (missing prompted options, confirmation without --yes).
+    The command is resolved as eecrm would, after the group options.
+    """
+    ctx = click.Context(eecrm, info_name="eecrm", resilient_parsing=True)
+    # the group's own options only: the subcommand name and its arguments remain
+    remaining = click.Command.parse_args(eecrm, ctx, list(args))
+    if not remaining:
+        return None
+    name, command, command_args = eecrm.resolve_command(ctx, remaining)
+    if command is None:
+        return None  # unknown command, reported by eecrm when run
+    if name == "batch":
+        return "no nested batch."
+    # resilient parsing: missing values are left to None instead of prompted for
+    command_ctx = command.make_context(
+        name, command_args, parent=ctx, resilient_parsing=True
+    )
+    for param in command.params:
+        if getattr(param, "prompt", None) and command_ctx.params[param.name] is None:
+            return f"{name} would prompt for {param.opts[0]}, pass it on the line."
+    if command_ctx.params.get("yes") is False:
+        return f"{name} would ask for confirmation, add --yes."
+    return None
+
+
+@eecrm.command(name="batch", short_help="Run a file of commands in one transaction.")
+@click.argument("commands_file", type=click.File("r"), default="-")
+@click.option("--group-size", "-g", type=int, default=100, help="Commands per commit.")
+def batch(commands_file, group_size):
+    """
+    Run the eecrm commands listed in a file (or stdin), one per line, in a single
+    process and database session. Commits are grouped every --group-size commands.
+    Empty lines and lines starting with # are ignored. If a command fails, the
+    commands of the current group are rolled back and the batch stops.
+    Commands cannot ask for input: prompted options must be given on the line, and
+    deletions need --yes.
+    """
+    session = controller.session
+    committed, pending = 0, 0
+    # Read first: a prompt reading stdin must not take the next lines as answers
+    lines = commands_file.readlines()
+    with deferred_commits(session) as commit:
+        for line_number, line in enumerate(lines, start=1):
+            args = shlex.split(line, comments=True)
+            if args and args[0] == "eecrm":
+                args = args[1:]
+            if not args:
+                continue
+
+            issues_before = BaseView.issues_count
+            try:
+                refusal = batch_refusal(args)
+                if refusal is not None:
+                    view.base.display_as(f"Line {line_number}: {refusal}", "error")
+                else:
+                    eecrm.main(args, prog_name="eecrm", standalone_mode=False)
+            except click.ClickException as e:
+                msg = e.format_message()
+                view.base.display_as(f"Line {line_number}: {msg}", "error")
+            except click.Abort:
+                view.base.display_as(f"Line {line_number}: aborted.", "error")
+            except Exception as e:
+                view.base.display_as(f"Line {line_number}: aborted. {e}", "error")
+            if BaseView.issues_count != issues_before:
+                session.rollback()
+                view.base.display_as(
+                    f"Line {line_number} failed: {pending} previous command(s) of "
+                    f"the current group rolled back.",
+                    "error",
+                )
+                break
+
+            pending += 1
+            if pending >= group_size:
+                commit()
+                committed += pending
+                pending = 0
+        else:
+            commit()
+            committed += pending
+    view.base.display_as(f"{committed} command(s) committed.", "info")
+
+
 if __name__ == "__main__":
     eecrm()
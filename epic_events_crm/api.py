@@ -0,0 +1,629 @@
+"""
+Optional HTTP/JSON API for the intranet dashboard, instead of running eecrm commands
+and parsing their tables: `eecrm serve`. Only the standard library is used (asyncio
+streams, HTTP/1.1 with keep-alive) on top of the async controllers, so that one
+event loop serves every client through one pooled engine.
+Requests authenticate with a JWT of make_jwt_token (Authorization: Bearer, see POST
+/login) and need the permissions of the matching eecrm command.
+Lists are paginated and projected (?limit=&offset= or &after=<id>, &fields=), with
+equality filters on some columns. Every GET has an ETag: sent back in If-None-Match,
+it gets a bodyless 304 if nothing changed. The ETag of a list is made from
+MAX(last_updated) and COUNT(*) of its table, as for the listings cache, so that a
+304 only costs that query. As for the listings cache too, a list whose table changed
+during the current second gets no ETag but Cache-Control: no-store.
+The audit records of the requests are forwarded every drain_interval seconds (audit
+section of config.ini), by a task of the same loop.
+"""
+
+import asyncio
+import configparser
+import datetime
+import hashlib
+import inspect
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from sqlalchemy import exc
+
+from epic_events_crm.audit import DRAIN_INTERVAL, async_drain, get_sink
+from epic_events_crm.authentication import (
+    ACCESS_MINUTES,
+    decode_jwt_token,
+    get_jwt_secret,
+    make_jwt_token,
+)
+from epic_events_crm.controllers.clients import AsyncClientController
+from epic_events_crm.controllers.contracts import AsyncContractController
+from epic_events_crm.controllers.employees import AsyncEmployeeController
+from epic_events_crm.controllers.events import AsyncEventController
+from epic_events_crm.database import make_async_engine, make_db_url
+from epic_events_crm.list_cache import changed_this_second
+from epic_events_crm.models.clients import Client
+from epic_events_crm.models.contracts import Contract
+from epic_events_crm.models.employees import Employee
+from epic_events_crm.models.events import Event
+from epic_events_crm.permissions import has_permissions, permissions_names
+from epic_events_crm.repositories.clients import AsyncClientRepo
+from epic_events_crm.repositories.contracts import AsyncContractRepo
+from epic_events_crm.repositories.employees import AsyncEmployeeRepo
+from epic_events_crm.repositories.events import AsyncEventRepo
+from epic_events_crm.repositories.pages import AsyncPageRepo
+from epic_events_crm.views.base import BaseView
+
+# get infos from the config file, regardless of the current working directory
+dir_path = os.path.dirname(os.path.realpath(__file__))
+config = configparser.ConfigParser()
+config.read(os.path.join(dir_path, "config.ini"))
+HOST = config.get("api", "host", fallback="127.0.0.1")
+PORT = config.getint("api", "port", fallback=8750)
+PAGE_SIZE = config.getint("api", "page_size", fallback=50)
+MAX_PAGE_SIZE = config.getint("api", "max_page_size", fallback=500)
+KEEP_ALIVE_SECONDS = config.getfloat("api", "keep_alive_seconds", fallback=15)
+MAX_BODY_BYTES = config.getint("api", "max_body_bytes", fallback=1_048_576)
+MAX_HEADERS = config.getint("api", "max_headers", fallback=100)
+MAX_HEADER_BYTES = config.getint("api", "max_header_bytes", fallback=16_384)
+
+logger = logging.getLogger("eecrm.api")
+base_view = BaseView()
+
+
+class HTTPError(Exception):
+    """An error response, its message sent as {"error": message}."""
+
+    def __init__(self, status: int, message: str, headers: Optional[dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes = b""
+    version: str = "HTTP/1.1"
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> dict:
+        """Return the JSON object of the body, {} if there is none."""
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "Invalid JSON body.")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "The JSON body must be an object.")
+        return data
+
+
+@dataclass
+class Response:
+    status: int
+    data: Any = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def json_default(value: Any) -> Any:
+    """Encode the column types json does not know: amounts as strings, not floats."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def make_etag(*parts: Any) -> str:
+    """Return a strong ETag identifying the given values."""
+    encoded = json.dumps(parts, default=json_default, sort_keys=True).encode()
+    return f'"{hashlib.sha256(encoded).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Return True if the client already has the representation of this ETag."""
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+@dataclass(frozen=True)
+class Resource:
+    """A model exposed by the API: its columns, filters and repository."""
+
+    model: type
+    repo: type
+    filters: Tuple[str, ...] = ()
+    hidden: Tuple[str, ...] = ()
+
+    @property
+    def columns(self) -> List[str]:
+        return [
+            c.name for c in self.model.__table__.columns if c.name not in self.hidden
+        ]
+
+    def fields(self, request: Request) -> List[str]:
+        """Return the columns asked with ?fields= (id always first), all by default."""
+        if not request.query.get("fields"):
+            return self.columns
+        fields = [name.strip() for name in request.query["fields"].split(",")]
+        unknown = [name for name in fields if name not in self.columns]
+        if unknown:
+            raise HTTPError(400, f"Unknown fields: {', '.join(unknown)}.")
+        return ["id"] + [name for name in dict.fromkeys(fields) if name != "id"]
+
+    def filter_values(self, request: Request) -> Dict[str, Any]:
+        """Return the filters of the query string, with the type of their column."""
+        filters = {}
+        for name in self.filters:
+            value = request.query.get(name)
+            if value is None:
+                continue
+            python_type = self.model.__table__.c[name].type.python_type
+            if value == "null":
+                filters[name] = None
+            elif python_type is bool:
+                filters[name] = value.lower() in ("1", "true")
+            else:
+                try:
+                    filters[name] = python_type(value)
+                except ValueError:
+                    raise HTTPError(400, f"Invalid value for {name}.")
+        return filters
+
+    def to_dict(self, obj) -> dict:
+        return {name: getattr(obj, name) for name in self.columns}
+
+
+RESOURCES = {
+    "employees": Resource(
+        Employee, AsyncEmployeeRepo, filters=("department_id",), hidden=("password",)
+    ),
+    "clients": Resource(Client, AsyncClientRepo, filters=("salesperson_id",)),
+    "contracts": Resource(Contract, AsyncContractRepo, filters=("client_id", "signed")),
+    "events": Resource(
+        Event, AsyncEventRepo, filters=("contract_id", "support_person_id")
+    ),
+}
+
+
+def int_parameter(request: Request, name: str, default, minimum: int, maximum=None):
+    value = request.query.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer.")
+    if value < minimum or (maximum is not None and value > maximum):
+        raise HTTPError(400, f"{name} must be between {minimum} and {maximum}.")
+    return value
+
+
+async def call(method: Callable, data: dict, **fixed) -> Any:
+    """Call a controller method with the JSON fields, 400 if they do not fit."""
+    try:
+        inspect.signature(method).bind(**fixed, **data)
+    except TypeError as e:
+        raise HTTPError(400, f"Invalid fields: {e}.")
+    return await method(**fixed, **data)
+
+
+async def get_or_404(session, resource: Resource, item_id: int):
+    obj = await resource.repo(session).get_by_id(item_id)
+    if obj is None:
+        raise HTTPError(404, f"{resource.model.__name__} not found.")
+    return obj
+
+
+async def row_response(session, resource: Resource, obj, status: int = 200):
+    """Return a written row, reloaded for the values set by the database."""
+    await session.refresh(obj)
+    return Response(status, resource.to_dict(obj))
+
+
+# ############### HANDLERS ###############
+# Called with the APIServer, the session of the request, the authenticated employee
+# (None for /login), the request and the groups of the route path.
+async def login(server, session, user, request: Request) -> Response:
+    """Exchange an email and password for an access token."""
+    data = request.json()
+    email, password = data.get("email"), data.get("password")
+    if not isinstance(email, str) or not isinstance(password, str):
+        raise HTTPError(400, "Provide email and password.")
+    employee = await AsyncEmployeeRepo(session).get_by_email(email)
+    # Argon2 takes tens of milliseconds of CPU: not on the event loop
+    if employee is None or not await asyncio.to_thread(
+        employee.check_password, password
+    ):
+        raise HTTPError(401, "Invalid email or password.")
+    token = await asyncio.to_thread(make_jwt_token, employee, server.jwt_secret)
+    return Response(
+        200,
+        {
+            "access_token": token,
+            "token_type": "Bearer",
+            "expires_in": ACCESS_MINUTES * 60,
+        },
+    )
+
+
+async def list_rows(server, session, user, request: Request, resource: str) -> Response:
+    resource = RESOURCES[resource]
+    fields = resource.fields(request)
+    filters = resource.filter_values(request)
+    limit = int_parameter(request, "limit", PAGE_SIZE, 1, MAX_PAGE_SIZE)
+    offset = int_parameter(request, "offset", 0, 0)
+    after = int_parameter(request, "after", None, 0)
+
+    pages = AsyncPageRepo(session)
+    versions = await pages.get_versions([resource.model.__tablename__])
+    if changed_this_second(versions):
+        # a later change in the same second would keep the same ETag
+        headers = {"Cache-Control": "no-store"}
+    else:
+        etag = make_etag(request.path, sorted(request.query.items()), versions[:-1])
+        if etag_matches(request, etag):
+            return Response(304, headers={"ETag": etag})
+        headers = {"ETag": etag}
+    rows, total = await pages.get_page(
+        resource.model, fields, filters, limit, offset, after
+    )
+    data = {
+        "items": rows,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        # keyset pagination: the next page is ?after=<next_after>
+        "next_after": rows[-1]["id"] if len(rows) == limit else None,
+    }
+    return Response(200, data, headers)
+
+
+async def get_row(
+    server, session, user, request: Request, resource: str, item_id: str
+) -> Response:
+    resource = RESOURCES[resource]
+    data = resource.to_dict(await get_or_404(session, resource, int(item_id)))
+    etag = make_etag(data)
+    if etag_matches(request, etag):
+        return Response(304, headers={"ETag": etag})
+    return Response(200, data, {"ETag": etag})
+
+
+async def create_employee(server, session, user, request: Request) -> Response:
+    data = request.json()
+    await call(AsyncEmployeeController(session, user).create, data)
+    employee = await AsyncEmployeeRepo(session).get_by_email(data["email"])
+    return await row_response(session, RESOURCES["employees"], employee, 201)
+
+
+async def update_employee(
+    server, session, user, request: Request, item_id: str
+) -> Response:
+    controller = AsyncEmployeeController(session, user)
+    await call(controller.update, request.json(), employee_id=int(item_id))
+    employee = await get_or_404(session, RESOURCES["employees"], int(item_id))
+    return await row_response(session, RESOURCES["employees"], employee)
+
+
+async def delete_employee(
+    server, session, user, request: Request, item_id: str
+) -> Response:
+    employee = await get_or_404(session, RESOURCES["employees"], int(item_id))
+    await AsyncEmployeeController(session, user).delete(employee)
+    return Response(204)
+
+
+async def create_client(server, session, user, request: Request) -> Response:
+    """Create a client, assigned to the salesperson creating it as with eecrm."""
+    data = request.json()
+    controller = AsyncClientController(session, user)
+    await call(controller.create, data, salesperson_id=user.id)
+    client = await controller.repo.get_by_email(data["email"])
+    return await row_response(session, RESOURCES["clients"], client, 201)
+
+
+async def update_client(
+    server, session, user, request: Request, item_id: str
+) -> Response:
+    controller = AsyncClientController(session, user)
+    await call(controller.update, request.json(), client_id=int(item_id))
+    client = await get_or_404(session, RESOURCES["clients"], int(item_id))
+    return await row_response(session, RESOURCES["clients"], client)
+
+
+async def delete_client(
+    server, session, user, request: Request, item_id: str
+) -> Response:
+    client = await get_or_404(session, RESOURCES["clients"], int(item_id))
+    await AsyncClientController(session, user).delete(client)
+    return Response(204)
+
+
+async def create_contract(server, session, user, request: Request) -> Response:
+    controller = AsyncContractController(session, user)
+    contract_id = await call(controller.create, request.json())
+    contract = await get_or_404(session, RESOURCES["contracts"], contract_id)
+    return await row_response(session, RESOURCES["contracts"], contract, 201)
+
+
+async def update_contract(
+    server, session, user, request: Request, item_id: str
+) -> Response:
+    controller = AsyncContractController(session, user)
+    await call(controller.update, request.json(), contract_id=int(item_id))
+    contract = await get_or_404(session, RESOURCES["contracts"], int(item_id))
+    return await row_response(session, RESOURCES["contracts"], contract)
+
+
+async def create_event(server, session, user, request: Request) -> Response:
+    controller = AsyncEventController(session, user)
+    event_id = await call(controller.create, request.json())
+    event = await get_or_404(session, RESOURCES["events"], event_id)
+    return await row_response(session, RESOURCES["events"], event, 201)
+
+
+async def update_event(
+    server, session, user, request: Request, item_id: str
+) -> Response:
+    controller = AsyncEventController(session, user)
+    await call(controller.update, request.json(), event_id=int(item_id))
+    event = await get_or_404(session, RESOURCES["events"], int(item_id))
+    return await row_response(session, RESOURCES["events"], event)
+
+
+RESOURCE = f"(?P<resource>{'|'.join(RESOURCES)})"
+ITEM = r"(?P<item_id>\d+)"
+# method, path, handler, permissions of the eecrm command (None: no authentication)
+ROUTES = [
+    ("POST", "/login", login, None),
+    ("GET", f"/{RESOURCE}", list_rows, []),
+    ("GET", f"/{RESOURCE}/{ITEM}", get_row, []),
+    ("POST", "/employees", create_employee, ["create_employee"]),
+    ("PATCH", f"/employees/{ITEM}", update_employee, ["update_employee"]),
+    ("DELETE", f"/employees/{ITEM}", delete_employee, ["delete_employee"]),
+    ("POST", "/clients", create_client, ["create_client"]),
+    ("PATCH", f"/clients/{ITEM}", update_client, ["update_client"]),
+    ("DELETE", f"/clients/{ITEM}", delete_client, ["delete_client"]),
+    ("POST", "/contracts", create_contract, ["create_contract"]),
+    ("PATCH", f"/contracts/{ITEM}", update_contract, ["update_contract"]),
+    ("POST", "/events", create_event, ["create_event"]),
+    ("PATCH", f"/events/{ITEM}", update_event, ["update_event"]),
+]
+ROUTES = [
+    (method, re.compile(path), handler, permissions)
+    for method, path, handler, permissions in ROUTES
+]
+
+
+# ############### HTTP ###############
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Read the next request of a connection, None once the client is done."""
+    try:
+        line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_SECONDS)
+    except asyncio.TimeoutError:
+        return None
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Invalid request line.")
+    headers = {}
+    header_bytes = 0
+    while True:
+        try:
+            line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_SECONDS)
+        except asyncio.TimeoutError:
+            return None
+        except ValueError:  # a line longer than the limit of the stream
+            raise HTTPError(431, "Request headers too large.")
+        if line in (b"\r\n", b"\n", b""):
+            break
+        header_bytes += len(line)
+        if len(headers) >= MAX_HEADERS or header_bytes > MAX_HEADER_BYTES:
+            raise HTTPError(431, "Request headers too large.")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "transfer-encoding" in headers:
+        raise HTTPError(411, "Send a Content-Length.")
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length.")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Body too large.")
+    body = await reader.readexactly(length) if length else b""
+    url = urlsplit(target)
+    return Request(
+        method=method.upper(),
+        path=url.path.rstrip("/") or "/",
+        query=dict(parse_qsl(url.query)),
+        headers=headers,
+        body=body,
+        version=version,
+    )
+
+
+async def write_response(
+    writer: asyncio.StreamWriter, response: Response, head: bool, keep_alive: bool
+) -> None:
+    status = HTTPStatus(response.status)
+    headers = {"Connection": "keep-alive" if keep_alive else "close"}
+    body = b""
+    if response.status not in (204, 304):
+        body = json.dumps(response.data, default=json_default).encode()
+        headers["Content-Type"] = "application/json; charset=utf-8"
+        headers["Content-Length"] = str(len(body))
+    if "ETag" in response.headers:
+        # Stored, but always revalidated with the ETag
+        headers["Cache-Control"] = "private, no-cache"
+    headers.update(response.headers)
+    head_lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    head_lines += [f"{name}: {value}" for name, value in headers.items()]
+    writer.write(("\r\n".join(head_lines) + "\r\n\r\n").encode("latin-1"))
+    if not head:
+        writer.write(body)
+    await writer.drain()
+
+
+class APIServer:
+    """
+    Serve the routes on one event loop. Each request gets its own AsyncSession,
+    all of them from the pool of one engine.
+    """
+
+    def __init__(self, engine=None, jwt_secret: Optional[str] = None):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        engine = engine or make_async_engine(make_db_url())
+        self.sessions = async_sessionmaker(engine, expire_on_commit=False)
+        # decrypted once, not for every request
+        self.jwt_secret = jwt_secret or get_jwt_secret()
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer the requests of a connection until it is closed or idle."""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as e:
+                    error = Response(e.status, {"error": e.message}, e.headers)
+                    await write_response(writer, error, False, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                response = await self.handle(request)
+                await write_response(
+                    writer, response, request.method == "HEAD", request.keep_alive
+                )
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def match(self, request: Request) -> Tuple[Callable, Optional[list], dict]:
+        method = "GET" if request.method == "HEAD" else request.method
+        allowed = False
+        for route_method, pattern, handler, permissions in ROUTES:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+            if route_method == method:
+                return handler, permissions, match.groupdict()
+            allowed = True
+        if allowed:
+            raise HTTPError(405, "Method not allowed.")
+        raise HTTPError(404, "Not found.")
+
+    async def authenticate(self, request: Request, session) -> Employee:
+        """Return the employee of the bearer token. 401 if there is none valid."""
+        import jwt
+
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPError(
+                401, "Bearer token required.", {"WWW-Authenticate": "Bearer"}
+            )
+        try:
+            claims = decode_jwt_token(token.strip(), self.jwt_secret)
+        except jwt.ExpiredSignatureError:
+            message = "The token has expired."
+        except jwt.InvalidTokenError:
+            message = "The token is invalid."
+        else:
+            user = await AsyncEmployeeRepo(session).get_by_id(claims["uid"])
+            if user is not None:
+                return user
+            message = "Unknown employee."
+        raise HTTPError(
+            401, message, {"WWW-Authenticate": 'Bearer error="invalid_token"'}
+        )
+
+    async def handle(self, request: Request) -> Response:
+        """Return the response to a request, errors included."""
+        try:
+            handler, permissions, parameters = self.match(request)
+            async with self.sessions() as session:
+                try:
+                    user = None
+                    if permissions is not None:
+                        user = await self.authenticate(request, session)
+                        if not has_permissions(permissions_names(user), permissions):
+                            raise HTTPError(
+                                403, "You don't have the required permissions."
+                            )
+                    return await handler(self, session, user, request, **parameters)
+                except PermissionError as e:
+                    raise HTTPError(403, str(e))
+                except ValueError as e:
+                    raise HTTPError(400, str(e))
+                except exc.SQLAlchemyError as e:
+                    raise HTTPError(409, str(e))
+        except HTTPError as e:
+            return Response(e.status, {"error": e.message}, e.headers)
+        except Exception:
+            logger.exception("Error handling %s %s", request.method, request.path)
+            return Response(500, {"error": "Internal server error."})
+
+    async def drain_audit_log(self, interval: float = DRAIN_INTERVAL) -> None:
+        """Forward the pending audit records every interval seconds, forever."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self.sessions() as session:
+                    await async_drain(session)
+            except Exception:
+                # the records stay pending: sent with the next batch
+                logger.exception("Error forwarding the audit log")
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        address = server.sockets[0].getsockname()
+        base_view.display_as(
+            f"Serving the API on http://{address[0]}:{address[1]}", "info"
+        )
+        drainer = None
+        if get_sink() is not None:
+            drainer = asyncio.create_task(self.drain_audit_log())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if drainer is not None:
+                drainer.cancel()
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None) -> None:
+    """Run the API server until interrupted."""
+    logging.basicConfig(level=logging.INFO)
+    if not os.getenv("EECRM_KEY"):
+        # asked once, for both the database URL and the JWT secret
+        os.environ["EECRM_KEY"] = base_view.ask_app_key()
+    server = APIServer()
+    try:
+        asyncio.run(server.serve(host or HOST, port or PORT))
+    except KeyboardInterrupt:
+        pass
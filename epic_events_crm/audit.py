@@ -0,0 +1,155 @@
+"""
+Audit trail of the sensitive changes: employees created, updated or reassigned,
+contracts signed. Controllers add a record to the session of the change, so that it
+is committed in the same transaction (transactional outbox): no network round trip
+on the path of the command, and no record lost if the forwarding fails.
+Drainers forward the pending records to the sink by batches, then mark them sent:
+- at the end of a CLI command that recorded something, once its output is shown;
+- every drain_interval seconds in eecrm serve;
+- with eecrm audit-drain, for a cron job or to retry after a failure.
+A batch is only marked sent once the sink accepted it: records are forwarded at least
+once.
+"""
+
+import configparser
+import datetime
+import logging
+import os
+from typing import Callable, List, Optional
+
+from sqlalchemy import exc
+
+from epic_events_crm.models.audit import AuditRecord
+from epic_events_crm.repositories.audit import AsyncAuditRepo, AuditRepo
+from epic_events_crm.tracing import DSN, capture_message
+
+# get infos from the config file, regardless of the current working directory
+dir_path = os.path.dirname(os.path.realpath(__file__))
+config = configparser.ConfigParser()
+config.read(os.path.join(dir_path, "config.ini"))
+
+SINK = os.environ.get("EECRM_AUDIT_SINK") or config.get(
+    "audit", "sink", fallback="sentry"
+)
+BATCH_SIZE = config.getint("audit", "batch_size", fallback=100)
+DRAIN_AFTER_COMMANDS = config.getboolean("audit", "drain_after_commands", fallback=True)
+DRAIN_INTERVAL = config.getfloat("audit", "drain_interval", fallback=30.0)
+
+Sink = Callable[[List[AuditRecord]], None]
+logger = logging.getLogger("eecrm.audit")
+# Records added by this process, to only drain after the commands that made some
+recorded_count = 0
+
+
+def record(session, actor, action: str, message: str, level: str = "info") -> None:
+    """
+    Add an audit record to the session, to be committed with the change. The
+    message must be built from attributes already loaded, as before the commit.
+    """
+    global recorded_count
+    AuditRepo(session).add(
+        AuditRecord(
+            actor_id=getattr(actor, "id", None),
+            action=action,
+            level=level,
+            message=message,
+        )
+    )
+    recorded_count += 1
+
+
+def sentry_sink(records: List[AuditRecord]) -> None:
+    """Send each record as a Sentry message (queued, sent by the SDK in batches)."""
+    for audit_record in records:
+        capture_message(audit_record.message, level=audit_record.level)
+
+
+def log_sink(records: List[AuditRecord]) -> None:
+    """Log each record to the eecrm.audit logger, on stderr if none is configured."""
+    if not logger.hasHandlers():
+        logger.addHandler(logging.StreamHandler())
+        logger.setLevel(logging.INFO)
+    for audit_record in records:
+        logger.log(
+            logging.getLevelName(audit_record.level.upper()),
+            "%s %s %s",
+            audit_record.created_at,
+            audit_record.action,
+            audit_record.message,
+        )
+
+
+SINKS = {"sentry": sentry_sink, "log": log_sink}
+
+
+def get_sink(name: Optional[str] = None) -> Optional[Sink]:
+    """
+    Return the sink of a name (config [audit] sink by default). None if records
+    are not forwarded: sink none, or sentry without SENTRY_DSN.
+    """
+    name = name or SINK
+    if name == "none" or (name == "sentry" and not DSN):
+        return None
+    if name not in SINKS:
+        raise ValueError(f"Unknown audit sink {name!r}, expected one of {list(SINKS)}.")
+    return SINKS[name]
+
+
+def drain(
+    session, sink: Optional[Sink] = None, batch_size: Optional[int] = None
+) -> int:
+    """
+    Forward the pending records to the sink, oldest first, each batch in its own
+    transaction. Return how many were sent. If the sink fails, its batch is rolled
+    back and stays pending.
+    """
+    sink = sink or get_sink()
+    if sink is None:
+        return 0
+    batch_size = batch_size or BATCH_SIZE
+    repo = AuditRepo(session)
+    sent = 0
+    while True:
+        records = repo.get_pending(batch_size)
+        if records is None:
+            session.rollback()
+            raise exc.SQLAlchemyError("Could not read the audit log.")
+        if records:
+            try:
+                sink(records)
+            except Exception:
+                session.rollback()
+                raise
+            repo.mark_sent([r.id for r in records], datetime.datetime.now())
+        session.commit()
+        sent += len(records)
+        if len(records) < batch_size:
+            return sent
+
+
+async def async_drain(
+    session, sink: Optional[Sink] = None, batch_size: Optional[int] = None
+) -> int:
+    """Same as drain, on an AsyncSession."""
+    sink = sink or get_sink()
+    if sink is None:
+        return 0
+    batch_size = batch_size or BATCH_SIZE
+    repo = AsyncAuditRepo(session)
+    sent = 0
+    while True:
+        records = await repo.get_pending(batch_size)
+        if records is None:
+            await session.rollback()
+            raise exc.SQLAlchemyError("Could not read the audit log.")
+        if records:
+            try:
+                sink(records)
+            except Exception:
+                await session.rollback()
+                raise
+            await repo.mark_sent([r.id for r in records], datetime.datetime.now())
+        await session.commit()
+        sent += len(records)
+        if len(records) < batch_size:
+            return sent
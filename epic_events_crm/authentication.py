@@ -1,25 +1,40 @@
+import configparser
 import datetime
 import os
-import jwt
-from dotenv import load_dotenv, set_key
+import secrets
+from dotenv import load_dotenv
 from cryptography.fernet import Fernet
 
 from typing import Union, Optional
 
+from epic_events_crm.metrics import metrics
 from epic_events_crm.models.employees import Employee
+from epic_events_crm.models.sessions import RefreshToken
 from epic_events_crm.repositories.employees import EmployeeRepo
+from epic_events_crm.repositories.sessions import RefreshTokenRepo
+from epic_events_crm.token_store import TokenStore, token_hash
+from epic_events_crm.tracing import set_user, span
 from epic_events_crm.views.base import BaseView
 
+# get infos from the config file, regardless of the current working directory
+dir_path = os.path.dirname(os.path.realpath(__file__))
+config = configparser.ConfigParser()
+config.read(os.path.join(dir_path, "config.ini"))
+ACCESS_MINUTES = config.getint("tokens", "access_minutes", fallback=15)
+REFRESH_HOURS = config.getint("tokens", "refresh_hours", fallback=8)
 
 base_view = BaseView()
 repo = EmployeeRepo()
+refresh_repo = RefreshTokenRepo(repo.session)
+token_store = TokenStore()
 
 
 def authenticate(email: str, password: str, repo=repo) -> bool:
     """Authenticate an employee by email and password."""
     employee = repo.get_by_email(email)
     if employee is not None:
-        return employee.check_password(password)
+        with metrics.timer("argon2_verify"):
+            return employee.check_password(password)
     return False
 
 
@@ -36,10 +51,14 @@ def get_jwt_secret() -> str:
     return jwt_secret
 
 
-def make_jwt_token(employee: "Employee") -> str:
+def make_jwt_token(employee: "Employee", jwt_secret: Optional[str] = None) -> str:
     """Create a JWT token for an employee."""
-    expiration = datetime.datetime.now() + datetime.timedelta(minutes=15)
-    jwt_secret = get_jwt_secret()
+    import jwt  # when needed only: most commands reuse the verified claims
+
+    # aware datetime: PyJWT takes naive ones as UTC, shifting the expiration
+    now = datetime.datetime.now(datetime.timezone.utc)
+    expiration = now + datetime.timedelta(minutes=ACCESS_MINUTES)
+    jwt_secret = jwt_secret or get_jwt_secret()
     # required claims are employee id, hashed password and expiration
     payload = {
         "uid": employee.id,
@@ -50,35 +69,136 @@ def make_jwt_token(employee: "Employee") -> str:
     return token
 
 
+def decode_jwt_token(token: str, jwt_secret: Optional[str] = None) -> dict:
+    """
+    Return the claims of a JWT token made by make_jwt_token.
+    Raise jwt.InvalidTokenError (ExpiredSignatureError...) if it is not valid.
+    """
+    import jwt
+
+    jwt_secret = jwt_secret or get_jwt_secret()
+    return jwt.decode(token, jwt_secret, algorithms=["HS256"])
+
+
+def make_refresh_token(employee: "Employee", refresh_repo=refresh_repo) -> str:
+    """
+    Create a refresh token for an employee and add its hash to the session.
+    Each use gives a new one valid for REFRESH_HOURS: sessions slide while active.
+    """
+    refresh_token = secrets.token_urlsafe(32)
+    expiration = datetime.datetime.now() + datetime.timedelta(hours=REFRESH_HOURS)
+    refresh_repo.add(
+        RefreshToken(
+            employee_id=employee.id,
+            token_hash=token_hash(refresh_token),
+            expires_at=expiration,
+        )
+    )
+    return refresh_token
+
+
+def open_session(employee: "Employee", refresh_repo=refresh_repo) -> None:
+    """Store new access and refresh tokens for an employee."""
+    refresh_token = make_refresh_token(employee, refresh_repo)
+    # Stored before the commit: a concurrent command waiting on the rotated row
+    # must find the new tokens once it gets it
+    token_store.save(make_jwt_token(employee))
+    token_store.save_refresh(refresh_token)
+    refresh_repo.session.commit()
+
+
 def log_in(email: str, password: str, repo=repo) -> bool:
     """
-    After being authenticated, log in an employee. A JWT token is created and
-    stored in a .env file.
+    Authenticate an employee (one query) and log them in. An access token and a
+    refresh token are created and stored in the token store of the current OS user.
     """
-    if authenticate(email, password, repo=repo):
-        employee = repo.get_by_email(email)
-        token = make_jwt_token(employee)
-        set_key(".env", "JWT_TOKEN", token)
+    employee = repo.get_by_email(email)
+    if employee is None:
+        return False
+    with metrics.timer("argon2_verify"):
+        valid_password = employee.check_password(password)
+    if valid_password:
+        open_session(employee, RefreshTokenRepo(repo.session))
         return True
     return False
 
 
+def renew_session(refresh_repo=refresh_repo) -> Union[bool, dict]:
+    """
+    Rotate the stored refresh token to get a new access token, without asking for
+    the password. Return the new claims, or False if the session is over.
+    A refresh token used twice may have been stolen: every session of its employee
+    is then revoked.
+    """
+    refresh_token = token_store.load_refresh()
+    if refresh_token is None:
+        return False
+    stored = refresh_repo.get_by_hash(token_hash(refresh_token))
+    now = datetime.datetime.now()
+    if stored is None or stored.expires_at <= now:
+        refresh_repo.session.rollback()
+        return False
+    if stored.revoked_at is not None:
+        refresh_repo.session.rollback()
+        if token_store.load_refresh() != refresh_token:
+            # rotated meanwhile by another command of the same OS user
+            return valid_token_in_env()
+        refresh_repo.revoke_all(stored.employee_id, now)
+        refresh_repo.session.commit()
+        return False
+    stored.revoked_at = now
+    open_session(stored.employee, refresh_repo)
+    return valid_token_in_env()
+
+
+def log_out(refresh_repo=refresh_repo) -> None:
+    """End the session of the current OS user, server side too."""
+    refresh_token = token_store.load_refresh()
+    if refresh_token is not None:
+        stored = refresh_repo.get_by_hash(token_hash(refresh_token))
+        if stored is not None and stored.revoked_at is None:
+            stored.revoked_at = datetime.datetime.now()
+        refresh_repo.session.commit()
+    token_store.clear()
+
+
+def revoke_sessions(employee_id: int, refresh_repo=refresh_repo) -> int:
+    """
+    Revoke all refresh tokens of an employee, return how many were active.
+    Their access tokens stay valid until they expire, ACCESS_MINUTES at most.
+    """
+    count = refresh_repo.revoke_all(employee_id, datetime.datetime.now())
+    refresh_repo.session.commit()
+    return count
+
+
 def valid_token_in_env() -> Union[bool, dict]:
     """
-    Check if a valid JWT token is stored in the environments variables.
+    Check if a valid JWT token is stored in the token store.
     Return False if the token is invalid, expired or not present.
-    If token is valid, return the payload in a dictionary.
+    If token is valid, return the payload in a dictionary. Claims already verified
+    for this token are returned without checking the signature again.
     """
-    load_dotenv(override=True)
-    token = os.getenv("JWT_TOKEN")
+    import jwt
+
+    token = token_store.load()
     if token is not None:
-        jwt_secret = get_jwt_secret()
+        claims = token_store.get_claims(token)
+        if claims is not None:
+            return claims
         try:
-            decoded_token = jwt.decode(token, jwt_secret, algorithms=["HS256"])
+            with span("auth.token", "decode token"):
+                decoded_token = decode_jwt_token(token)
+            token_store.set_claims(token, decoded_token)
             return decoded_token
         except jwt.ExpiredSignatureError:
-            base_view.display_as("The token has expired.", "warning")
-            return False
+            # silently renewed as long as the refresh token is valid
+            renewed = renew_session()
+            if not renewed:
+                base_view.display_as(
+                    "The session has expired, please log in again.", "warning"
+                )
+            return renewed
         except jwt.InvalidSignatureError:
             base_view.display_as("The token signature is invalid.", "error")
             return False
@@ -106,6 +226,7 @@ def requires_auth(f):
         except Exception as e:
             base_view.display_as(f"Error: {e}", "error")
         if valid_token:
+            set_user(valid_token)
             return f(*args, **kwargs)
         else:
             return None
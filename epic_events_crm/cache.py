@@ -0,0 +1,133 @@
+"""
+Read-through cache for reference data (departments, permissions, employees by id).
+Caches live in session.info so that cached ORM objects are only ever returned to the
+session they belong to. They are cleared on rollback and on writes done through the
+repositories, and entries also expire after a time to live.
+"""
+
+import configparser
+import functools
+import inspect
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from epic_events_crm.metrics import metrics
+
+# get infos from the config file, regardless of the current working directory
+dir_path = os.path.dirname(os.path.realpath(__file__))
+config = configparser.ConfigParser()
+config.read(os.path.join(dir_path, "config.ini"))
+MAXSIZE = config.getint("cache", "maxsize", fallback=256)
+TTL = config.getfloat("cache", "ttl", fallback=300)
+
+MISSING = object()
+
+
+class LRUCache:
+    """A bounded least recently used cache whose entries expire after ttl seconds."""
+
+    def __init__(self, maxsize: int = MAXSIZE, ttl: float = TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Return the value stored for key, or default if absent or expired."""
+        item = self._data.get(key)
+        if item is None or item[1] < time.monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def get_session_caches(session: Session) -> Dict[str, LRUCache]:
+    """Return the caches of a session, creating them on first use."""
+    # The events of an AsyncSession are those of the Session it proxies
+    session = getattr(session, "sync_session", session)
+    caches = session.info.get("reference_caches")
+    if caches is None:
+        caches = session.info["reference_caches"] = {}
+
+        # Objects loaded before a rollback may not exist anymore
+        @event.listens_for(session, "after_soft_rollback")
+        def clear_caches(session, previous_transaction):
+            for cache in caches.values():
+                cache.clear()
+
+    return caches
+
+
+def invalidate(session: Session, name: str) -> None:
+    """Clear the cache of a given name for a session."""
+    cache = get_session_caches(session).get(name)
+    if cache is not None:
+        cache.clear()
+
+
+def cached(name: str) -> Callable:
+    """
+    Decorator for repository methods, caching their result in the cache of the
+    given name of the repository session. None results are not cached.
+    Coroutine methods (async repositories) cache their awaited result.
+    """
+
+    def decorator(method):
+        def lookup(self, args, kwargs):
+            cache = get_session_caches(self.session).setdefault(name, LRUCache())
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            value = cache.get(key)
+            metrics.count(
+                "reference_cache_misses" if value is MISSING else "reference_cache_hits"
+            )
+            return cache, key, value
+
+        if inspect.iscoroutinefunction(method):
+
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                cache, key, value = lookup(self, args, kwargs)
+                if value is MISSING:
+                    value = await method(self, *args, **kwargs)
+                    if value is not None:
+                        cache.set(key, value)
+                return value
+
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache, key, value = lookup(self, args, kwargs)
+            if value is MISSING:
+                value = method(self, *args, **kwargs)
+                if value is not None:
+                    cache.set(key, value)
+            return value
+
+        return wrapper
+
+    return decorator
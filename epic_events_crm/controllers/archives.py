@@ -0,0 +1,44 @@
+from datetime import datetime
+from sqlalchemy import exc
+
+from epic_events_crm.database import get_session
+from epic_events_crm.repositories.archives import ArchiveRepo
+
+
+class ArchiveController:
+    """
+    Archive controller. If no session is provided to constructor, a new one is
+    created.
+    """
+
+    def __init__(self, session=None):
+        if session is not None:
+            self.session = session
+        else:
+            self.session = get_session()
+        self.repo = ArchiveRepo(self.session)
+
+    def archive(self, before: datetime, chunk_size: int = 500) -> int:
+        """
+        Move signed and fully paid contracts whose event ended before the given
+        datetime, and their events, to the archive tables. Work is done by chunks of
+        contracts, each one in its own transaction. Return the number archived.
+        """
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be a positive number.")
+        archived = 0
+        while True:
+            contract_ids = self.repo.get_archivable_contract_ids(before, chunk_size)
+            if contract_ids is None:
+                raise ValueError("Could not get the contracts to archive.")
+            if not contract_ids:
+                return archived
+            try:
+                self.repo.move_to_archive(contract_ids)
+                self.session.commit()
+            except exc.SQLAlchemyError as e:
+                self.session.rollback()
+                raise exc.SQLAlchemyError(
+                    f"Error after archiving {archived} contract(s): {e}"
+                )
+            archived += len(contract_ids)
@@ -6,10 +6,23 @@ from epic_events_crm.utilities import (
     is_phone_valid,
     remove_spaces_and_hyphens,
 )
-from epic_events_crm.database import get_session
+from epic_events_crm.controllers.rules import (
+    check_can_update_client,
+    check_new_email,
+    check_salesperson,
+    clean_phone,
+    format_names,
+)
+from epic_events_crm.database import (
+    ConcurrentUpdateError,
+    async_commit_or_conflict,
+    commit_or_conflict,
+    get_session,
+)
 from epic_events_crm.authentication import get_current_user
 from epic_events_crm.models.clients import Client
-from epic_events_crm.repositories.clients import ClientRepo
+from epic_events_crm.repositories.clients import AsyncClientRepo, ClientRepo
+from epic_events_crm.repositories.employees import AsyncEmployeeRepo
 from epic_events_crm.controllers.employees import EmployeeController
 
 
@@ -36,22 +49,13 @@ class ClientController:
         company_name: Optional[str] = None,
     ) -> None:
         """Create a client and add it to the database."""
-        # Check if email is valid
-        if not is_email_valid(email):
-            raise ValueError("Invalid email.")
-        # Check if email is not already used
-        if self.repo.get_by_email(email):
-            raise ValueError("Email already in use.")
+        check_new_email(email, self.repo.get_by_email(email))
         # Check if phone is valid and not already used
         if phone:
-            phone = remove_spaces_and_hyphens(phone)
-            if not is_phone_valid(phone):
-                raise ValueError("Invalid phone number.")
+            phone = clean_phone(phone)
             if self.repo.get_by_phone(phone):
                 raise ValueError("Phone number already in use.")
-        # Format first and last name
-        fname = fname.title()
-        lname = lname.upper()
+        fname, lname = format_names(fname, lname)
 
         client = Client(
             fname=fname,
@@ -101,9 +105,7 @@ class ClientController:
             raise ValueError("Client not found.")
 
         # Check if current user is assigned to the client to be updated
-        current_user = get_current_user()
-        if client.salesperson_id != current_user.id:
-            raise PermissionError("You are not assigned to this client.")
+        check_can_update_client(get_current_user(), client)
 
         # Update client details
         if fname:
@@ -113,11 +115,7 @@ class ClientController:
 
         if salesperson_id:
             # Check if salesperson exists and is indeed a salesperson
-            salesperson = self.employee_controller.repo.get_by_id(salesperson_id)
-            if not salesperson:
-                raise ValueError("Employee not found.")
-            if salesperson.department.name != "Sales":
-                raise ValueError("Employee must be a salesperson.")
+            check_salesperson(self.employee_controller.repo.get_by_id(salesperson_id))
             # Update salesperson
             client.salesperson_id = salesperson_id
 
@@ -130,7 +128,9 @@ class ClientController:
         if company_name:
             client.company_name = company_name
         try:
-            self.session.commit()
+            commit_or_conflict(self.session, f"Client {client.id}")
+        except ConcurrentUpdateError:
+            raise
         except exc.SQLAlchemyError as e:
             raise exc.SQLAlchemyError(f"Error: {e}")
 
@@ -149,3 +149,118 @@ class ClientController:
         """Return a list of all clients assigned to the current user."""
         current_user = get_current_user()
         return self.repo.get_clients_assigned_to(current_user.id)
+
+
+class AsyncClientController:
+    """
+    Client controller on an AsyncSession (see database.get_async_session), for a
+    server or daemon serving many users on one event loop: the current user is given
+    to the constructor instead of read from the environment. Same rules as
+    ClientController.
+    """
+
+    def __init__(self, session, user):
+        self.session = session
+        self.user = user
+        self.repo = AsyncClientRepo(self.session)
+
+    async def create(
+        self,
+        fname: str,
+        lname: str,
+        email: str,
+        salesperson_id: int,
+        phone: Optional[str] = None,
+        company_name: Optional[str] = None,
+    ) -> None:
+        """Create a client and add it to the database."""
+        check_new_email(email, await self.repo.get_by_email(email))
+        if phone:
+            phone = clean_phone(phone)
+            if await self.repo.get_by_phone(phone):
+                raise ValueError("Phone number already in use.")
+        fname, lname = format_names(fname, lname)
+
+        client = Client(
+            fname=fname,
+            lname=lname,
+            email=email,
+            salesperson_id=salesperson_id,
+            phone=phone,
+            company_name=company_name,
+        )
+        self.repo.add(client)
+        try:
+            await self.session.commit()
+        except exc.SQLAlchemyError as e:
+            raise exc.SQLAlchemyError(f"Error: {e}")
+
+    async def update(
+        self,
+        client_id: Optional[int] = None,
+        email: Optional[str] = None,
+        fname: Optional[str] = None,
+        lname: Optional[str] = None,
+        salesperson_id: Optional[int] = None,
+        phone: Optional[str] = None,
+        company_name: Optional[str] = None,
+    ) -> None:
+        """
+        Update a client's details. Identify client by id or email.
+        Only assigned salesperson can update client details.
+        """
+        if not client_id and not email:
+            raise ValueError("Provide either client id or email.")
+        if client_id is not None:
+            client = await self.repo.get_by_id(client_id)
+            if client is None:
+                raise ValueError("Client not found.")
+            if email is not None:
+                if is_email_valid(email) and not await self.repo.get_by_email(email):
+                    client.email = email
+                else:
+                    raise ValueError("Email invalid or already used.")
+        else:
+            client = await self.repo.get_by_email(email)
+        if client is None:
+            raise ValueError("Client not found.")
+        check_can_update_client(self.user, client)
+
+        if fname:
+            client.fname = fname.title()
+        if lname:
+            client.lname = lname.upper()
+        if salesperson_id:
+            check_salesperson(
+                await AsyncEmployeeRepo(self.session).get_by_id(salesperson_id)
+            )
+            client.salesperson_id = salesperson_id
+        if phone:
+            phone = remove_spaces_and_hyphens(phone)
+            if is_phone_valid(phone) and not await self.repo.get_by_phone(phone):
+                client.phone = phone
+            else:
+                raise ValueError("Phone number invalid or already used.")
+        if company_name:
+            client.company_name = company_name
+        try:
+            await async_commit_or_conflict(self.session, f"Client {client.id}")
+        except ConcurrentUpdateError:
+            raise
+        except exc.SQLAlchemyError as e:
+            raise exc.SQLAlchemyError(f"Error: {e}")
+
+    async def delete(self, client: Client) -> None:
+        """Delete a client from the database."""
+        await self.repo.delete(client)
+        try:
+            await self.session.commit()
+        except exc.SQLAlchemyError as e:
+            raise exc.SQLAlchemyError(f"Error: {e}")
+
+    async def get_all(self) -> Optional[List[Client]]:
+        return await self.repo.get_all()
+
+    async def get_clients_assigned_to_current_user(self) -> Optional[List[Client]]:
+        """Return a list of all clients assigned to the current user."""
+        return await self.repo.get_clients_assigned_to(self.user.id)
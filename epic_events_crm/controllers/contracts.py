@@ -1,14 +1,24 @@
-from decimal import Decimal
-from pymysql.err import IntegrityError
-from sentry_sdk import capture_message
 from sqlalchemy import exc
 from typing import Optional, List
 
 
-from epic_events_crm.database import get_session
+from epic_events_crm.controllers.rules import (
+    apply_contract_changes,
+    check_can_update_contract,
+)
+from epic_events_crm.database import (
+    FOREIGN_KEY,
+    ConcurrentUpdateError,
+    async_commit_or_conflict,
+    commit_with_retry,
+    constraint_violation,
+    get_session,
+)
 from epic_events_crm.authentication import get_current_user
+from epic_events_crm.audit import record
 from epic_events_crm.models.contracts import Contract
-from epic_events_crm.repositories.contracts import ContractRepo
+from epic_events_crm.repositories.contracts import AsyncContractRepo, ContractRepo
+from epic_events_crm.repositories.archives import ArchiveRepo
 
 
 class ContractController:
@@ -22,6 +32,7 @@ class ContractController:
         else:
             self.session = get_session()
         self.repo = ContractRepo(self.session)
+        self.archive_repo = ArchiveRepo(self.session)
 
     def create(self, client_id: int, due_amount: float) -> int:
         """Create a contract and add it to the database."""
@@ -33,8 +44,9 @@ class ContractController:
             self.session.commit()
             return contract.id
         except exc.SQLAlchemyError as e:
-            msg = "a foreign key constraint fails"  # Client id not found
-            if isinstance(e.orig, IntegrityError) and msg in e.orig.args[1]:
+            violation = constraint_violation(e)
+            if violation is not None and violation.kind == FOREIGN_KEY:
+                # Client id not found
                 raise exc.SQLAlchemyError("IntegrityError: Please check client id.")
             raise exc.SQLAlchemyError(f"Error: {e}")
 
@@ -49,64 +61,67 @@ class ContractController:
         """
         Update a contract's details.
         Salesperson can only update contracts of their clients.
+        A payment alone is applied again if the contract was updated concurrently.
         """
-        is_contract_newly_signed = False
+        employee = get_current_user()
 
-        contract = self.repo.get_by_id(contract_id)
-        if contract is None:
-            raise ValueError("Contract not found.")
+        def apply() -> None:
+            contract = self.repo.get_by_id(contract_id)
+            if contract is None:
+                raise ValueError("Contract not found.")
 
-        # Check if the current user is a salesperson
-        employee = get_current_user()
-        if employee.department.name == "Sales":
-            # and if the contract is tied to one of their clients
-            if employee.id != contract.client.salesperson_id:
-                raise PermissionError("You can only update contracts of your clients.")
-
-        # Update of total amount implies update of due amount
-        if total_amount is not None:
-            total_amount = Decimal(total_amount)  # Contract model uses Decimal(15, 2)
-            difference = total_amount - contract.total_amount
-            contract.total_amount = total_amount
-            contract.due_amount += difference
-        # Money paid implies reduction of due amount
-        if paid_amount is not None:
-            paid_amount = Decimal(paid_amount)  # Contract model uses Decimal(15, 2)
-            contract.due_amount -= paid_amount
-        # Update signed status. If changed to True, log into Sentry
-        if signed is not None:
-            old_status = contract.signed
-            contract.signed = signed
-            is_contract_newly_signed = not old_status and signed
+            # Salespeople can only update contracts of their clients
+            check_can_update_contract(employee, contract)
+            # Due amount follows the total and paid amounts
+            is_contract_newly_signed = apply_contract_changes(
+                contract, total_amount, paid_amount, signed
+            )
 
-        if client_email is not None:
-            # Check if client exists
-            from epic_events_crm.repositories.clients import ClientRepo
+            if client_email is not None:
+                # Check if client exists
+                from epic_events_crm.repositories.clients import ClientRepo
 
-            client_repo = ClientRepo(self.session)
-            client = client_repo.get_by_email(client_email)
-            if client is None:
-                raise ValueError("Client not found.")
-            old_client = contract.client
-            contract.client_id = client.id
-            print(f"Trying to change client from {old_client} to {client}")
+                client_repo = ClientRepo(self.session)
+                client = client_repo.get_by_email(client_email)
+                if client is None:
+                    raise ValueError("Client not found.")
+                old_client = contract.client
+                contract.client_id = client.id
+                print(f"Trying to change client from {old_client} to {client}")
 
-        # If due amount is negative, inform user
-        if contract.due_amount < 0:
-            print(f"Please note that due amount is negative: {contract.due_amount}")
-        try:
-            self.session.commit()
+            # If newly signed, record it in the audit log, committed with the change
             if is_contract_newly_signed:
-                capture_message(
-                    f"{employee} signed contract (id:{contract_id}) for {contract.client}",  # noqa
-                    level="info",
+                record(
+                    self.session,
+                    employee,
+                    "contract.sign",
+                    f"{employee} signed contract (id:{contract_id}) for client "
+                    f"id:{contract.client_id}",
                 )
+            # If due amount is negative, inform user
+            if contract.due_amount < 0:
+                print(f"Please note that due amount is negative: {contract.due_amount}")
+
+        # A payment only decreases the due amount: it commutes with other changes
+        payment_only = paid_amount is not None and (
+            total_amount is None and signed is None and client_email is None
+        )
+        try:
+            commit_with_retry(
+                self.session, apply, f"Contract {contract_id}", retry=payment_only
+            )
+        except ConcurrentUpdateError:
+            raise
         except exc.SQLAlchemyError as e:
             raise exc.SQLAlchemyError(f"Error: {e}")
 
-    def get_all(self) -> Optional[List[Contract]]:
-        """Return a list of all contracts."""
-        return self.repo.get_all()
+    def get_all(self, include_archived: bool = False) -> Optional[List[Contract]]:
+        """Return a list of all contracts, archived ones included if asked."""
+        contracts = self.repo.get_all()
+        if include_archived:
+            archived = self.archive_repo.get_all_contracts()
+            contracts = list(contracts or []) + list(archived or [])
+        return contracts
 
     def get_depending_on_flags(
         self, unpaid: bool, unsigned: bool, noevent: bool
@@ -128,11 +143,118 @@ class ContractController:
         elif noevent:
             return self.repo.get_without_event()
 
-    def get_salesperson_supervised(self, noevent: bool) -> Optional[List[Contract]]:
-        """Return a list of contracts of the current user's clients."""
+    def get_salesperson_supervised(
+        self, noevent: bool, include_archived: bool = False
+    ) -> Optional[List[Contract]]:
+        """
+        Return a list of contracts of the current user's clients.
+        Archived contracts all have an event, so they are not added with noevent.
+        """
         user = get_current_user()
         if user.department.name == "Sales":
             if noevent:
                 return self.repo.get_by_salesperson_and_wo_event(user.id)
-            return self.repo.get_by_salesperson(user.id)
+            contracts = self.repo.get_by_salesperson(user.id)
+            if include_archived:
+                archived = self.archive_repo.get_contracts_by_salesperson(user.id)
+                contracts = list(contracts or []) + list(archived or [])
+            return contracts
         return None
+
+
+class AsyncContractController:
+    """
+    Contract controller on an AsyncSession (see database.get_async_session), for a
+    server or daemon serving many users on one event loop: the current user is given
+    to the constructor instead of read from the environment. Same rules as
+    ContractController. Archived contracts are not available there.
+    """
+
+    def __init__(self, session, user):
+        self.session = session
+        self.user = user
+        self.repo = AsyncContractRepo(self.session)
+
+    async def create(self, client_id: int, due_amount: float) -> int:
+        """Create a contract and add it to the database."""
+        contract = Contract(
+            client_id=client_id, total_amount=due_amount, due_amount=due_amount
+        )
+        self.repo.add(contract)
+        try:
+            await self.session.commit()
+            return contract.id
+        except exc.SQLAlchemyError as e:
+            violation = constraint_violation(e)
+            if violation is not None and violation.kind == FOREIGN_KEY:
+                raise exc.SQLAlchemyError("IntegrityError: Please check client id.")
+            raise exc.SQLAlchemyError(f"Error: {e}")
+
+    async def update(
+        self,
+        contract_id: int,
+        total_amount: Optional[float] = None,
+        paid_amount: Optional[float] = None,
+        signed: Optional[bool] = None,
+        client_email: Optional[str] = None,
+    ) -> None:
+        """
+        Update a contract's details.
+        Salesperson can only update contracts of their clients.
+        """
+        contract = await self.repo.get_by_id(contract_id)
+        if contract is None:
+            raise ValueError("Contract not found.")
+        check_can_update_contract(self.user, contract)
+        is_contract_newly_signed = apply_contract_changes(
+            contract, total_amount, paid_amount, signed
+        )
+        if client_email is not None:
+            from epic_events_crm.repositories.clients import AsyncClientRepo
+
+            client = await AsyncClientRepo(self.session).get_by_email(client_email)
+            if client is None:
+                raise ValueError("Client not found.")
+            contract.client = client
+        if is_contract_newly_signed:
+            record(
+                self.session,
+                self.user,
+                "contract.sign",
+                f"{self.user} signed contract (id:{contract_id}) for client "
+                f"id:{contract.client.id}",
+            )
+        try:
+            await async_commit_or_conflict(self.session, f"Contract {contract_id}")
+        except ConcurrentUpdateError:
+            raise
+        except exc.SQLAlchemyError as e:
+            raise exc.SQLAlchemyError(f"Error: {e}")
+
+    async def get_all(self) -> Optional[List[Contract]]:
+        """Return a list of all contracts."""
+        return await self.repo.get_all()
+
+    async def get_depending_on_flags(
+        self, unpaid: bool, unsigned: bool, noevent: bool
+    ) -> Optional[List[Contract]]:
+        """Return a list of contracts depending on the flags"""
+        if not any([unpaid, unsigned, noevent]):
+            return None
+        if sum([unpaid, unsigned, noevent]) != 1:
+            raise ValueError("unpaid, unsigned and noevent are mutually exclusive.")
+        if unsigned:
+            return await self.repo.get_unsigned()
+        elif unpaid:
+            return await self.repo.get_unpaid()
+        return await self.repo.get_without_event()
+
+    async def get_salesperson_supervised(
+        self, noevent: bool
+    ) -> Optional[List[Contract]]:
+        """Return a list of contracts of the current user's clients."""
+        if self.user.department.name != "Sales":
+            return None
+        if noevent:
+            return await self.repo.get_by_salesperson_and_wo_event(self.user.id)
+        return await self.repo.get_by_salesperson(self.user.id)
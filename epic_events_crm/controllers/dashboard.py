@@ -0,0 +1,153 @@
+"""
+`eecrm today`: the lists each department starts its day with, queried at the same
+time so that the command takes as long as the slowest one instead of their sum.
+Each query runs on a worker thread with a session of its own, so with a connection
+of its own from the engine pool (a SQLAlchemy session must not be shared between
+threads). What the views display is loaded with the rows, before the worker session
+is closed.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from epic_events_crm.database import get_session
+from epic_events_crm.repositories.clients import ClientRepo
+from epic_events_crm.repositories.contracts import ContractRepo
+from epic_events_crm.repositories.events import EventRepo
+
+
+@dataclass
+class Section:
+    """A list of the dashboard, kind being clients, contracts or events."""
+
+    title: str
+    kind: str
+    rows: List = field(default_factory=list)
+    seconds: float = 0.0
+
+
+# title, kind and query (session, user id -> rows) of the sections, by department
+SECTIONS: Dict[str, List[Tuple[str, str, Callable]]] = {
+    "Sales": [
+        (
+            "MY CLIENTS",
+            "clients",
+            lambda session, uid: ClientRepo(session).get_clients_assigned_to(uid),
+        ),
+        (
+            "MY CONTRACTS WITHOUT EVENT",
+            "contracts",
+            lambda session, uid: ContractRepo(session).get_by_salesperson_and_wo_event(
+                uid
+            ),
+        ),
+        (
+            "UNSIGNED CONTRACTS",
+            "contracts",
+            lambda session, uid: ContractRepo(session).get_unsigned(),
+        ),
+    ],
+    "Support": [
+        (
+            "MY EVENTS",
+            "events",
+            lambda session, uid: EventRepo(session).get_events_assigned_to(uid),
+        ),
+        (
+            "EVENTS WITHOUT SUPPORT",
+            "events",
+            lambda session, uid: EventRepo(session).get_events_assigned_to(),
+        ),
+    ],
+    "Management": [
+        (
+            "EVENTS WITHOUT SUPPORT",
+            "events",
+            lambda session, uid: EventRepo(session).get_events_assigned_to(),
+        ),
+        (
+            "UNSIGNED OR UNPAID CONTRACTS",
+            "contracts",
+            lambda session, uid: ContractRepo(session).get_unsigned_or_unpaid(),
+        ),
+    ],
+}
+SECTIONS["Superuser"] = SECTIONS["Management"]
+
+
+def display_loads(kind: str) -> tuple:
+    """
+    Return the loader options of what the views display for a kind of rows. Built
+    when needed: building them configures the mappers, which eecrm does not do at
+    import time.
+    """
+    from sqlalchemy.orm import selectinload
+
+    from epic_events_crm.models.clients import Client
+    from epic_events_crm.models.contracts import Contract
+    from epic_events_crm.models.employees import Employee
+    from epic_events_crm.models.events import Event
+
+    return {
+        "clients": (selectinload(Client.salesperson),),
+        "contracts": (selectinload(Contract.client), selectinload(Contract.event)),
+        "employees": (selectinload(Employee.department),),
+        "events": (selectinload(Event.support_person),),
+    }[kind]
+
+
+class DashboardController:
+    """
+    Dashboard controller. If no session is provided to constructor, a new one is
+    created: only its engine is used, each query gets a session of its own.
+    """
+
+    def __init__(self, session=None):
+        if session is not None:
+            self.session = session
+        else:
+            self.session = get_session()
+
+    def run_section(self, section: Section, query: Callable, user_id: int) -> Section:
+        """Run the query of a section on a new session, rows loaded for the views."""
+        started = time.perf_counter()
+        options = display_loads(section.kind)
+
+        def eager_loads(orm_execute_state):
+            if orm_execute_state.is_select and not (
+                orm_execute_state.is_column_load
+                or orm_execute_state.is_relationship_load
+            ):
+                orm_execute_state.statement = orm_execute_state.statement.options(
+                    *options
+                )
+
+        with Session(self.session.get_bind()) as session:
+            event.listen(session, "do_orm_execute", eager_loads)
+            section.rows = query(session, user_id) or []
+        section.seconds = time.perf_counter() - started
+        return section
+
+    def get_today(self, user, max_workers: Optional[int] = None) -> List[Section]:
+        """
+        Return the sections of the user's department, their queries run concurrently.
+        Raise ValueError if the department has no dashboard.
+        """
+        sections = SECTIONS.get(user.department.name)
+        if not sections:
+            raise ValueError(f"No dashboard for the {user.department.name} department.")
+        engine = self.session.get_bind()
+        if isinstance(engine.pool, StaticPool):
+            max_workers = 1  # a single connection (in-memory SQLite): one at a time
+        with ThreadPoolExecutor(max_workers or len(sections)) as executor:
+            futures = [
+                executor.submit(self.run_section, Section(title, kind), query, user.id)
+                for title, kind, query in sections
+            ]
+            return [future.result() for future in futures]
@@ -1,3 +1,4 @@
+from epic_events_crm.controllers.rules import available_departments
 from epic_events_crm.database import get_session
 from epic_events_crm.repositories.departments_permissions import DepartmentRepo
 
@@ -17,8 +18,4 @@ class DepartmentController:
 
     def display_all(self) -> str:
         """List all departments and their id."""
-        departments = self.repo.get_all()
-        msg = "Availables departments:\n"
-        for department in departments:
-            msg += f"{department.name.upper()} (id:{department.id})\n"
-        return msg
+        return available_departments(self.repo.get_all())
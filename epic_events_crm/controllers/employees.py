@@ -1,13 +1,23 @@
-from typing import Optional, List
-from pymysql.err import IntegrityError
-from sentry_sdk import capture_message
+import asyncio
+from typing import Optional, List, Tuple
 from sqlalchemy import exc
 
 from epic_events_crm.authentication import get_current_user
+from epic_events_crm.audit import record
 from epic_events_crm.utilities import is_email_valid
+from epic_events_crm.controllers.rules import (
+    available_departments,
+    check_new_email,
+    format_names,
+)
+from epic_events_crm.database import NOT_NULL, ConstraintViolation, constraint_violation
 from epic_events_crm.database import get_session
 from epic_events_crm.models.employees import Employee
-from epic_events_crm.repositories.employees import EmployeeRepo
+from epic_events_crm.repositories.archives import ArchiveRepo, AsyncArchiveRepo
+from epic_events_crm.repositories.employees import AsyncEmployeeRepo, EmployeeRepo
+from epic_events_crm.repositories.clients import AsyncClientRepo, ClientRepo
+from epic_events_crm.repositories.departments_permissions import AsyncDepartmentRepo
+from epic_events_crm.repositories.events import AsyncEventRepo, EventRepo
 from epic_events_crm.controllers.departments_permissions import DepartmentController
 
 
@@ -32,15 +42,8 @@ class EmployeeController:
         Create an employee and add it to the database.
         Can't create in the Superuser department.
         """
-        # Check if email is valid
-        if not is_email_valid(email):
-            raise ValueError("Invalid email.")
-        # Check if email is not already used
-        if self.repo.get_by_email(email):
-            raise ValueError("Email already in use.")
-        # Format first and last name
-        fname = fname.title()
-        lname = lname.upper()
+        check_new_email(email, self.repo.get_by_email(email))
+        fname, lname = format_names(fname, lname)
         # Check if department exists. If not raise error with a list of departments
         if not self.department_controller.repo.get_by_id(department_id):
             msg = self.department_controller.display_all()
@@ -58,10 +61,15 @@ class EmployeeController:
             department_id=department_id,
         )
         self.repo.add(employee)
+        current_user = get_current_user() or "Unknown user (most likely non CLI)"
+        record(
+            self.session,
+            current_user,
+            "employee.create",
+            f"{current_user} created new {employee}",
+        )
         try:
-            current_user = get_current_user() or "Unknown user (most likely non CLI)"
             self.session.commit()
-            capture_message(f"{current_user} created new {employee}", level="info")
         except exc.SQLAlchemyError as e:
             raise exc.SQLAlchemyError(f"Error: {e}")
 
@@ -108,10 +116,15 @@ class EmployeeController:
                 msg = self.department_controller.display_all()
                 raise ValueError(f"Department id not found. {msg}")
 
+        current_user = get_current_user() or "Unknown user (most likely non CLI)"
+        record(
+            self.session,
+            current_user,
+            "employee.update",
+            f"{current_user} updated {employee}",
+        )
         try:
-            current_user = get_current_user() or "Unknown user (most likely non CLI)"
             self.session.commit()
-            capture_message(f"{current_user} updated {employee}", level="info")
         except exc.SQLAlchemyError as e:
             raise exc.SQLAlchemyError(f"Error: {e}")
 
@@ -122,12 +135,79 @@ class EmployeeController:
             self.session.commit()
         except exc.SQLAlchemyError as e:
             # Specific error for employee still assigned to a client
-            msg = "'salesperson_id' cannot be null"
-            if isinstance(e.orig, IntegrityError) and msg in e.orig.args[1]:
-
+            violation = constraint_violation(e)
+            if violation == ConstraintViolation(NOT_NULL, "salesperson_id"):
                 raise exc.SQLAlchemyError("Employee still assigned to a client.")
             raise exc.SQLAlchemyError(f"Error trying to commit deletion: {e}")
 
+    def reassign(
+        self,
+        from_id: int,
+        to_id: int,
+        clients: bool = False,
+        events: bool = False,
+    ) -> Tuple[int, int]:
+        """
+        Move the clients and/or events of an employee to another one, typically
+        before deleting the former. Both employees are checked once, then each table
+        is updated with a single statement inside one transaction. Archived events
+        are reassigned too: they reference the employee as well.
+        If neither clients nor events is set, it depends on the source department.
+        Return the number of clients and events (archived ones included) reassigned.
+        """
+        if from_id == to_id:
+            raise ValueError("Source and target employees must be different.")
+        old_employee = self.repo.get_by_id(from_id)
+        if old_employee is None:
+            raise ValueError("Source employee not found.")
+        new_employee = self.repo.get_by_id(to_id)
+        if new_employee is None:
+            raise ValueError("Target employee not found.")
+
+        if not clients and not events:
+            clients = old_employee.department.name == "Sales"
+            events = old_employee.department.name == "Support"
+            if not clients and not events:
+                raise ValueError("Specify what to reassign: clients and/or events.")
+        # Only salespeople can have clients and only support people can have events
+        if clients and new_employee.department.name != "Sales":
+            raise ValueError("Clients can only be reassigned to a salesperson.")
+        if events and new_employee.department.name != "Support":
+            raise ValueError("Events can only be reassigned to a support person.")
+
+        clients_count, events_count = 0, 0
+        try:
+            if clients:
+                clients_count = ClientRepo(self.session).reassign_salesperson(
+                    from_id, to_id
+                )
+                if clients_count is None:
+                    raise exc.SQLAlchemyError("Could not reassign clients.")
+            if events:
+                events_count = EventRepo(self.session).reassign_support_person(
+                    from_id, to_id
+                )
+                archived_count = ArchiveRepo(self.session).reassign_support_person(
+                    from_id, to_id
+                )
+                if events_count is None or archived_count is None:
+                    raise exc.SQLAlchemyError("Could not reassign events.")
+                events_count += archived_count
+            current_user = get_current_user() or "Unknown user (most likely non CLI)"
+            record(
+                self.session,
+                current_user,
+                "employee.reassign",
+                f"{current_user} reassigned {clients_count} client(s) and "
+                f"{events_count} event(s) from {old_employee} to {new_employee}",
+            )
+            self.session.commit()
+        except exc.SQLAlchemyError as e:
+            self.session.rollback()
+            raise exc.SQLAlchemyError(f"Error: {e}")
+
+        return clients_count, events_count
+
     def get_all(self) -> Optional[List[Employee]]:
         """Return all employees."""
         return self.repo.get_all()
@@ -138,15 +218,8 @@ class EmployeeController:
         """
         Create a superuser and add it to the database.
         """
-        # Check if email is valid
-        if not is_email_valid(email):
-            raise ValueError("Invalid email.")
-        # Check if email is not already used
-        if self.repo.get_by_email(email):
-            raise ValueError("Email already in use.")
-        # Format first and last name
-        fname = fname.title()
-        lname = lname.upper()
+        check_new_email(email, self.repo.get_by_email(email))
+        fname, lname = format_names(fname, lname)
         # Get the Superuser department id
         superuser_dpt = self.department_controller.repo.get_by_name("Superuser")
         if not superuser_dpt:
@@ -164,3 +237,183 @@ class EmployeeController:
             self.session.commit()
         except exc.SQLAlchemyError as e:
             raise exc.SQLAlchemyError(f"Error: {e}")
+
+
+class AsyncEmployeeController:
+    """
+    Employee controller on an AsyncSession (see database.get_async_session), for a
+    server or daemon serving many users on one event loop: the current user is given
+    to the constructor instead of read from the environment. Same rules as
+    EmployeeController.
+    """
+
+    def __init__(self, session, user):
+        self.session = session
+        self.user = user
+        self.repo = AsyncEmployeeRepo(self.session)
+        self.department_repo = AsyncDepartmentRepo(self.session)
+
+    async def _check_department(self, department_id: int) -> None:
+        if not await self.department_repo.get_by_id(department_id):
+            departments = await self.department_repo.get_all()
+            msg = available_departments(departments)
+            raise ValueError(f"Department id not found. {msg}")
+
+    async def create(
+        self, fname: str, lname: str, email: str, password: str, department_id: int
+    ) -> None:
+        """
+        Create an employee and add it to the database.
+        Can't create in the Superuser department.
+        """
+        check_new_email(email, await self.repo.get_by_email(email))
+        fname, lname = format_names(fname, lname)
+        await self._check_department(department_id)
+        superuser_dpt = await self.department_repo.get_by_name("Superuser")
+        if department_id == superuser_dpt.id:
+            raise PermissionError("You are not allowed to create a superuser.")
+
+        # Hashing the password takes tens of milliseconds of CPU: not on the loop
+        employee = await asyncio.to_thread(
+            Employee,
+            fname=fname,
+            lname=lname,
+            email=email,
+            password=password,
+            department_id=department_id,
+        )
+        self.repo.add(employee)
+        record(
+            self.session,
+            self.user,
+            "employee.create",
+            f"{self.user} created new {employee}",
+        )
+        try:
+            await self.session.commit()
+        except exc.SQLAlchemyError as e:
+            raise exc.SQLAlchemyError(f"Error: {e}")
+
+    async def update(
+        self,
+        employee_id: Optional[int] = None,
+        email: Optional[str] = None,
+        fname: Optional[str] = None,
+        lname: Optional[str] = None,
+        department_id: Optional[int] = None,
+    ) -> None:
+        """
+        Update an employee's details. Employee is identified by id or email.
+        Must provide id if email is to be updated.
+        """
+        if not employee_id and not email:
+            raise ValueError("Provide either employee id or email.")
+        if employee_id is not None:
+            employee = await self.repo.get_by_id(employee_id)
+            if employee is None:
+                raise ValueError("Employee not found.")
+            if email is not None:
+                if is_email_valid(email) and not await self.repo.get_by_email(email):
+                    employee.email = email
+                else:
+                    raise ValueError("Email invalid or already used.")
+        else:
+            employee = await self.repo.get_by_email(email)
+        if employee is None:
+            raise ValueError("Employee not found.")
+
+        if department_id is not None:
+            await self._check_department(department_id)
+            employee.department_id = department_id
+        if fname is not None:
+            employee.fname = fname.title()
+        if lname is not None:
+            employee.lname = lname.upper()
+        record(
+            self.session,
+            self.user,
+            "employee.update",
+            f"{self.user} updated {employee}",
+        )
+        try:
+            await self.session.commit()
+        except exc.SQLAlchemyError as e:
+            raise exc.SQLAlchemyError(f"Error: {e}")
+
+    async def delete(self, employee: Employee) -> None:
+        """Delete an employee from the database."""
+        await self.repo.delete(employee)
+        try:
+            await self.session.commit()
+        except exc.SQLAlchemyError as e:
+            violation = constraint_violation(e)
+            if violation == ConstraintViolation(NOT_NULL, "salesperson_id"):
+                raise exc.SQLAlchemyError("Employee still assigned to a client.")
+            raise exc.SQLAlchemyError(f"Error trying to commit deletion: {e}")
+
+    async def reassign(
+        self,
+        from_id: int,
+        to_id: int,
+        clients: bool = False,
+        events: bool = False,
+    ) -> Tuple[int, int]:
+        """
+        Move the clients and/or events (archived ones included) of an employee to
+        another one, as EmployeeController.reassign. Return the number of clients
+        and events reassigned.
+        """
+        if from_id == to_id:
+            raise ValueError("Source and target employees must be different.")
+        old_employee = await self.repo.get_by_id(from_id)
+        if old_employee is None:
+            raise ValueError("Source employee not found.")
+        new_employee = await self.repo.get_by_id(to_id)
+        if new_employee is None:
+            raise ValueError("Target employee not found.")
+
+        if not clients and not events:
+            clients = old_employee.department.name == "Sales"
+            events = old_employee.department.name == "Support"
+            if not clients and not events:
+                raise ValueError("Specify what to reassign: clients and/or events.")
+        if clients and new_employee.department.name != "Sales":
+            raise ValueError("Clients can only be reassigned to a salesperson.")
+        if events and new_employee.department.name != "Support":
+            raise ValueError("Events can only be reassigned to a support person.")
+
+        clients_count, events_count = 0, 0
+        try:
+            if clients:
+                clients_count = await AsyncClientRepo(
+                    self.session
+                ).reassign_salesperson(from_id, to_id)
+                if clients_count is None:
+                    raise exc.SQLAlchemyError("Could not reassign clients.")
+            if events:
+                events_count = await AsyncEventRepo(
+                    self.session
+                ).reassign_support_person(from_id, to_id)
+                archived_count = await AsyncArchiveRepo(
+                    self.session
+                ).reassign_support_person(from_id, to_id)
+                if events_count is None or archived_count is None:
+                    raise exc.SQLAlchemyError("Could not reassign events.")
+                events_count += archived_count
+            record(
+                self.session,
+                self.user,
+                "employee.reassign",
+                f"{self.user} reassigned {clients_count} client(s) and "
+                f"{events_count} event(s) from {old_employee} to {new_employee}",
+            )
+            await self.session.commit()
+        except exc.SQLAlchemyError as e:
+            await self.session.rollback()
+            raise exc.SQLAlchemyError(f"Error: {e}")
+
+        return clients_count, events_count
+
+    async def get_all(self) -> Optional[List[Employee]]:
+        """Return all employees."""
+        return await self.repo.get_all()
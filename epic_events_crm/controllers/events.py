@@ -1,11 +1,27 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import datetime
+from sqlalchemy import exc
 
-from epic_events_crm.database import get_session
+from epic_events_crm.controllers.rules import (
+    check_can_update_event,
+    check_event_dates,
+    check_support_person,
+    dated_notes,
+    parse_datetime,
+)
+from epic_events_crm.database import (
+    ConcurrentUpdateError,
+    async_commit_or_conflict,
+    commit_with_retry,
+    get_session,
+)
 from epic_events_crm.authentication import get_current_user
 from epic_events_crm.models.events import Event
-from epic_events_crm.repositories.events import EventRepo
-from epic_events_crm.repositories.contracts import ContractRepo
+from epic_events_crm.repositories.events import AsyncEventRepo, EventRepo
+from epic_events_crm.repositories.archives import ArchiveRepo
+from epic_events_crm.repositories.contracts import AsyncContractRepo, ContractRepo
+from epic_events_crm.repositories.employees import AsyncEmployeeRepo, EmployeeRepo
+from epic_events_crm.scheduling import schedule_support
 
 
 class EventController:
@@ -19,6 +35,7 @@ class EventController:
         else:
             self.session = get_session()
         self.repo = EventRepo(self.session)
+        self.archive_repo = ArchiveRepo(self.session)
 
     def create(
         self,
@@ -43,19 +60,12 @@ class EventController:
         if contract.event is not None:
             raise ValueError("An event already exists for this contract.")
         # Convert dates to datetime if in expected format (YYYY-MM-DD HH:MM)
-        try:
-            start_datetime = datetime.strptime(start_date, "%Y-%m-%d %H:%M")
-            end_datetime = datetime.strptime(end_date, "%Y-%m-%d %H:%M")
-        except ValueError:
-            raise ValueError("Invalid date format. Use 'YYYY-MM-DD HH:MM'.")
-        # Check if start date is before end date
-        if start_datetime >= end_datetime:
-            raise ValueError("Start date must be before end date.")
+        start_datetime = parse_datetime(start_date)
+        end_datetime = parse_datetime(end_date)
+        check_event_dates(start_datetime, end_datetime)
         # Let's add a date to the notes
         if notes is not None:
-            dt = datetime.now()
-            formatted_date = dt.strftime("%Y-%m-%d %H:%M")
-            notes = f"{formatted_date}:\n {notes}"
+            notes = dated_notes(notes)
         # Create event
         event = Event(
             name=name.capitalize(),
@@ -91,37 +101,268 @@ class EventController:
         append: Optional[bool] = False,
         support_person_id: Optional[int] = None,
     ) -> None:
-        """Update an event's details."""
-        event = self.repo.get_by_id(event_id)
-        if event is None:
-            raise ValueError("Event not found.")
-        # Check if the current user is a support person
+        """
+        Update an event's details. Everything is checked before the event is changed.
+        Notes appended alone are appended again if the event was updated concurrently.
+        """
+        user = get_current_user()
+
+        def apply() -> None:
+            event = self.repo.get_by_id(event_id)
+            if event is None:
+                raise ValueError("Event not found.")
+            # Support people can only update events assigned to them
+            check_can_update_event(user, event)
+
+            # Convert dates to datetime if in expected format (YYYY-MM-DD HH:MM)
+            start_datetime = event.start_datetime
+            if start_date is not None:
+                start_datetime = parse_datetime(start_date)
+            end_datetime = event.end_datetime
+            if end_date is not None:
+                end_datetime = parse_datetime(end_date)
+            check_event_dates(start_datetime, end_datetime)
+            if support_person_id is not None:
+                # Check if support person exists and is indeed a support person
+                employee_repo = EmployeeRepo(self.session)
+                check_support_person(employee_repo.get_by_id(support_person_id))
+                event.support_person_id = support_person_id
+
+            # Update event's details
+            event.start_datetime = start_datetime
+            event.end_datetime = end_datetime
+            if name is not None:
+                event.name = name.capitalize()
+            if address_line is not None:
+                event.address_line1 = address_line
+            if city is not None:
+                event.city = city.title()
+            if country is not None:
+                event.country = country.upper()
+            if postal_code is not None:
+                event.postal_code = postal_code
+            if attendees_number is not None:
+                event.attendees_number = attendees_number
+
+            if notes is not None:
+                # Adapt behavior if append is True or False
+                event.notes = dated_notes(notes, event.notes if append else None)
+
+        # Appended notes keep the notes of others: they commute with other changes
+        notes_appended_only = (
+            notes is not None
+            and append
+            and all(
+                value is None
+                for value in (
+                    name,
+                    start_date,
+                    end_date,
+                    address_line,
+                    city,
+                    country,
+                    postal_code,
+                    attendees_number,
+                    support_person_id,
+                )
+            )
+        )
+        try:
+            commit_with_retry(
+                self.session, apply, f"Event {event_id}", retry=notes_appended_only
+            )
+        except (ValueError, PermissionError, ConcurrentUpdateError):
+            raise
+        except Exception as e:
+            raise ValueError(f"Error: {e}")
+
+    def get_all(self, include_archived: bool = False) -> Optional[List[Event]]:
+        """Return a list of all events, archived ones included if asked."""
+        events = self.repo.get_all()
+        if include_archived:
+            archived = self.archive_repo.get_all_events()
+            events = list(events or []) + list(archived or [])
+        return events
+
+    def get_starting_between(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Optional[List[Event]]:
+        """Return a list of events starting from start (included) to end (excluded)."""
+        return self.repo.get_starting_between(start, end)
+
+    def get_events_without_support(
+        self, include_archived: bool = False
+    ) -> Optional[List[Event]]:
+        """Return a list of all events without a support person."""
+        events = self.repo.get_events_assigned_to()
+        if include_archived:
+            archived = self.archive_repo.get_events_assigned_to()
+            events = list(events or []) + list(archived or [])
+        return events
+
+    def get_events_assigned_to_current_user(
+        self, include_archived: bool = False
+    ) -> Optional[List[Event]]:
+        """Return a list of all events assigned to the current user."""
+        current_user = get_current_user()
+        events = self.repo.get_events_assigned_to(current_user.id)
+        if include_archived:
+            archived = self.archive_repo.get_events_assigned_to(current_user.id)
+            events = list(events or []) + list(archived or [])
+        return events
+
+    def search(
+        self, text: str, include_archived: bool = False
+    ) -> Optional[List[Event]]:
+        """Return a list of events whose name contains the given text."""
+        events = self.repo.search_by_name(text)
+        if include_archived:
+            archived = self.archive_repo.search_events(text)
+            events = list(events or []) + list(archived or [])
+        return events
+
+    def auto_assign(
+        self, dry_run: bool = False, after: Optional[datetime] = None
+    ) -> Tuple[List[tuple], List[tuple]]:
+        """
+        Assign a support person to every event without one (and not over yet),
+        balancing the load and avoiding overlapping events for a same person.
+        All assignments are saved with a single UPDATE, unless dry_run is True.
+        Return the planned (event row, support person) pairs and the event rows
+        that could not be assigned.
+        """
         employee = get_current_user()
+        if employee is None:
+            raise ValueError("You must be logged in.")
         if employee.department.name == "Support":
-            # and if the event is assigned to them
-            if employee.id != event.support_person_id:
-                raise PermissionError("You can only update events assigned to you.")
+            raise PermissionError("Only managers can assign support people.")
 
-        # Convert dates to datetime if in expected format (YYYY-MM-DD HH:MM)
-        if start_date is not None:
+        after = after or datetime.now()
+        events = self.repo.get_unassigned_windows(after)
+        assignments = self.repo.get_assigned_windows(after)
+        if events is None or assignments is None:
+            raise ValueError("Could not load events.")
+        support_persons = {
+            support_person.id: support_person
+            for support_person in EmployeeRepo(self.session).get_by_department_name(
+                "Support"
+            )
+        }
+        if events and not support_persons:
+            raise ValueError("No employee in the support department.")
+
+        planning, _ = schedule_support(
+            [(event.id, event.start_datetime, event.end_datetime) for event in events],
+            assignments,
+            support_persons.keys(),
+        )
+        if planning and not dry_run:
             try:
-                start_datetime = datetime.strptime(start_date, "%Y-%m-%d %H:%M")
-                event.start_datetime = start_datetime
-            except ValueError:
-                raise ValueError("Invalid date format. Use 'YYYY-MM-DD HH:MM'.")
+                if self.repo.assign_support_persons(planning) is None:
+                    raise exc.SQLAlchemyError("Could not assign support persons.")
+                self.session.commit()
+            except exc.SQLAlchemyError as e:
+                self.session.rollback()
+                raise ValueError(f"Error: {e}")
+
+        planned = [
+            (event, support_persons[planning[event.id]])
+            for event in events
+            if event.id in planning
+        ]
+        unassigned = [event for event in events if event.id not in planning]
+        return planned, unassigned
+
+
+class AsyncEventController:
+    """
+    Event controller on an AsyncSession (see database.get_async_session), for a
+    server or daemon serving many users on one event loop: the current user is given
+    to the constructor instead of read from the environment. Same rules as
+    EventController. Archived events are not available there.
+    """
+
+    def __init__(self, session, user):
+        self.session = session
+        self.user = user
+        self.repo = AsyncEventRepo(self.session)
+
+    async def create(
+        self,
+        name: str,
+        start_date: str,
+        end_date: str,
+        address_line: str,
+        city: str,
+        country: str,
+        postal_code: str,
+        attendees_number: int,
+        contract_id: int,
+        notes: Optional[str] = None,
+    ) -> int:
+        """Create an event and add it to the database."""
+        contract = await AsyncContractRepo(self.session).get_by_id(contract_id)
+        if contract is None:
+            raise ValueError("Contract not found.")
+        if contract.event is not None:
+            raise ValueError("An event already exists for this contract.")
+        start_datetime = parse_datetime(start_date)
+        end_datetime = parse_datetime(end_date)
+        check_event_dates(start_datetime, end_datetime)
+        event = Event(
+            name=name.capitalize(),
+            start_datetime=start_datetime,
+            end_datetime=end_datetime,
+            address_line1=address_line,
+            city=city.title(),
+            country=country.upper(),
+            postal_code=postal_code,
+            attendees_number=attendees_number,
+            contract=contract,
+            notes=dated_notes(notes) if notes is not None else None,
+        )
+        self.repo.add(event)
+        try:
+            await self.session.commit()
+            return event.id
+        except Exception as e:
+            raise ValueError(f"Error: {e}")
+
+    async def update(
+        self,
+        event_id: int,
+        name: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        address_line: Optional[str] = None,
+        city: Optional[str] = None,
+        country: Optional[str] = None,
+        postal_code: Optional[str] = None,
+        attendees_number: Optional[int] = None,
+        notes: Optional[str] = None,
+        append: Optional[bool] = False,
+        support_person_id: Optional[int] = None,
+    ) -> None:
+        """Update an event's details."""
+        event = await self.repo.get_by_id(event_id)
+        if event is None:
+            raise ValueError("Event not found.")
+        check_can_update_event(self.user, event)
+        # Everything is checked before changing the event
+        start_datetime = event.start_datetime
+        if start_date is not None:
+            start_datetime = parse_datetime(start_date)
+        end_datetime = event.end_datetime
         if end_date is not None:
-            try:
-                end_datetime = datetime.strptime(end_date, "%Y-%m-%d %H:%M")
-                event.end_datetime = end_datetime
-            except ValueError:
-                raise ValueError("Invalid date format. Use 'YYYY-MM-DD HH:MM'.")
-
-        # Check if start date is before end date
-        if event.start_datetime >= event.end_datetime:
-            # Revert changes and raise error
-            self.session.rollback()
-            raise ValueError("Start date must be before end date.")
-        # Update event's details
+            end_datetime = parse_datetime(end_date)
+        check_event_dates(start_datetime, end_datetime)
+        if support_person_id is not None:
+            employee_repo = AsyncEmployeeRepo(self.session)
+            check_support_person(await employee_repo.get_by_id(support_person_id))
+            event.support_person_id = support_person_id
+
+        event.start_datetime = start_datetime
+        event.end_datetime = end_datetime
         if name is not None:
             event.name = name.capitalize()
         if address_line is not None:
@@ -134,46 +375,33 @@ class EventController:
             event.postal_code = postal_code
         if attendees_number is not None:
             event.attendees_number = attendees_number
-
         if notes is not None:
-            dt = datetime.now()
-            formatted_date = dt.strftime("%Y-%m-%d %H:%M")
-            notes = f"{formatted_date}:\n {notes}"
-            # Adapt behavior if append is True or False
-            if append:
-                # += operator can't be used if notes is None
-                if event.notes is None:
-                    event.notes = notes
-                else:
-                    event.notes += f"\n{notes}"
-            else:
-                event.notes = notes
-
-        if support_person_id is not None:
-            # Check if support person exists and is indeed a support person
-            from epic_events_crm.repositories.employees import EmployeeRepo
-
-            employee_repo = EmployeeRepo(self.session)
-            support_person = employee_repo.get_by_id(support_person_id)
-            if support_person is None:
-                raise ValueError("Support person not found.")
-            if support_person.department.name != "Support":
-                raise ValueError("Employee is not from support department.")
-            event.support_person_id = support_person_id
+            event.notes = dated_notes(notes, event.notes if append else None)
         try:
-            self.session.commit()
+            await async_commit_or_conflict(self.session, f"Event {event_id}")
+        except ConcurrentUpdateError:
+            raise
         except Exception as e:
             raise ValueError(f"Error: {e}")
 
-    def get_all(self) -> Optional[List[Event]]:
+    async def get_all(self) -> Optional[List[Event]]:
         """Return a list of all events."""
-        return self.repo.get_all()
+        return await self.repo.get_all()
 
-    def get_events_without_support(self) -> Optional[List[Event]]:
+    async def get_starting_between(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Optional[List[Event]]:
+        """Return a list of events starting from start (included) to end (excluded)."""
+        return await self.repo.get_starting_between(start, end)
+
+    async def get_events_without_support(self) -> Optional[List[Event]]:
         """Return a list of all events without a support person."""
-        return self.repo.get_events_assigned_to()
+        return await self.repo.get_events_assigned_to()
 
-    def get_events_assigned_to_current_user(self) -> Optional[List[Event]]:
+    async def get_events_assigned_to_current_user(self) -> Optional[List[Event]]:
         """Return a list of all events assigned to the current user."""
-        current_user = get_current_user()
-        return self.repo.get_events_assigned_to(current_user.id)
+        return await self.repo.get_events_assigned_to(self.user.id)
+
+    async def search(self, text: str) -> Optional[List[Event]]:
+        """Return a list of events whose name contains the given text."""
+        return await self.repo.search_by_name(text)
@@ -0,0 +1,175 @@
+"""
+Listings fetched lazily, for the interactive pager of the list commands: rows are
+read by keyset pages, and a page is only fetched once the previous one is being
+read. The pager reads its input as the user scrolls and writing to it blocks
+meanwhile, so pages the user never scrolls to are never loaded.
+A background thread fetches one page ahead of the reader, with a session of its own
+(a SQLAlchemy session must not be shared between threads). What the views display
+is loaded with the rows, before that session is closed. On a single connection
+(in-memory SQLite), pages are fetched by the reader instead, when it asks for them.
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from queue import Queue
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import exc, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql import Select
+
+from epic_events_crm.authentication import get_current_user
+from epic_events_crm.controllers.dashboard import display_loads
+from epic_events_crm.database import get_session
+from epic_events_crm.models.clients import Client
+from epic_events_crm.models.contracts import Contract
+from epic_events_crm.models.employees import Employee
+from epic_events_crm.models.events import Event
+from epic_events_crm.repositories.clients import (
+    select_assigned_to as select_clients_assigned_to,
+)
+from epic_events_crm.repositories.contracts import (
+    SELECT_UNPAID,
+    SELECT_UNSIGNED,
+    SELECT_WITHOUT_EVENT,
+)
+from epic_events_crm.repositories.events import (
+    select_assigned_to as select_events_assigned_to,
+    select_starting_between,
+)
+from epic_events_crm.repositories.pages import PageRepo
+
+
+@dataclass
+class Listing:
+    """
+    Statement of a list command, kind being clients, contracts, employees or events.
+    Its rows are ordered by keys, the last one unique.
+    """
+
+    kind: str
+    statement: Select
+    keys: Tuple
+
+
+class ListingController:
+    """
+    Listing controller. If no session is provided to constructor, a new one is
+    created: only its engine is used, pages are fetched with a session of their own.
+    """
+
+    def __init__(self, session=None):
+        if session is not None:
+            self.session = session
+        else:
+            self.session = get_session()
+
+    def employees(self) -> Listing:
+        """All employees, as EmployeeController.get_all."""
+        return Listing("employees", select(Employee), (Employee.id,))
+
+    def clients(self, mine: bool = False) -> Listing:
+        """All clients by company name, or those of the current user."""
+        if mine:
+            statement = select_clients_assigned_to(get_current_user().id)
+            return Listing("clients", statement, (Client.id,))
+        # NULL company names first, as they are sorted by MySQL and SQLite
+        company_name = func.coalesce(Client.company_name, "")
+        return Listing("clients", select(Client), (company_name, Client.id))
+
+    def contracts(
+        self, unpaid: bool = False, unsigned: bool = False, noevent: bool = False
+    ) -> Listing:
+        """All contracts, or those of one of the flags of get_depending_on_flags."""
+        if sum([unpaid, unsigned, noevent]) > 1:
+            raise ValueError("unpaid, unsigned and noevent are mutually exclusive.")
+        statement = select(Contract)
+        if unsigned:
+            statement = SELECT_UNSIGNED
+        elif unpaid:
+            statement = SELECT_UNPAID
+        elif noevent:
+            statement = SELECT_WITHOUT_EVENT
+        return Listing("contracts", statement, (Contract.id,))
+
+    def events(
+        self,
+        nosupport: bool = False,
+        mine: bool = False,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Listing:
+        """
+        Events by start date from start to end if any is given, else those without
+        support, those of the current user or all of them, as list-events.
+        """
+        if start or end:
+            statement = select_starting_between(start, end)
+            return Listing("events", statement, (Event.start_datetime, Event.id))
+        if nosupport:
+            statement = select_events_assigned_to()
+        elif mine:
+            statement = select_events_assigned_to(get_current_user().id)
+        else:
+            statement = select(Event)
+        return Listing("events", statement, (Event.id,))
+
+    def get_pages(self, listing: Listing, page_size: int) -> Iterator[List]:
+        """
+        Yield the pages of a listing. Each one is fetched by a background thread
+        while the previous one is read: one page ahead, no more (on a single
+        connection, only once asked for). Closing the generator stops the fetching.
+        """
+        engine = self.session.get_bind()
+        statement = listing.statement.options(*display_loads(listing.kind))
+        if isinstance(engine.pool, StaticPool):
+            # a single connection (in-memory SQLite): fetched here, no page ahead
+            repo = PageRepo(self.session)
+            after = None
+            while True:
+                page = repo.get_page(statement, listing.keys, after, page_size)
+                if page is None:
+                    raise exc.SQLAlchemyError("Could not get the next page.")
+                rows, after = page
+                yield rows
+                if len(rows) < page_size:
+                    return
+        pages: Queue = Queue()
+        wanted = threading.Semaphore(2)  # the page read and the one ahead
+        stopped = threading.Event()
+
+        def fetch() -> None:
+            after = None
+            try:
+                with Session(engine) as session:
+                    repo = PageRepo(session)
+                    while True:
+                        wanted.acquire()
+                        if stopped.is_set():
+                            return
+                        page = repo.get_page(statement, listing.keys, after, page_size)
+                        if page is None:
+                            raise exc.SQLAlchemyError("Could not get the next page.")
+                        rows, after = page
+                        pages.put(rows)
+                        if len(rows) < page_size:
+                            pages.put(None)
+                            return
+            except Exception as e:
+                pages.put(e)
+
+        threading.Thread(target=fetch, name="listing-prefetch", daemon=True).start()
+        try:
+            while True:
+                page = pages.get()
+                if page is None:
+                    return
+                if isinstance(page, Exception):
+                    raise page
+                yield page
+                wanted.release()  # read: the page after the next one can be fetched
+        finally:
+            stopped.set()
+            wanted.release()
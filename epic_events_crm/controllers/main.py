@@ -3,6 +3,9 @@ from epic_events_crm.controllers.employees import EmployeeController
 from epic_events_crm.controllers.clients import ClientController
 from epic_events_crm.controllers.contracts import ContractController
 from epic_events_crm.controllers.events import EventController
+from epic_events_crm.controllers.archives import ArchiveController
+from epic_events_crm.controllers.dashboard import DashboardController
+from epic_events_crm.controllers.listings import ListingController
 
 
 class MainController:
@@ -20,3 +23,6 @@ class MainController:
         self.clients = ClientController(self.session)
         self.contracts = ContractController(self.session)
         self.events = EventController(self.session)
+        self.archives = ArchiveController(self.session)
+        self.dashboard = DashboardController(self.session)
+        self.listings = ListingController(self.session)
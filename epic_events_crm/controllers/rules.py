@@ -0,0 +1,128 @@
+"""
+Business rules shared by the controllers and their async variants: the checks and
+changes that do not need the database. Callers load what a rule needs, with a
+blocking or an async session, then apply it.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from epic_events_crm.utilities import (
+    is_email_valid,
+    is_phone_valid,
+    remove_spaces_and_hyphens,
+)
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def format_names(fname: str, lname: str) -> Tuple[str, str]:
+    """Return first and last names as stored: capitalized and upper case."""
+    return fname.title(), lname.upper()
+
+
+def available_departments(departments) -> str:
+    """Return the list of departments and their id, for error messages."""
+    msg = "Availables departments:\n"
+    for department in departments:
+        msg += f"{department.name.upper()} (id:{department.id})\n"
+    return msg
+
+
+def check_new_email(email: str, owner) -> None:
+    """Raise ValueError if an email is invalid or already used by owner."""
+    if not is_email_valid(email):
+        raise ValueError("Invalid email.")
+    if owner:
+        raise ValueError("Email already in use.")
+
+
+def clean_phone(phone: str) -> str:
+    """Return a phone number without spaces and hyphens. Raise if invalid."""
+    phone = remove_spaces_and_hyphens(phone)
+    if not is_phone_valid(phone):
+        raise ValueError("Invalid phone number.")
+    return phone
+
+
+def check_salesperson(employee) -> None:
+    """Raise ValueError if a (loaded) employee is missing or not a salesperson."""
+    if not employee:
+        raise ValueError("Employee not found.")
+    if employee.department.name != "Sales":
+        raise ValueError("Employee must be a salesperson.")
+
+
+def check_support_person(employee) -> None:
+    """Raise ValueError if a (loaded) employee is missing or not a support person."""
+    if employee is None:
+        raise ValueError("Support person not found.")
+    if employee.department.name != "Support":
+        raise ValueError("Employee is not from support department.")
+
+
+def check_can_update_client(user, client) -> None:
+    """Only the salesperson assigned to a client can update it."""
+    if client.salesperson_id != user.id:
+        raise PermissionError("You are not assigned to this client.")
+
+
+def check_can_update_contract(user, contract) -> None:
+    """Salespeople can only update the contracts of their clients."""
+    if user.department.name == "Sales" and user.id != contract.client.salesperson_id:
+        raise PermissionError("You can only update contracts of your clients.")
+
+
+def check_can_update_event(user, event) -> None:
+    """Support people can only update the events assigned to them."""
+    if user.department.name == "Support" and user.id != event.support_person_id:
+        raise PermissionError("You can only update events assigned to you.")
+
+
+def apply_contract_changes(
+    contract,
+    total_amount: Optional[float] = None,
+    paid_amount: Optional[float] = None,
+    signed: Optional[bool] = None,
+) -> bool:
+    """
+    Update the amounts and signed status of a contract: a new total amount changes
+    the due amount as much, a payment reduces it. Return True if the contract has
+    just been signed.
+    """
+    # Contract model uses Decimal(15, 2)
+    if total_amount is not None:
+        total_amount = Decimal(total_amount)
+        difference = total_amount - contract.total_amount
+        contract.total_amount = total_amount
+        contract.due_amount += difference
+    if paid_amount is not None:
+        contract.due_amount -= Decimal(paid_amount)
+    newly_signed = False
+    if signed is not None:
+        newly_signed = not contract.signed and signed
+        contract.signed = signed
+    return newly_signed
+
+
+def parse_datetime(value: str) -> datetime:
+    """Return the datetime of a YYYY-MM-DD HH:MM string. Raise ValueError if not."""
+    try:
+        return datetime.strptime(value, DATETIME_FORMAT)
+    except ValueError:
+        raise ValueError("Invalid date format. Use 'YYYY-MM-DD HH:MM'.")
+
+
+def check_event_dates(start: datetime, end: datetime) -> None:
+    """Raise ValueError if an event does not start before it ends."""
+    if start >= end:
+        raise ValueError("Start date must be before end date.")
+
+
+def dated_notes(notes: str, previous: Optional[str] = None) -> str:
+    """Return notes prefixed with the current date, after the previous ones if any."""
+    notes = f"{datetime.now().strftime(DATETIME_FORMAT)}:\n {notes}"
+    if previous is None:
+        return notes
+    return f"{previous}\n{notes}"
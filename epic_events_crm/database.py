@@ -1,17 +1,112 @@
+import configparser
 import getpass
 import os
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, Optional, TypeVar
 
 from cryptography.fernet import Fernet
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, inspect
-from sqlalchemy.engine import URL
+from sqlalchemy import create_engine, event, exc, inspect
+from sqlalchemy.engine import URL, Engine, make_url
 from sqlalchemy.orm import Session
+from sqlalchemy.orm import exc as orm_exc
+from sqlalchemy.pool import StaticPool
+
+from epic_events_crm.slowlog import slow_query_log
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+# get infos from the config file, regardless of the current working directory
+dir_path = os.path.dirname(os.path.realpath(__file__))
+config = configparser.ConfigParser()
+config.read(os.path.join(dir_path, "config.ini"))
+
+BACKENDS = ("mysql", "sqlite")
+# Async drivers of the backends, for get_async_session
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "mysql": "mysql+aiomysql"}
+T = TypeVar("T")
+# In-memory SQLite engines, shared so that every session sees the same database
+memory_engines: Dict[str, Engine] = {}
+# Async engines by URL: one connection pool per database and process
+async_engines: Dict[str, "AsyncEngine"] = {}
+
+
+def get_backend() -> str:
+    """Return the configured backend, EECRM_BACKEND overriding config.ini."""
+    load_dotenv()
+    backend = os.getenv("EECRM_BACKEND") or config.get(
+        "database", "backend", fallback="mysql"
+    )
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}.")
+    return backend
+
+
+def make_sqlite_url(path: str) -> URL:
+    """Return the URL of a SQLite database file, in memory for :memory: or empty."""
+    if path in ("", ":memory:"):
+        return URL.create("sqlite")
+    return URL.create("sqlite", database=os.path.expanduser(path))
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Enforce foreign keys (off by default on SQLite), wait for locks up to 5s."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def set_sqlite_wal(dbapi_connection, connection_record) -> None:
+    """
+    For database files only, use the write-ahead log: readers no longer block the
+    writer, and commits are cheaper.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def listen_sqlite_connect(engine: Engine, in_memory: bool) -> None:
+    """Set the pragmas of set_sqlite_pragmas (and set_sqlite_wal for files)."""
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    if not in_memory:
+        event.listen(engine, "connect", set_sqlite_wal)
+
+
+def make_engine(url: URL) -> Engine:
+    """Return an engine for a database URL, set up for its backend."""
+    if url.get_backend_name() != "sqlite":
+        return create_engine(url)
+    in_memory = url.database in (None, "", ":memory:")
+    if in_memory and str(url) in memory_engines:
+        return memory_engines[str(url)]
+    engine = create_engine(
+        url,
+        # one connection for the whole process: an in-memory database lives and
+        # dies with its connection
+        poolclass=StaticPool if in_memory else None,
+        connect_args={"check_same_thread": False},
+    )
+    listen_sqlite_connect(engine, in_memory)
+    if in_memory:
+        memory_engines[str(url)] = engine
+    return engine
 
 
 def make_db_url() -> URL:
     """Use the .env file to build and return a database URL object."""
     # Load the environment variables from the .env file
     load_dotenv()
+    # A complete URL (used by the benchmarks) takes precedence over the settings
+    if os.getenv("EECRM_DB_URL"):
+        return make_url(os.getenv("EECRM_DB_URL"))
+    if get_backend() == "sqlite":
+        return make_sqlite_url(config.get("database", "sqlite_path", fallback=""))
     db_user = os.getenv("APP_USER")
     db_host = os.getenv("DB_HOST")
     db_port = os.getenv("DB_PORT")
@@ -37,16 +132,43 @@ def make_db_url() -> URL:
 
 
 def get_session() -> Session:
-    """Return a SQLAlchemy session."""
-    engine = create_engine(make_db_url())
+    """Return a SQLAlchemy session. Its slow statements go to the slow query log."""
+    engine = make_engine(make_db_url())
+    slow_query_log.attach(engine)
     session = Session(engine)
     return session
 
 
+@contextmanager
+def deferred_commits(session: Session) -> Iterator[Callable[[], None]]:
+    """
+    Context manager making session.commit() only flush, so that the commits done by
+    controllers can be grouped. Flushing still raises integrity errors right away.
+    Yield the real commit function, the caller is responsible for calling it.
+    """
+    real_commit = session.commit
+    session.commit = session.flush
+    session.info["deferred_commits"] = True
+    try:
+        yield real_commit
+    finally:
+        del session.commit  # back to the regular Session.commit method
+        del session.info["deferred_commits"]
+
+
+def is_deferred(session: Session) -> bool:
+    """Return True if the commits of the session are deferred (batch mode)."""
+    return session.info.get("deferred_commits", False)
+
+
 def make_test_db_url() -> URL:
     """Use the .env file to build and return the test database URL object."""
     # Load the environment variables from the .env file
     load_dotenv()
+    if get_backend() == "sqlite":
+        return make_sqlite_url(
+            config.get("database", "sqlite_test_path", fallback=":memory:")
+        )
     db_user = os.getenv("APP_USER")
     db_host = os.getenv("DB_HOST")
     db_port = os.getenv("DB_PORT")
@@ -73,11 +195,164 @@ def make_test_db_url() -> URL:
 
 def get_test_session() -> Session:
     """Return a SQLAlchemy session for testing purposes."""
-    engine = create_engine(make_test_db_url())
+    engine = make_engine(make_test_db_url())
     session = Session(engine)
     return session
 
 
+def make_async_engine(url: URL) -> "AsyncEngine":
+    """
+    Return the async engine of a database URL, with the async driver of its backend
+    (aiosqlite or aiomysql, to be installed). Engines are created once per URL, so
+    that all the sessions of an event loop share their connection pool.
+    """
+    # Only servers and daemons need asyncio: not imported by the CLI
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+    if str(url) in async_engines:
+        return async_engines[str(url)]
+    if url.get_backend_name() != "sqlite":
+        engine = create_async_engine(url)
+    else:
+        in_memory = url.database in (None, "", ":memory:")
+        engine = create_async_engine(url, poolclass=StaticPool if in_memory else None)
+        listen_sqlite_connect(engine.sync_engine, in_memory)
+    slow_query_log.attach(engine.sync_engine)
+    async_engines[str(url)] = engine
+    return engine
+
+
+def get_async_session(test: bool = False) -> "AsyncSession":
+    """
+    Return an AsyncSession, on the test database if test is True. Its objects are
+    not expired on commit: attributes cannot be lazily refreshed with asyncio.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    engine = make_async_engine(make_test_db_url() if test else make_db_url())
+    return AsyncSession(engine, expire_on_commit=False)
+
+
+FOREIGN_KEY, NOT_NULL, UNIQUE, CHECK = "foreign key", "not null", "unique", "check"
+# MySQL error codes of constraint violations
+MYSQL_CONSTRAINT_ERRORS = {
+    1048: NOT_NULL,
+    1062: UNIQUE,
+    1216: FOREIGN_KEY,
+    1217: FOREIGN_KEY,
+    1451: FOREIGN_KEY,
+    1452: FOREIGN_KEY,
+    3819: CHECK,
+}
+SQLITE_CONSTRAINT_ERRORS = {
+    "NOT NULL constraint failed": NOT_NULL,
+    "UNIQUE constraint failed": UNIQUE,
+    "FOREIGN KEY constraint failed": FOREIGN_KEY,
+    "CHECK constraint failed": CHECK,
+}
+# Where the column is named in the messages of both backends
+COLUMN_PATTERNS = (
+    re.compile(r"Column '(\w+)'"),  # MySQL not null
+    re.compile(r"FOREIGN KEY \(`(\w+)`\)"),  # MySQL foreign key
+    re.compile(r"for key '(?:\w+\.)?(\w+)'"),  # MySQL unique (key name)
+    re.compile(r"constraint failed: \w+\.(\w+)"),  # SQLite
+)
+
+
+@dataclass
+class ConstraintViolation:
+    """The constraint an integrity error was raised for, whatever the backend."""
+
+    kind: str
+    column: Optional[str] = None
+
+
+def constraint_violation(error: Exception) -> Optional[ConstraintViolation]:
+    """
+    Return the constraint violated by an integrity error, from the MySQL error code
+    or the SQLite message. None if the error is not a constraint violation.
+    """
+    if not isinstance(error, exc.IntegrityError):
+        return None
+    args = getattr(error.orig, "args", ())
+    if args and isinstance(args[0], int):
+        kind = MYSQL_CONSTRAINT_ERRORS.get(args[0])
+        message = str(args[1]) if len(args) > 1 else ""
+    else:
+        message = str(error.orig)
+        kind = next(
+            (k for text, k in SQLITE_CONSTRAINT_ERRORS.items() if text in message),
+            None,
+        )
+    if kind is None:
+        return None
+    for pattern in COLUMN_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return ConstraintViolation(kind, match.group(1))
+    return ConstraintViolation(kind)
+
+
+CONFLICT_MESSAGE = "was changed by someone else in the meantime, please retry."
+
+
+class ConcurrentUpdateError(exc.SQLAlchemyError):
+    """
+    A versioned row (version_id column of clients, contracts and events) was changed
+    by someone else between its read and its update. Nothing was saved: running the
+    command again works on the new version.
+    """
+
+
+def commit_with_retry(
+    session: Session,
+    apply: Callable[[], T],
+    description: str,
+    retry: bool = False,
+    attempts: Optional[int] = None,
+) -> T:
+    """
+    Run apply, which reads rows and changes them, then commit and return its result.
+    If a row was changed by another transaction in between, the session is rolled
+    back. Changes commuting with any other one (a payment, appended notes) are then
+    applied again on the new versions, up to attempts times in all. Otherwise, or
+    once out of attempts, raise ConcurrentUpdateError.
+    """
+    attempts = attempts or config.getint("database", "commit_attempts", fallback=3)
+    # Deferred commits (batch mode) only flush: the caller rolls back their group
+    deferred = is_deferred(session)
+    for attempt in range(1, attempts + 1):
+        result = apply()
+        try:
+            session.commit()
+            return result
+        except orm_exc.StaleDataError as e:
+            if deferred or not retry or attempt == attempts:
+                if not deferred:
+                    session.rollback()
+                raise ConcurrentUpdateError(f"{description} {CONFLICT_MESSAGE}") from e
+            session.rollback()
+
+
+def commit_or_conflict(session: Session, description: str) -> None:
+    """Commit, raising ConcurrentUpdateError on a version conflict (not retried)."""
+    commit_with_retry(session, lambda: None, description)
+
+
+async def async_commit_or_conflict(session: "AsyncSession", description: str) -> None:
+    """
+    Commit an AsyncSession, raising ConcurrentUpdateError on a version conflict. The
+    async controllers do not retry: the rollback expires the user they were given,
+    which cannot be lazily reloaded. Their callers retry the whole request.
+    """
+    try:
+        await session.commit()
+    except orm_exc.StaleDataError as e:
+        await session.rollback()
+        raise ConcurrentUpdateError(f"{description} {CONFLICT_MESSAGE}") from e
+
+
 def get_state_name(obj) -> str:
     """An utility function to the state of an object."""
     inspector = inspect(obj)
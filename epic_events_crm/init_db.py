@@ -10,6 +10,7 @@ secure enough and safe from unauthorized access.
 """
 
 import configparser
+import datetime
 import getpass
 import importlib
 import os
@@ -19,9 +20,56 @@ import click
 import pymysql
 from cryptography.fernet import Fernet
 from dotenv import set_key, load_dotenv
+from epic_events_crm.partitioning import get_partitioning_config, roll_forward_statement
 from epic_events_crm.views.base import BaseView
 
 view = BaseView()
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entries the app needs, as added by migration 3c8668712499 on MySQL
+REQUIRED_DEPARTMENTS = ("Superuser", "Management", "Sales", "Support")
+REQUIRED_PERMISSIONS = (
+    "create_employee",
+    "update_employee",
+    "delete_employee",
+    "create_client",
+    "update_client",
+    "delete_client",
+    "create_contract",
+    "update_contract",
+    "delete_contract",
+    "create_event",
+    "update_event",
+    "delete_event",
+)
+DEPARTMENTS_PERMISSIONS = {
+    "Management": (
+        "create_employee",
+        "update_employee",
+        "delete_employee",
+        "create_contract",
+        "update_contract",
+        "update_event",
+    ),
+    "Sales": (
+        "create_client",
+        "update_client",
+        "delete_client",
+        "update_contract",
+        "create_event",
+    ),
+    "Support": ("update_event",),
+}
+MODELS_MODULES = (
+    "epic_events_crm.models.departments_permissions",
+    "epic_events_crm.models.employees",
+    "epic_events_crm.models.clients",
+    "epic_events_crm.models.contracts",
+    "epic_events_crm.models.events",
+    "epic_events_crm.models.archives",
+    "epic_events_crm.models.sessions",
+    "epic_events_crm.models.audit",
+)
 
 
 def connect_to_mysql_instance(user, host, password, port=3306):
@@ -83,6 +131,34 @@ config = configparser.ConfigParser()
 config.read(config_file_path)
 
 
+def create_schema(engine) -> None:
+    """
+    Create the tables from the models, with the departments and permissions the app
+    needs. Used for backends the MySQL migrations do not apply to (SQLite).
+    """
+    from sqlalchemy.orm import Session
+
+    from epic_events_crm.models import Base
+
+    for module in MODELS_MODULES:
+        importlib.import_module(module)
+    from epic_events_crm.models.departments_permissions import Department, Permission
+
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        if session.query(Department).first() is not None:
+            return
+        permissions = {name: Permission(name=name) for name in REQUIRED_PERMISSIONS}
+        for name in REQUIRED_DEPARTMENTS:
+            department = Department(name=name)
+            department.permissions = [
+                permissions[permission]
+                for permission in DEPARTMENTS_PERMISSIONS.get(name, ())
+            ]
+            session.add(department)
+        session.commit()
+
+
 @click.group()
 def init():
     pass
@@ -225,6 +301,35 @@ def initialize_test_database(user):
         raise err
 
 
+@init.command(name="sqlite-db", short_help="Initialize the SQLite database.")
+@click.option("--test", "-t", is_flag=True, help="Initialize the test database.")
+def initialize_sqlite_database(test):
+    """
+    Create the SQLite database (backend = sqlite in config.ini) with its tables and
+    required entries, and mark it as up to date for alembic.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    from epic_events_crm.database import make_db_url, make_engine, make_test_db_url
+
+    url = make_test_db_url() if test else make_db_url()
+    if url.get_backend_name() != "sqlite":
+        view.display_as("The configured backend is not SQLite.", "error")
+        sys.exit(1)
+    if url.database:
+        os.makedirs(os.path.dirname(url.database) or ".", exist_ok=True)
+    create_schema(make_engine(url))
+    # Tables are created from the models: later migrations start from there
+    alembic_config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    alembic_config.set_main_option(
+        "script_location", os.path.join(PROJECT_ROOT, "alembic")
+    )
+    alembic_config.set_main_option("sqlalchemy.url", str(url))
+    command.stamp(alembic_config, "head")
+    view.display_as(f"SQLite database ready: {url.database or 'in memory'}.", "info")
+
+
 @init.command(name="jwt-key", short_help="Set the JWT secret key.")
 def set_jwt_secret():
     """Set the JWT_SECRET in the .env file."""
@@ -271,5 +376,96 @@ def create_superuser():
         view.display_as(f"Error creating superuser: {e}", "error")
 
 
+@init.command(name="roll-partitions", short_help="Add upcoming events partitions.")
+@click.option("--test", "-t", is_flag=True, help="Use the test database.")
+@click.option("--dry-run", "-dr", is_flag=True, help="Only display the statement.")
+def roll_partitions(test, dry_run):
+    """
+    Split the last (catch-all) partition of the events table so that each period
+    up to 'periods_ahead' after the current one has its own partition. Granularity
+    and periods_ahead are read from config.ini. Meant to be run regularly (cron).
+    """
+    load_dotenv()
+    db_name = os.getenv("DB_TEST_NAME") if test else os.getenv("DB_NAME")
+    if os.getenv("EECRM_KEY"):
+        key = os.getenv("EECRM_KEY")
+    else:
+        key = view.ask_app_key()
+    fernet = Fernet(key)
+    password = fernet.decrypt(os.getenv("MIGRATIONS_PWD").encode()).decode()
+    connection = connect_to_mysql_instance(
+        os.getenv("MIGRATIONS_USER"),
+        os.getenv("DB_HOST"),
+        password,
+        int(os.getenv("DB_PORT")),
+    )
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'events' "
+                "ORDER BY PARTITION_ORDINAL_POSITION",
+                (db_name,),
+            )
+            existing_names = [row[0] for row in cursor.fetchall() if row[0]]
+            if "pmax" not in existing_names:
+                view.display_as("Events table is not partitioned.", "error")
+                sys.exit(1)
+
+            granularity, periods_ahead = get_partitioning_config()
+            statement = roll_forward_statement(
+                existing_names, datetime.date.today(), periods_ahead, granularity
+            )
+            if statement is None:
+                view.display_as("Partitions already up to date.", "info")
+                return
+            view.display_msg(statement)
+            if not dry_run:
+                cursor.execute(f"USE {db_name}")
+                cursor.execute(statement)
+                view.display_as("Partitions added.", "info")
+    except pymysql.Error as err:
+        view.display_as(f"Error adding partitions: {err}", "error")
+        sys.exit(1)
+
+
+@init.command(name="seed", short_help="Fill the database with synthetic data.")
+@click.option("--employees", "-e", type=int, default=0, help="Employees to add.")
+@click.option("--clients", "-c", type=int, default=0, help="Clients to add.")
+@click.option("--contracts", "-co", type=int, default=0, help="Contracts to add.")
+@click.option("--events", "-ev", type=int, default=0, help="Events to add.")
+@click.option("--seed", "-s", type=int, default=0, help="Random seed.")
+@click.option("--batch-size", "-b", type=int, default=5000, help="Rows per insert.")
+@click.option("--password", "-p", default="Passw0rd", help="Employees password.")
+@click.option("--test", "-t", is_flag=True, help="Use the test database.")
+def seed(employees, clients, contracts, events, seed, batch_size, password, test):
+    """
+    Add realistic and referentially valid synthetic data, the same for a given
+    seed and counts. Rows are added after the existing ones. Clients go to seeded
+    salespeople (existing ones if no employee is added), events to seeded contracts,
+    which must be at least as many. All seeded employees share the same password.
+    """
+    from epic_events_crm.database import make_db_url, make_engine, make_test_db_url
+    from epic_events_crm.seeding import seed_database
+
+    engine = make_engine(make_test_db_url() if test else make_db_url())
+    with engine.connect() as connection:
+        counts = {
+            "employees": employees,
+            "clients": clients,
+            "contracts": contracts,
+            "events": events,
+        }
+        try:
+            for table_name, count, seconds in seed_database(
+                connection, counts, seed, batch_size, password
+            ):
+                message = f"{count} {table_name} added in {seconds:.1f}s."
+                view.display_as(message, "info")
+        except ValueError as e:
+            raise click.UsageError(str(e))
+
+
 if __name__ == "__main__":
     init()
@@ -0,0 +1,181 @@
+"""
+On-disk cache of the rendered output of list commands. Before reusing an entry, a
+single cheap query probes MAX(last_updated) and COUNT(*) of every table the listing
+depends on: if nothing changed since the entry was stored, it is still valid.
+"""
+
+import configparser
+import hashlib
+import json
+import os
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import exc, func, select
+from sqlalchemy.orm import Session
+
+from epic_events_crm.authentication import get_current_user
+from epic_events_crm.metrics import metrics
+from epic_events_crm.models import Base
+from epic_events_crm.permissions import permissions_names
+from epic_events_crm.views.base import BaseView
+from epic_events_crm.views.console import captured, console, interactive, write_text
+
+# get infos from the config file, regardless of the current working directory
+dir_path = os.path.dirname(os.path.realpath(__file__))
+config = configparser.ConfigParser()
+config.read(os.path.join(dir_path, "config.ini"))
+
+# Columns telling when rows were last changed, by order of preference
+STAMP_COLUMNS = ("last_updated", "archived_at")
+
+
+def probe(session: Session, table_names: Iterable[str]) -> List:
+    """
+    Return [MAX(stamp), COUNT(*)] of each table followed by the database NOW(),
+    all in one round trip. Tables without a stamp column only get a count.
+    """
+    columns = []
+    for name in table_names:
+        table = Base.metadata.tables[name]
+        stamp = next((table.c[c] for c in STAMP_COLUMNS if c in table.c), None)
+        if stamp is not None:
+            columns.append(select(func.max(stamp)).scalar_subquery())
+        columns.append(select(func.count()).select_from(table).scalar_subquery())
+    columns.append(func.now())
+    return list(session.execute(select(*columns)).one())
+
+
+def changed_this_second(current_probe: List) -> bool:
+    """
+    Return True if a probed table changed during the current second of the database
+    (last value of the probe). DATETIME has a one second precision: a later change
+    in that same second would leave the probe unchanged.
+    """
+    *values, now = current_probe
+    return any(hasattr(value, "year") and value >= now for value in values)
+
+
+class ListCache:
+    """
+    Cache of list commands outputs, stored as one JSON file per entry in a private
+    directory. Entries are keyed by the command, its options and the user scope.
+    """
+
+    def __init__(self, session: Session, directory: Optional[str] = None):
+        self.session = session
+        self.enabled = config.getboolean("list-cache", "enabled", fallback=True)
+        self.max_entries = config.getint("list-cache", "max_entries", fallback=200)
+        directory = directory or config.get("list-cache", "directory", fallback="")
+        self.directory = directory or os.path.join(
+            os.path.expanduser("~"), ".cache", "eecrm", "lists"
+        )
+
+    def make_key(self, command: str, options: dict, scope: dict) -> str:
+        """Return a file name for the entry, also specific to the database used."""
+        url = self.session.get_bind().url.render_as_string(hide_password=True)
+        raw = json.dumps([url, command, options, scope], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest() + ".json"
+
+    def get(self, key: str, current_probe: List) -> Optional[str]:
+        """Return the stored output if its probe matches the current one."""
+        try:
+            with open(os.path.join(self.directory, key)) as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if entry.get("probe") != [str(value) for value in current_probe[:-1]]:
+            return None
+        return entry.get("output")
+
+    def set(self, key: str, current_probe: List, output: str) -> None:
+        """
+        Store an output with the probe taken before it was computed. Skipped if a
+        table changed during the current second (see changed_this_second).
+        """
+        if changed_this_second(current_probe):
+            return
+        values = current_probe[:-1]
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        path = os.path.join(self.directory, key)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        # The output holds CRM data, so only the current OS user can read it
+        file_descriptor = os.open(
+            temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+        )
+        entry = {"probe": [str(value) for value in values], "output": output}
+        with os.fdopen(file_descriptor, "w") as file:
+            json.dump(entry, file)
+        os.replace(temporary_path, path)
+        self.prune()
+
+    def prune(self) -> None:
+        """Remove the least recently written entries above max_entries."""
+        paths = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+        if len(paths) <= self.max_entries:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[: len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def listing(self, tables: Iterable[str], archive_tables: Iterable[str] = ()):
+        """
+        Decorator for list commands, caching what they display. Tables are the ones
+        the listing reads, archive_tables are added with the include_archived option.
+        The key covers the options, the current user with their department and
+        permissions (a role change must not reuse the listing of the former role)
+        and the console width.
+        Not used in a terminal with a pager, where listings are paged lazily.
+        """
+
+        def decorator(func: Callable) -> Callable:
+            def wrapper(**options):
+                # Interactive listings are paged lazily: nothing to capture
+                if not self.enabled or interactive():
+                    return func(**options)
+                probed = list(tables)
+                if options.get("include_archived"):
+                    probed.extend(archive_tables)
+                try:
+                    current_probe = probe(self.session, probed)
+                except exc.SQLAlchemyError:
+                    # e.g. last_updated columns not migrated yet
+                    self.session.rollback()
+                    return func(**options)
+                user = get_current_user()
+                if user is None:
+                    return func(**options)
+                scope = {
+                    "uid": user.id,
+                    "department_id": user.department_id,
+                    "permissions": sorted(permissions_names(user)),
+                    "width": console.width,
+                    "terminal": console.is_terminal,
+                }
+                key = self.make_key(func.__name__, options, scope)
+                output = self.get(key, current_probe)
+                if output is None:
+                    metrics.count("list_cache_misses")
+                    issues_count = BaseView.issues_count
+                    with captured() as capture:
+                        func(**options)
+                    output = capture.get()
+                    # Errors are displayed, not raised: never cache them
+                    if BaseView.issues_count == issues_count:
+                        try:
+                            self.set(key, current_probe, output)
+                        except OSError:
+                            pass
+                else:
+                    metrics.count("list_cache_hits")
+                write_text(output)
+
+            return wrapper
+
+        return decorator
@@ -0,0 +1,228 @@
+"""
+Local metrics of eecrm commands, for capacity planning without going through Sentry.
+Each command run is stored as one row of a rolling SQLite store (per OS user, rows
+older than retention_days are dropped): its latency, whether it failed, and counters
+incremented while it ran (queries, cache hits and misses, Argon2 verifications).
+`eecrm metrics` summarizes them per command with latency percentiles.
+"""
+
+import configparser
+import contextlib
+import math
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# get infos from the config file, regardless of the current working directory
+dir_path = os.path.dirname(os.path.realpath(__file__))
+config = configparser.ConfigParser()
+config.read(os.path.join(dir_path, "config.ini"))
+
+COUNTERS = (
+    "queries",
+    "list_cache_hits",
+    "list_cache_misses",
+    "reference_cache_hits",
+    "reference_cache_misses",
+    "argon2_verify_count",
+    "argon2_verify_seconds",
+)
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS samples (
+    command TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    failed INTEGER NOT NULL,
+    {", ".join(f"{name} REAL NOT NULL DEFAULT 0" for name in COUNTERS)}
+);
+CREATE INDEX IF NOT EXISTS ix_samples_started_at ON samples (started_at);
+"""
+# --since values: a number followed by one of these units
+WINDOW_UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+
+def percentile(values: List[float], rank: float) -> float:
+    """Return the nearest-rank percentile of values (sorted in place)."""
+    values.sort()
+    return values[max(math.ceil(rank / 100 * len(values)) - 1, 0)]
+
+
+def parse_window(window: str) -> float:
+    """Return the seconds of a window such as 30m, 24h or 7d."""
+    try:
+        return float(window[:-1]) * WINDOW_UNITS[window[-1]]
+    except (KeyError, ValueError, IndexError):
+        raise ValueError(f"Invalid window {window!r}, expected e.g. 30m, 24h or 7d.")
+
+
+@dataclass
+class Sample:
+    """A command run being measured."""
+
+    command: str
+    started_at: float = field(default_factory=time.time)
+    started: float = field(default_factory=time.perf_counter)
+    counters: Dict[str, float] = field(
+        default_factory=lambda: dict.fromkeys(COUNTERS, 0)
+    )
+
+
+@dataclass
+class CommandStats:
+    """Aggregated metrics of the runs of a command."""
+
+    command: str
+    durations: List[float] = field(default_factory=list)
+    failed: int = 0
+    counters: Dict[str, float] = field(
+        default_factory=lambda: dict.fromkeys(COUNTERS, 0)
+    )
+
+    @property
+    def runs(self) -> int:
+        return len(self.durations)
+
+    def percentile(self, rank: float) -> float:
+        return percentile(self.durations, rank)
+
+    def per_run(self, name: str) -> float:
+        return self.counters[name] / self.runs
+
+    def hit_ratio(self, cache: str) -> Optional[float]:
+        """Return the hits share of a cache, None if it was not used."""
+        hits = self.counters[f"{cache}_cache_hits"]
+        lookups = hits + self.counters[f"{cache}_cache_misses"]
+        return hits / lookups if lookups else None
+
+    @property
+    def argon2_verify_mean(self) -> Optional[float]:
+        count = self.counters["argon2_verify_count"]
+        return self.counters["argon2_verify_seconds"] / count if count else None
+
+
+class MetricsStore:
+    """Rolling SQLite store of the command runs."""
+
+    def __init__(
+        self, path: Optional[str] = None, retention_days: Optional[float] = None
+    ):
+        path = path or config.get("metrics", "path", fallback="")
+        self.path = path or os.path.join(
+            os.path.expanduser("~"), ".cache", "eecrm", "metrics.sqlite3"
+        )
+        if retention_days is None:
+            retention_days = config.getfloat("metrics", "retention_days", fallback=30)
+        self.retention = retention_days * WINDOW_UNITS["d"]
+
+    def connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", mode=0o700, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=5)
+        # Commands of several terminals may write at the same time
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def add(self, sample: Sample, duration: float, failed: bool) -> None:
+        """Store a command run and drop the ones older than the retention."""
+        columns = ("command", "started_at", "duration", "failed") + COUNTERS
+        values = (sample.command, sample.started_at, duration, int(failed))
+        values += tuple(sample.counters[name] for name in COUNTERS)
+        connection = self.connect()
+        try:
+            with connection:
+                connection.execute(
+                    f"INSERT INTO samples ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' * len(columns))})",
+                    values,
+                )
+                connection.execute(
+                    "DELETE FROM samples WHERE started_at < ?",
+                    (time.time() - self.retention,),
+                )
+        finally:
+            connection.close()
+
+    def stats(self, since: float, command: Optional[str] = None) -> List[CommandStats]:
+        """Return the stats of each command run since a timestamp, by name."""
+        query = (
+            f"SELECT command, duration, failed, {', '.join(COUNTERS)} FROM samples "
+            "WHERE started_at >= ?"
+        )
+        parameters = [since]
+        if command is not None:
+            query += " AND command = ?"
+            parameters.append(command)
+        connection = self.connect()
+        try:
+            rows = connection.execute(query, parameters).fetchall()
+        finally:
+            connection.close()
+        stats = {}
+        for name, duration, failed, *counters in rows:
+            command_stats = stats.setdefault(name, CommandStats(name))
+            command_stats.durations.append(duration)
+            command_stats.failed += failed
+            for counter, value in zip(COUNTERS, counters):
+                command_stats.counters[counter] += value
+        return [stats[name] for name in sorted(stats)]
+
+
+class Metrics:
+    """
+    Measure the running commands. Counters are added to every running command, so
+    that a batch also counts what its lines did. Without a running command, or with
+    metrics disabled, counting does nothing.
+    """
+
+    def __init__(self, store: Optional[MetricsStore] = None):
+        self.enabled = config.getboolean("metrics", "enabled", fallback=True)
+        self.store = store or MetricsStore()
+        self.samples: List[Sample] = []
+        self._listening = False
+
+    def start(self, command: str) -> None:
+        """Start measuring a command."""
+        if not self.enabled:
+            return
+        if not self._listening:
+            event.listen(Engine, "before_cursor_execute", self._count_query)
+            self._listening = True
+        self.samples.append(Sample(command))
+
+    def stop(self, failed: bool = False) -> None:
+        """Stop measuring the last started command and store its run."""
+        if not self.samples:
+            return
+        sample = self.samples.pop()
+        duration = time.perf_counter() - sample.started
+        try:
+            self.store.add(sample, duration, failed)
+        except (OSError, sqlite3.Error):
+            pass  # metrics must never make a command fail
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Add a value to a counter of the running commands."""
+        for sample in self.samples:
+            sample.counters[name] += value
+
+    @contextlib.contextmanager
+    def timer(self, name: str):
+        """Count a block as one {name}_count and its time as {name}_seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.count(f"{name}_count")
+            self.count(f"{name}_seconds", time.perf_counter() - started)
+
+    def _count_query(self, conn, cursor, statement, parameters, context, executemany):
+        self.count("queries")
+
+
+metrics = Metrics()
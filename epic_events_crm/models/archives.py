@@ -0,0 +1,68 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
+from decimal import Decimal
+import datetime
+
+from sqlalchemy import ForeignKey, DECIMAL, DateTime, Boolean, String, Text
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
+
+from . import Base
+
+if TYPE_CHECKING:
+    from .clients import Client
+    from .employees import Employee
+
+
+# Cold storage for fully paid contracts whose event is over, and for their events.
+# Rows keep the ids they had in the contracts and events tables.
+class ContractArchive(Base):
+    __tablename__ = "contracts_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    client_id: Mapped[int] = mapped_column(ForeignKey("clients.id"), nullable=False)
+    client: Mapped[Client] = relationship()
+    event: Mapped[EventArchive] = relationship(back_populates="contract")
+    total_amount: Mapped[Decimal] = mapped_column(DECIMAL(15, 2), nullable=False)
+    due_amount: Mapped[Decimal] = mapped_column(DECIMAL(15, 2), nullable=False)
+    signed: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime)
+    archived_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<ContractArchive id:{self.id} (client id:{self.client_id})>"
+
+
+class EventArchive(Base):
+    __tablename__ = "events_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    start_datetime: Mapped[datetime.datetime] = mapped_column(DateTime)
+    end_datetime: Mapped[datetime.datetime] = mapped_column(DateTime)
+    address_line1: Mapped[str] = mapped_column(String(255))
+    city: Mapped[str] = mapped_column(String(50))
+    country: Mapped[str] = mapped_column(String(25))
+    postal_code: Mapped[str] = mapped_column(String(20))
+    attendees_number: Mapped[int]
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+
+    contract_id: Mapped[int] = mapped_column(
+        ForeignKey("contracts_archive.id"), nullable=False
+    )
+    contract: Mapped[ContractArchive] = relationship(
+        back_populates="event", single_parent=True
+    )
+
+    support_person_id: Mapped[Optional[int]] = mapped_column(ForeignKey("employees.id"))
+    support_person: Mapped[Optional[Employee]] = relationship()
+
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime)
+    archived_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now()
+    )
+
+    __table_args__ = (UniqueConstraint("contract_id"),)
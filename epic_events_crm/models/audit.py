@@ -0,0 +1,29 @@
+from typing import Optional
+import datetime
+
+from sqlalchemy import String, Text, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from . import Base
+
+
+# Transactional outbox of the audit trail: records are added to the session of the
+# change they describe, so both are committed (or rolled back) together. sent_at is
+# set once a drainer forwarded them to the audit sink (Sentry by default).
+class AuditRecord(Base):
+    __tablename__ = "audit_log"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now()
+    )
+    # No foreign key: the trail outlives the employees it mentions
+    actor_id: Mapped[Optional[int]] = mapped_column()
+    action: Mapped[str] = mapped_column(String(50), nullable=False)
+    level: Mapped[str] = mapped_column(String(10), nullable=False, default="info")
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    sent_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, index=True)
+
+    def __repr__(self) -> str:
+        return f"<AuditRecord id:{self.id} ({self.action})>"
@@ -2,9 +2,8 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, List, Optional
 import datetime
 
-from sqlalchemy import String, ForeignKey, DateTime, text
+from sqlalchemy import String, ForeignKey, DateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.schema import FetchedValue
 from sqlalchemy.sql import func
 
 from . import Base
@@ -30,12 +29,16 @@ class Client(Base):
         DateTime, server_default=func.now()
     )
 
-    # https://docs.sqlalchemy.org/en/20/dialects/mysql.html#mysql-timestamp-onupdate
+    # Set by the app on every update, whatever the backend (MySQL columns also have
+    # ON UPDATE CURRENT_TIMESTAMP, for changes made outside of the app)
     last_updated: Mapped[datetime.datetime] = mapped_column(
-        DateTime,
-        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
-        server_onupdate=FetchedValue(),
+        DateTime, server_default=func.now(), onupdate=func.now(), index=True
     )
 
+    # Optimistic concurrency: every UPDATE checks then increments it, so changes made
+    # from an outdated read fail instead of overwriting (see commit_with_retry)
+    version_id: Mapped[int] = mapped_column(nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version_id}
+
     def __repr__(self) -> str:
         return f"<Client {self.fname} {self.lname} ({self.email})>"
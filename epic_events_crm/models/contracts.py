@@ -28,6 +28,17 @@ class Contract(Base):
         DateTime, server_default=func.now()
     )
 
+    # Set by the app on every update, whatever the backend (MySQL columns also have
+    # ON UPDATE CURRENT_TIMESTAMP, for changes made outside of the app)
+    last_updated: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now(), index=True
+    )
+
+    # Optimistic concurrency: every UPDATE checks then increments it, so changes made
+    # from an outdated read fail instead of overwriting (see commit_with_retry)
+    version_id: Mapped[int] = mapped_column(nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version_id}
+
     def __repr__(self) -> str:
         fname = self.client.fname
         lname = self.client.lname
@@ -2,8 +2,6 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, List
 import datetime
 
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
 from sqlalchemy import String, ForeignKey, DateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -35,13 +33,25 @@ class Employee(Base):
         DateTime, server_default=func.now()
     )
 
+    # Set by the app on every update, whatever the backend (MySQL columns also have
+    # ON UPDATE CURRENT_TIMESTAMP, for changes made outside of the app)
+    last_updated: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now(), index=True
+    )
+
     def set_password(self, password: str) -> None:
         """Receive a plaintext password, hash it and set it as password attribute."""
+        # argon2 is imported when needed only, most commands do not hash anything
+        from argon2 import PasswordHasher
+
         ph = PasswordHasher()
         self.password = ph.hash(password)
 
     def check_password(self, password: str) -> bool:
         """Receive a plaintext password, hash it and compare it to the stored hash."""
+        from argon2 import PasswordHasher
+        from argon2.exceptions import VerifyMismatchError
+
         ph = PasswordHasher()
         try:
             return ph.verify(self.password, password)
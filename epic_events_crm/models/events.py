@@ -16,10 +16,13 @@ if TYPE_CHECKING:
 class Event(Base):
     __tablename__ = "events"
 
+    # On MySQL the table is partitioned by range of start_datetime (see migration
+    # 9e4f0b6a2c17 and epic_events_crm.partitioning), which makes the primary key
+    # (id, start_datetime) there. Events are still identified by id alone.
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     start_datetime: Mapped[datetime.datetime] = mapped_column(DateTime)
-    end_datetime: Mapped[datetime.datetime] = mapped_column(DateTime)
+    end_datetime: Mapped[datetime.datetime] = mapped_column(DateTime, index=True)
     address_line1: Mapped[str] = mapped_column(String(255))
     city: Mapped[str] = mapped_column(String(50))
     country: Mapped[str] = mapped_column(String(25))
@@ -28,6 +31,8 @@ class Event(Base):
     notes: Mapped[Optional[str]] = mapped_column(Text)
 
     # https://docs.sqlalchemy.org/en/20/orm/basic_relationships.html#one-to-one
+    # Foreign keys are not supported by MySQL on partitioned tables, they are only
+    # declared for the ORM relationships (and for other backends).
     contract_id: Mapped[int] = mapped_column(ForeignKey("contracts.id"), nullable=False)
     contract: Mapped[Contract] = relationship(
         back_populates="event", single_parent=True
@@ -40,4 +45,18 @@ class Event(Base):
         DateTime, server_default=func.now()
     )
 
+    # Set by the app on every update, whatever the backend (MySQL columns also have
+    # ON UPDATE CURRENT_TIMESTAMP, for changes made outside of the app)
+    last_updated: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now(), index=True
+    )
+
+    # Optimistic concurrency: every UPDATE checks then increments it, so changes made
+    # from an outdated read fail instead of overwriting (see commit_with_retry)
+    version_id: Mapped[int] = mapped_column(nullable=False, server_default="1")
+    __mapper_args__ = {"version_id_col": version_id}
+
+    # One event per contract. Unique keys must include start_datetime on a partitioned
+    # table: on MySQL, migration 9e4f0b6a2c17 replaces it by a plain index, and only
+    # the check of EventController.create is left there.
     __table_args__ = (UniqueConstraint("contract_id"),)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
+import datetime
+
+from sqlalchemy import ForeignKey, String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
+
+from . import Base
+
+if TYPE_CHECKING:
+    from .employees import Employee
+
+
+# Refresh tokens are only stored hashed. A token is revoked when it is rotated (used
+# to get a new access token), on logout, or when all sessions of an employee end.
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    employee_id: Mapped[int] = mapped_column(
+        ForeignKey("employees.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    employee: Mapped[Employee] = relationship()
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    expires_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
+    revoked_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<RefreshToken id:{self.id} (employee id:{self.employee_id})>"
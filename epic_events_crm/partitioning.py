@@ -0,0 +1,109 @@
+"""
+Helpers for the MySQL range partitioning of the events table on start_datetime.
+Partitions are named after the period they hold (p2026 for a year, p2026q3 for a
+quarter) and bounded with TO_DAYS so that MySQL can prune them on date ranges.
+A last 'pmax' partition catches everything after the last period.
+"""
+
+import configparser
+import os
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+GRANULARITIES = ("year", "quarter")
+PARTITION_NAME_PATTERN = re.compile(r"^p(\d{4})(?:q([1-4]))?$")
+
+
+def get_partitioning_config() -> Tuple[str, int]:
+    """Return the granularity and number of periods ahead set in config.ini."""
+    config = configparser.ConfigParser()
+    config.read(os.path.join(os.path.dirname(os.path.realpath(__file__)), "config.ini"))
+    granularity = config.get("partitioning", "granularity", fallback="year")
+    periods_ahead = config.getint("partitioning", "periods_ahead", fallback=2)
+    return granularity, periods_ahead
+
+
+def period_start(day: date, granularity: str) -> date:
+    """Return the first day of the year or quarter containing the given day."""
+    if granularity == "year":
+        return date(day.year, 1, 1)
+    if granularity == "quarter":
+        return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+    raise ValueError(f"Granularity must be one of {GRANULARITIES}.")
+
+
+def next_period(start: date, granularity: str, count: int = 1) -> date:
+    """Return the first day of the period coming count periods after start."""
+    months = 12 * count if granularity == "year" else 3 * count
+    month_index = period_start(start, granularity).month - 1 + months
+    return date(start.year + month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(start: date, granularity: str) -> str:
+    """Return the name of the partition holding the period starting on start."""
+    if granularity == "year":
+        return f"p{start.year}"
+    return f"p{start.year}q{(start.month - 1) // 3 + 1}"
+
+
+def parse_partition_name(name: str) -> Optional[Tuple[date, str]]:
+    """Return the period start and granularity of a partition, None for pmax."""
+    match = PARTITION_NAME_PATTERN.match(name)
+    if match is None:
+        return None
+    year, quarter = match.groups()
+    if quarter is None:
+        return date(int(year), 1, 1), "year"
+    return date(int(year), 3 * (int(quarter) - 1) + 1, 1), "quarter"
+
+
+def build_partitions(
+    first: date, last: date, granularity: str
+) -> List[Tuple[str, date]]:
+    """
+    Return (name, upper bound) of the partitions of every period from the one
+    containing first to the one containing last, both included.
+    """
+    partitions = []
+    start = period_start(first, granularity)
+    while start <= last:
+        end = next_period(start, granularity)
+        partitions.append((partition_name(start, granularity), end))
+        start = end
+    return partitions
+
+
+def partitions_clause(partitions: List[Tuple[str, date]]) -> str:
+    """Return the SQL definition of the given partitions followed by pmax."""
+    definitions = [
+        f"PARTITION {name} VALUES LESS THAN (TO_DAYS('{end.isoformat()}'))"
+        for name, end in partitions
+    ]
+    definitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return ",\n".join(definitions)
+
+
+def roll_forward_statement(
+    existing_names: List[str], today: date, periods_ahead: int, granularity: str
+) -> Optional[str]:
+    """
+    Return the ALTER TABLE statement splitting pmax so that partitions exist up to
+    periods_ahead periods after today, or None if they already do.
+    The granularity of existing partitions takes precedence over the given one.
+    """
+    periods = [parse_partition_name(name) for name in existing_names]
+    periods = [period for period in periods if period is not None]
+    if periods:
+        last_start, granularity = max(periods)
+        first = next_period(last_start, granularity)
+    else:
+        first = period_start(today, granularity)
+    last = next_period(today, granularity, periods_ahead)
+    partitions = build_partitions(first, last, granularity)
+    if not partitions:
+        return None
+    return (
+        "ALTER TABLE events REORGANIZE PARTITION pmax INTO (\n"
+        f"{partitions_clause(partitions)}\n)"
+    )
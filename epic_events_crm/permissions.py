@@ -1,21 +1,38 @@
+from typing import Optional
+
 from epic_events_crm.authentication import get_current_user
+from epic_events_crm.tracing import span
 from epic_events_crm.views.base import BaseView
 
 base_view = BaseView()
 
 
-def get_user_permissions_names() -> list[str]:
+def permissions_names(user) -> Optional[list[str]]:
     """
-    Return a list of the current user permissions names.
-    Return superuser if the user is from the Superuser department.
+    Return a list of the permissions names of an employee (department loaded).
+    Return superuser if the employee is from the Superuser department.
     """
-    user = get_current_user()
     if user is not None and user.department.name == "Superuser":
         return ["superuser"]
     if user is not None:
         return [permission.name for permission in user.department.permissions]
 
 
+def get_user_permissions_names() -> list[str]:
+    """Return a list of the current user permissions names."""
+    return permissions_names(get_current_user())
+
+
+def has_permissions(user_permissions: list[str], required: list[str]) -> bool:
+    """
+    Return True if permissions include the required ones.
+    superuser is a special permission that allows everything.
+    """
+    if "superuser" in user_permissions:
+        return True
+    return all(permission in user_permissions for permission in required)
+
+
 def requires_permissions(required_permissions: list[str]):
     """
     Decorator to check if the current user has the required permissions.
@@ -24,14 +41,9 @@ def requires_permissions(required_permissions: list[str]):
 
     def decorator(func):
         def wrapper(*args, **kwargs):
-            user_permissions = get_user_permissions_names()
-            # Check if the user is a superuser
-            if "superuser" in user_permissions:
-                return func(*args, **kwargs)
-            # Check if the user has all the required permissions
-            elif all(
-                permission in user_permissions for permission in required_permissions
-            ):
+            with span("auth.permissions", "check permissions"):
+                user_permissions = get_user_permissions_names()
+            if has_permissions(user_permissions, required_permissions):
                 return func(*args, **kwargs)
             else:
                 base_view.display_as(
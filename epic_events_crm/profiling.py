@@ -0,0 +1,133 @@
+"""
+Query profiler for the --profile option of eecrm: counts the statements sent to the
+database, their time, and groups them by fingerprint (the statement with its values
+and IN lists normalized). A fingerprint run many times during one command usually
+comes from lazy loads in a loop: the N+1 pattern.
+With raise_on_lazy_loads, relationships are raise loaded instead, to find the lazy
+loads that were not planned with an eager loading option.
+"""
+
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, raiseload
+
+# Same fingerprint at least that many times: probably an N+1 pattern
+REPEAT_THRESHOLD = 3
+FINGERPRINT_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),  # string literals
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # number literals
+    (re.compile(r"%\([^)]*\)s|%s|:\w+"), "?"),  # placeholders of any paramstyle
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),  # IN lists of any length
+    (re.compile(r"\s+"), " "),
+)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Code locations in these directories are skipped when looking for the caller
+SKIPPED_DIRECTORIES = (
+    os.path.dirname(os.path.dirname(event.__file__)),  # sqlalchemy itself
+    os.path.dirname(os.path.abspath(__file__)) + os.sep + "repositories",
+)
+
+
+def fingerprint(statement: str) -> str:
+    """Return the statement with its values and IN lists normalized."""
+    for pattern, replacement in FINGERPRINT_PATTERNS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def find_caller() -> str:
+    """Return the file and line of the first frame outside SQLAlchemy and repos."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != __file__ and not filename.startswith(SKIPPED_DIRECTORIES):
+            if filename.startswith(PROJECT_ROOT):
+                filename = os.path.relpath(filename, PROJECT_ROOT)
+            return f"{filename}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "unknown"
+
+
+@dataclass
+class Fingerprint:
+    """Statements sharing a fingerprint, and where they were sent from."""
+
+    statement: str
+    count: int = 0
+    total_time: float = 0.0
+    callers: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class QueryProfiler:
+    """Record the statements executed by all engines while attached."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        # (duration, statement) of each execution
+        self.executions: List[tuple] = []
+        self.fingerprints: Dict[str, Fingerprint] = {}
+
+    def attach(self) -> None:
+        """Start listening to the statements of every engine."""
+        event.listen(Engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self.after_cursor_execute)
+
+    def detach(self) -> None:
+        """Stop listening."""
+        event.remove(Engine, "before_cursor_execute", self.before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", self.after_cursor_execute)
+
+    def before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("profiler_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        duration = time.perf_counter() - conn.info["profiler_started"].pop()
+        self.count += 1
+        self.total_time += duration
+        self.executions.append((duration, statement))
+        key = fingerprint(statement)
+        stats = self.fingerprints.get(key)
+        if stats is None:
+            stats = self.fingerprints[key] = Fingerprint(key)
+        stats.count += 1
+        stats.total_time += duration
+        stats.callers[find_caller()] += 1
+
+    def slowest(self, limit: int = 5) -> List[tuple]:
+        """Return (duration, statement) of the slowest executions."""
+        return sorted(self.executions, key=lambda item: item[0], reverse=True)[:limit]
+
+    def repeated(self, threshold: int = REPEAT_THRESHOLD) -> List[Fingerprint]:
+        """Return fingerprints run at least threshold times, most run first."""
+        repeated = [f for f in self.fingerprints.values() if f.count >= threshold]
+        return sorted(repeated, key=lambda f: f.count, reverse=True)
+
+
+def _raise_on_lazy_loads(orm_execute_state) -> None:
+    if orm_execute_state.is_select and not orm_execute_state.is_column_load:
+        orm_execute_state.statement = orm_execute_state.statement.options(
+            raiseload("*")
+        )
+
+
+def raise_on_lazy_loads(session: Optional[Session] = None) -> None:
+    """
+    Make relationships not loaded by an eager option raise when accessed, as with
+    lazy="raise", for a session or for all sessions. Meant for tests.
+    """
+    target = session if session is not None else Session
+    if not event.contains(target, "do_orm_execute", _raise_on_lazy_loads):
+        event.listen(target, "do_orm_execute", _raise_on_lazy_loads)
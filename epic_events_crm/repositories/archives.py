@@ -0,0 +1,194 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import delete, insert, select, update
+
+from epic_events_crm.database import get_session
+from epic_events_crm.models.archives import ContractArchive, EventArchive
+from epic_events_crm.models.clients import Client
+from epic_events_crm.models.contracts import Contract
+from epic_events_crm.models.events import Event
+
+
+def shared_columns(table, archive_table) -> List[str]:
+    """Return the names of the columns of a table also present in its archive."""
+    return [column.name for column in table.columns if column.name in archive_table.c]
+
+
+def reassign_support_statement(old_id: int, new_id: int):
+    """Return the UPDATE moving the archived events of a support person to another."""
+    return (
+        update(EventArchive)
+        .where(EventArchive.support_person_id == old_id)
+        .values(support_person_id=new_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class ArchiveRepo:
+    """
+    Archive repository class, for the contracts_archive and events_archive tables.
+    If no session is provided to constructor, a new one is created.
+    """
+
+    def __init__(self, session=None):
+        if session is not None:
+            self.session = session
+        else:
+            self.session = get_session()
+
+    def get_archivable_contract_ids(
+        self, before: datetime, limit: int
+    ) -> Optional[List[int]]:
+        """
+        Return ids of signed and fully paid contracts whose event ended before the
+        given datetime, at most limit of them.
+        """
+        try:
+            return (
+                self.session.execute(
+                    select(Contract.id)
+                    .join(Event, Contract.id == Event.contract_id)
+                    .filter(
+                        Contract.signed == True,  # noqa: E712
+                        Contract.due_amount <= 0,
+                        Event.end_datetime < before,
+                        # implied by the end date, but allows partition pruning
+                        Event.start_datetime < before,
+                    )
+                    .order_by(Contract.id)
+                    .limit(limit)
+                )
+                .scalars()
+                .all()
+            )
+        except Exception as e:
+            print(f"Error getting contracts to archive: {e}")
+
+    def move_to_archive(self, contract_ids: List[int]) -> None:
+        """
+        Copy contracts and their events to the archive tables, then delete them
+        from the hot tables. Set-based statements, commit is left to the caller.
+        """
+        contracts, events = Contract.__table__, Event.__table__
+        contracts_columns = shared_columns(contracts, ContractArchive.__table__)
+        events_columns = shared_columns(events, EventArchive.__table__)
+        self.session.execute(
+            insert(ContractArchive.__table__).from_select(
+                contracts_columns,
+                select(*[contracts.c[name] for name in contracts_columns]).where(
+                    contracts.c.id.in_(contract_ids)
+                ),
+            )
+        )
+        self.session.execute(
+            insert(EventArchive.__table__).from_select(
+                events_columns,
+                select(*[events.c[name] for name in events_columns]).where(
+                    events.c.contract_id.in_(contract_ids)
+                ),
+            )
+        )
+        self.session.execute(
+            delete(events).where(events.c.contract_id.in_(contract_ids))
+        )
+        self.session.execute(delete(contracts).where(contracts.c.id.in_(contract_ids)))
+
+    def reassign_support_person(self, old_id: int, new_id: int) -> Optional[int]:
+        """
+        Move all archived events of a support person to another one, so that the
+        former can be deleted. Return their number. Commit is left to the caller.
+        """
+        try:
+            result = self.session.execute(reassign_support_statement(old_id, new_id))
+            return result.rowcount
+        except Exception as e:
+            print(f"Error reassigning archived events: {e}")
+
+    def get_all_contracts(self) -> Optional[List[ContractArchive]]:
+        """Return all archived contracts."""
+        try:
+            return self.session.execute(select(ContractArchive)).scalars().all()
+        except Exception as e:
+            print(f"Error getting archived contracts: {e}")
+
+    def get_contracts_by_salesperson(
+        self, salesperson_id: int
+    ) -> Optional[List[ContractArchive]]:
+        """Return archived contracts related to the clients of a salesperson."""
+        try:
+            return (
+                self.session.execute(
+                    select(ContractArchive)
+                    .join(Client)
+                    .filter(Client.salesperson_id == salesperson_id)
+                )
+                .scalars()
+                .all()
+            )
+        except Exception as e:
+            print(f"Error getting archived contracts by salesperson: {e}")
+
+    def get_all_events(self) -> Optional[List[EventArchive]]:
+        """Return all archived events."""
+        try:
+            return self.session.execute(select(EventArchive)).scalars().all()
+        except Exception as e:
+            print(f"Error getting archived events: {e}")
+
+    def get_events_assigned_to(
+        self, support_person_id=None
+    ) -> Optional[List[EventArchive]]:
+        """
+        Return archived events assigned to a specified (by id) support person.
+        If no id is provided, return archived events without a support person.
+        """
+        try:
+            return (
+                self.session.execute(
+                    select(EventArchive).filter(
+                        EventArchive.support_person_id == support_person_id
+                    )
+                )
+                .scalars()
+                .all()
+            )
+        except Exception as e:
+            print(f"Error getting archived events: {e}")
+
+    def search_events(self, text: str) -> Optional[List[EventArchive]]:
+        """Return archived events whose name contains the given text."""
+        try:
+            return (
+                self.session.execute(
+                    select(EventArchive).filter(
+                        EventArchive.name.contains(text, autoescape=True)
+                    )
+                )
+                .scalars()
+                .all()
+            )
+        except Exception as e:
+            print(f"Error searching archived events: {e}")
+
+
+class AsyncArchiveRepo:
+    """
+    Archive repository on an AsyncSession (see database.get_async_session), with
+    the methods of ArchiveRepo used by the async controllers, awaited.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def reassign_support_person(self, old_id: int, new_id: int) -> Optional[int]:
+        """
+        Move all archived events of a support person to another one. Return their
+        number. Commit is left to the caller.
+        """
+        try:
+            result = await self.session.execute(
+                reassign_support_statement(old_id, new_id)
+            )
+            return result.rowcount
+        except Exception as e:
+            print(f"Error reassigning archived events: {e}")
@@ -0,0 +1,101 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import select, update
+
+from epic_events_crm.database import get_session
+from epic_events_crm.models.audit import AuditRecord
+
+
+def pending_query(batch_size: int):
+    """
+    Oldest records not sent yet. Their rows stay locked until the end of the
+    transaction, and rows locked by another drainer are skipped (MySQL only, SQLite
+    has a single writer anyway).
+    """
+    return (
+        select(AuditRecord)
+        .where(AuditRecord.sent_at.is_(None))
+        .order_by(AuditRecord.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def mark_sent_statement(record_ids: List[int], sent_at: datetime):
+    return (
+        update(AuditRecord)
+        .where(AuditRecord.id.in_(record_ids))
+        .values(sent_at=sent_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class AuditRepo:
+    """
+    Audit log repository class. If no session is provided to constructor,
+    a new one is created.
+    """
+
+    def __init__(self, session=None):
+        if session is not None:
+            self.session = session
+        else:
+            self.session = get_session()
+
+    def add(self, record: AuditRecord) -> None:
+        """Add an audit record to the session, committed with the change it logs."""
+        try:
+            self.session.add(record)
+        except Exception as e:
+            print(f"Error adding audit record: {e}")
+
+    def get_pending(self, batch_size: int) -> Optional[List[AuditRecord]]:
+        """Return the oldest records not sent yet, locked for the transaction."""
+        try:
+            return self.session.scalars(pending_query(batch_size)).all()
+        except Exception as e:
+            print(f"Error getting pending audit records: {e}")
+
+    def mark_sent(self, record_ids: List[int], sent_at: datetime) -> Optional[int]:
+        """Set the sent_at of records, return how many were updated."""
+        try:
+            result = self.session.execute(mark_sent_statement(record_ids, sent_at))
+            return result.rowcount
+        except Exception as e:
+            print(f"Error marking audit records as sent: {e}")
+
+
+class AsyncAuditRepo:
+    """
+    Audit log repository on an AsyncSession, with the same statements and methods
+    as AuditRepo, awaited.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def add(self, record: AuditRecord) -> None:
+        """Add an audit record to the session, committed with the change it logs."""
+        try:
+            self.session.add(record)
+        except Exception as e:
+            print(f"Error adding audit record: {e}")
+
+    async def get_pending(self, batch_size: int) -> Optional[List[AuditRecord]]:
+        """Return the oldest records not sent yet, locked for the transaction."""
+        try:
+            return (await self.session.scalars(pending_query(batch_size))).all()
+        except Exception as e:
+            print(f"Error getting pending audit records: {e}")
+
+    async def mark_sent(
+        self, record_ids: List[int], sent_at: datetime
+    ) -> Optional[int]:
+        """Set the sent_at of records, return how many were updated."""
+        try:
+            result = await self.session.execute(
+                mark_sent_statement(record_ids, sent_at)
+            )
+            return result.rowcount
+        except Exception as e:
+            print(f"Error marking audit records as sent: {e}")
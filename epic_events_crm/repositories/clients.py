@@ -1,10 +1,20 @@
 from typing import List, Optional
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, update
 
 from epic_events_crm.database import get_session
 from epic_events_crm.utilities import remove_spaces_and_hyphens
 from epic_events_crm.models.clients import Client
 
+# Hot lookups are built once: calls only bind their values, so the statement is
+# not rebuilt and its compiled form is always found in SQLAlchemy's cache.
+SELECT_BY_EMAIL = select(Client).where(Client.email == bindparam("email"))
+SELECT_BY_PHONE = select(Client).where(Client.phone == bindparam("phone"))
+
+
+def select_assigned_to(salesperson_id=None):
+    """Clients of a salesperson (by id), or without one if no id is provided."""
+    return select(Client).filter(Client.salesperson_id == salesperson_id)
+
 
 class ClientRepo:
     """
@@ -47,7 +57,7 @@ class ClientRepo:
         """Return a client by its email."""
         try:
             return self.session.execute(
-                select(Client).filter_by(email=email)
+                SELECT_BY_EMAIL, {"email": email}
             ).scalar_one_or_none()
         except Exception as e:
             print(f"Error getting client by email: {e}")
@@ -57,7 +67,7 @@ class ClientRepo:
         phone = remove_spaces_and_hyphens(phone)
         try:
             return self.session.execute(
-                select(Client).filter_by(phone=phone)
+                SELECT_BY_PHONE, {"phone": phone}
             ).scalar_one_or_none()
         except Exception as e:
             print(f"Error getting client by phone: {e}")
@@ -76,11 +86,108 @@ class ClientRepo:
         """
         try:
             return (
-                self.session.execute(
-                    select(Client).filter(Client.salesperson_id == salesperson_id)
-                )
-                .scalars()
-                .all()
+                self.session.execute(select_assigned_to(salesperson_id)).scalars().all()
+            )
+        except Exception as e:
+            print(f"Error: {e}")
+
+    def reassign_salesperson(self, old_id: int, new_id: int) -> Optional[int]:
+        """
+        Move all clients of a salesperson to another one with a single UPDATE.
+        Return the number of clients reassigned. Commit is left to the caller.
+        """
+        try:
+            result = self.session.execute(
+                update(Client)
+                .where(Client.salesperson_id == old_id)
+                .values(salesperson_id=new_id, version_id=Client.version_id + 1)
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount
+        except Exception as e:
+            print(f"Error reassigning clients: {e}")
+
+
+class AsyncClientRepo:
+    """
+    Client repository on an AsyncSession (see database.get_async_session), with the
+    same statements and methods as ClientRepo, awaited.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def add(self, client: Client) -> None:
+        """Add a client to the session."""
+        try:
+            self.session.add(client)
+        except Exception as e:
+            print(f"Error adding client: {e}")
+
+    async def get_all(self) -> List[Client]:
+        """Return all clients as a list, ordered by company name."""
+        try:
+            result = await self.session.scalars(
+                select(Client).order_by(Client.company_name)
             )
+            return result.all()
+        except Exception as e:
+            print(f"Error getting all clients: {e}")
+
+    async def get_by_id(self, client_id: int) -> Optional[Client]:
+        """Return a client by its id."""
+        try:
+            return await self.session.get(Client, client_id)
+        except Exception as e:
+            print(f"Error getting client by id: {e}")
+
+    async def get_by_email(self, email: str) -> Optional[Client]:
+        """Return a client by its email."""
+        try:
+            result = await self.session.execute(SELECT_BY_EMAIL, {"email": email})
+            return result.scalar_one_or_none()
+        except Exception as e:
+            print(f"Error getting client by email: {e}")
+
+    async def get_by_phone(self, phone: str) -> Optional[Client]:
+        """Return a client by its phone."""
+        phone = remove_spaces_and_hyphens(phone)
+        try:
+            result = await self.session.execute(SELECT_BY_PHONE, {"phone": phone})
+            return result.scalar_one_or_none()
+        except Exception as e:
+            print(f"Error getting client by phone: {e}")
+
+    async def delete(self, client: Client) -> None:
+        """Mark a client for deletion in the session."""
+        try:
+            await self.session.delete(client)
+        except Exception as e:
+            print(f"Error deleting client: {e}")
+
+    async def get_clients_assigned_to(self, salesperson_id=None) -> List[Client]:
+        """
+        Return all clients assigned to a specified (by id) salesperson.
+        If no id is provided, return all clients without a salesperson.
+        """
+        try:
+            result = await self.session.scalars(select_assigned_to(salesperson_id))
+            return result.all()
         except Exception as e:
             print(f"Error: {e}")
+
+    async def reassign_salesperson(self, old_id: int, new_id: int) -> Optional[int]:
+        """
+        Move all clients of a salesperson to another one with a single UPDATE.
+        Return the number of clients reassigned. Commit is left to the caller.
+        """
+        try:
+            result = await self.session.execute(
+                update(Client)
+                .where(Client.salesperson_id == old_id)
+                .values(salesperson_id=new_id, version_id=Client.version_id + 1)
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount
+        except Exception as e:
+            print(f"Error reassigning clients: {e}")
@@ -1,11 +1,64 @@
+import functools
 from typing import Optional
-from sqlalchemy import select, union
+from sqlalchemy import bindparam, or_, select, union
+from sqlalchemy.orm import selectinload
 
 from epic_events_crm.database import get_session
 from epic_events_crm.models.contracts import Contract
 from epic_events_crm.models.clients import Client
 from epic_events_crm.models.events import Event
 
+# Contract filters are built once, see repositories/clients.py
+SELECT_UNSIGNED = select(Contract).filter_by(signed=False)
+SELECT_UNPAID = select(Contract).filter(Contract.due_amount > 0)
+SELECT_UNSIGNED_OR_UNPAID = select(Contract).from_statement(
+    union(SELECT_UNSIGNED, SELECT_UNPAID)
+)
+SELECT_BY_SALESPERSON = (
+    select(Contract)
+    .join(Client)
+    .filter(Client.salesperson_id == bindparam("salesperson_id"))
+)
+SELECT_WITHOUT_EVENT = (
+    select(Contract)
+    .outerjoin(Event, Contract.id == Event.contract_id)
+    .filter(Event.contract_id == None)  # noqa: E711
+)
+SELECT_BY_SALESPERSON_WITHOUT_EVENT = (
+    select(Contract)
+    .join(Client)
+    .outerjoin(Event, Contract.id == Event.contract_id)
+    .filter(
+        Client.salesperson_id == bindparam("salesperson_id"),
+        Event.contract_id == None,  # noqa: E711
+    )
+)
+
+
+@functools.cache
+def async_statements() -> dict:
+    """
+    Statements of AsyncContractRepo, built once on first use (loader options
+    configure the mappers, which commands not querying contracts do not need).
+    Async sessions cannot lazy load: contracts come with their client and event,
+    used by the business rules and the contract representation.
+    """
+    loaded = (selectinload(Contract.client), selectinload(Contract.event))
+    return {
+        "loaded": loaded,
+        "all": select(Contract).options(*loaded),
+        "unsigned": SELECT_UNSIGNED.options(*loaded),
+        "unpaid": SELECT_UNPAID.options(*loaded),
+        "unsigned_or_unpaid": select(Contract)
+        .filter(or_(Contract.signed == False, Contract.due_amount > 0))  # noqa: E712
+        .options(*loaded),
+        "by_salesperson": SELECT_BY_SALESPERSON.options(*loaded),
+        "without_event": SELECT_WITHOUT_EVENT.options(*loaded),
+        "by_salesperson_without_event": SELECT_BY_SALESPERSON_WITHOUT_EVENT.options(
+            *loaded
+        ),
+    }
+
 
 class ContractRepo:
     """
@@ -50,30 +103,20 @@ class ContractRepo:
     def get_unsigned(self):
         """Return all unsigned contracts."""
         try:
-            return (
-                self.session.execute(select(Contract).filter_by(signed=False))
-                .scalars()
-                .all()
-            )
+            return self.session.execute(SELECT_UNSIGNED).scalars().all()
         except Exception as e:
             print(f"Error getting unsigned contracts: {e}")
 
     def get_unpaid(self):
         """Return all contracts still not fully paid."""
         try:
-            return (
-                self.session.execute(select(Contract).filter(Contract.due_amount > 0))
-                .scalars()
-                .all()
-            )
+            return self.session.execute(SELECT_UNPAID).scalars().all()
         except Exception as e:
             print(f"Error getting unpaid contracts: {e}")
 
     def get_unsigned_or_unpaid(self):
         """Return all contracts that are either unsigned or not fully paid."""
         try:
-            unsigned = select(Contract).filter_by(signed=False)
-            unpaid = select(Contract).filter(Contract.due_amount > 0)
             # Deprecated way of doing it
             # return (
             #     self.session.query(Contract)
@@ -82,9 +125,7 @@ class ContractRepo:
             # )
 
             # Recommended way since SQLAlchemy 2.0
-            return self.session.scalars(
-                select(Contract).from_statement(union(unsigned, unpaid))
-            ).all()
+            return self.session.scalars(SELECT_UNSIGNED_OR_UNPAID).all()
         except Exception as e:
             print(f"Error getting unsigned or unpaid contracts: {e}")
 
@@ -93,9 +134,7 @@ class ContractRepo:
         try:
             return (
                 self.session.execute(
-                    select(Contract)
-                    .join(Client)
-                    .filter(Client.salesperson_id == salesperson_id)
+                    SELECT_BY_SALESPERSON, {"salesperson_id": salesperson_id}
                 )
                 .scalars()
                 .all()
@@ -106,15 +145,7 @@ class ContractRepo:
     def get_without_event(self):
         """Return all contracts without an event."""
         try:
-            return (
-                self.session.execute(
-                    select(Contract)
-                    .outerjoin(Event, Contract.id == Event.contract_id)
-                    .filter(Event.contract_id == None)  # noqa: E711
-                )
-                .scalars()
-                .all()
-            )
+            return self.session.execute(SELECT_WITHOUT_EVENT).scalars().all()
         except Exception as e:
             print(f"Error getting contracts without event: {e}")
 
@@ -123,16 +154,89 @@ class ContractRepo:
         try:
             return (
                 self.session.execute(
-                    select(Contract)
-                    .join(Client)
-                    .outerjoin(Event, Contract.id == Event.contract_id)
-                    .filter(
-                        Client.salesperson_id == salesperson_id,
-                        Event.contract_id == None,  # noqa: E711
-                    )
+                    SELECT_BY_SALESPERSON_WITHOUT_EVENT,
+                    {"salesperson_id": salesperson_id},
                 )
                 .scalars()
                 .all()
             )
         except Exception as e:
             print(f"Error getting contracts by salesperson and without event: {e}")
+
+
+class AsyncContractRepo:
+    """
+    Contract repository on an AsyncSession (see database.get_async_session), with
+    the same methods as ContractRepo, awaited.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def _all(self, name: str, parameters=None, error="contracts"):
+        try:
+            result = await self.session.scalars(async_statements()[name], parameters)
+            return result.all()
+        except Exception as e:
+            print(f"Error getting {error}: {e}")
+
+    def add(self, contract: Contract) -> None:
+        """Add a contract to the session."""
+        try:
+            self.session.add(contract)
+        except Exception as e:
+            print(f"Error adding contract: {e}")
+
+    async def get_by_id(self, contract_id: int) -> Optional[Contract]:
+        """Return a contract by its id."""
+        try:
+            return await self.session.get(
+                Contract, contract_id, options=async_statements()["loaded"]
+            )
+        except Exception as e:
+            print(f"Error getting contract by id: {e}")
+
+    async def delete(self, contract: Contract) -> None:
+        """Mark a contract for deletion in the session."""
+        try:
+            await self.session.delete(contract)
+        except Exception as e:
+            print(f"Error deleting contract: {e}")
+
+    async def get_all(self):
+        """Return all contracts."""
+        return await self._all("all", error="all contracts")
+
+    async def get_unsigned(self):
+        """Return all unsigned contracts."""
+        return await self._all("unsigned", error="unsigned contracts")
+
+    async def get_unpaid(self):
+        """Return all contracts still not fully paid."""
+        return await self._all("unpaid", error="unpaid contracts")
+
+    async def get_unsigned_or_unpaid(self):
+        """Return all contracts that are either unsigned or not fully paid."""
+        return await self._all(
+            "unsigned_or_unpaid", error="unsigned or unpaid contracts"
+        )
+
+    async def get_by_salesperson(self, salesperson_id: int):
+        """Return all contracts related to the clients of a given salesperson."""
+        return await self._all(
+            "by_salesperson",
+            {"salesperson_id": salesperson_id},
+            error="contracts by salesperson",
+        )
+
+    async def get_without_event(self):
+        """Return all contracts without an event."""
+        return await self._all("without_event", error="contracts without event")
+
+    async def get_by_salesperson_and_wo_event(self, salesperson_id: int):
+        """Return all contracts without an event and related to a salesperson."""
+        return await self._all(
+            "by_salesperson_without_event",
+            {"salesperson_id": salesperson_id},
+            error="contracts by salesperson and without event",
+        )
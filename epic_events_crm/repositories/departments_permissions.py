@@ -1,9 +1,18 @@
 from typing import List, Optional
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 
+from epic_events_crm.cache import cached, invalidate
 from epic_events_crm.database import get_session
 from epic_events_crm.models.departments_permissions import Department, Permission
 
+# Built once, see repositories/clients.py
+SELECT_DEPARTMENT_BY_NAME = select(Department).where(
+    Department.name == bindparam("name")
+)
+SELECT_PERMISSION_BY_NAME = select(Permission).where(
+    Permission.name == bindparam("name")
+)
+
 
 class DepartmentRepo:
     """
@@ -19,11 +28,13 @@ class DepartmentRepo:
 
     def add(self, department: Department) -> None:
         """Add a department to the session."""
+        invalidate(self.session, "departments")
         try:
             self.session.add(department)
         except Exception as e:
             print(f"Error adding department: {e}")
 
+    @cached("departments")
     def get_all(self) -> List[Department]:
         """Return all departments as a list."""
         try:
@@ -35,6 +46,7 @@ class DepartmentRepo:
         except Exception as e:
             print(f"Error getting all departments: {e}")
 
+    @cached("departments")
     def get_by_id(self, department_id: int) -> Optional[Department]:
         """Return a department by its id."""
         try:
@@ -42,23 +54,65 @@ class DepartmentRepo:
         except Exception as e:
             print(f"Error getting department by id: {e}")
 
+    @cached("departments")
     def get_by_name(self, name: str) -> Optional[Department]:
         """Return a department by its name."""
         try:
             return self.session.execute(
-                select(Department).filter_by(name=name)
+                SELECT_DEPARTMENT_BY_NAME, {"name": name}
             ).scalar_one_or_none()
         except Exception as e:
             print(f"Error getting department by name: {e}")
 
     def delete(self, department: Department) -> None:
         """Mark a department for deletion in the session."""
+        invalidate(self.session, "departments")
         try:
             self.session.delete(department)
         except Exception as e:
             print(f"Error deleting department: {e}")
 
 
+class AsyncDepartmentRepo:
+    """
+    Department lookups on an AsyncSession (see database.get_async_session), for the
+    async controllers. Departments are read only there.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    @cached("departments")
+    async def get_all(self) -> List[Department]:
+        """Return all departments as a list."""
+        try:
+            result = await self.session.scalars(
+                select(Department).order_by(Department.id)
+            )
+            return result.all()
+        except Exception as e:
+            print(f"Error getting all departments: {e}")
+
+    @cached("departments")
+    async def get_by_id(self, department_id: int) -> Optional[Department]:
+        """Return a department by its id."""
+        try:
+            return await self.session.get(Department, department_id)
+        except Exception as e:
+            print(f"Error getting department by id: {e}")
+
+    @cached("departments")
+    async def get_by_name(self, name: str) -> Optional[Department]:
+        """Return a department by its name."""
+        try:
+            result = await self.session.execute(
+                SELECT_DEPARTMENT_BY_NAME, {"name": name}
+            )
+            return result.scalar_one_or_none()
+        except Exception as e:
+            print(f"Error getting department by name: {e}")
+
+
 class PermissionRepo:
     """
     Permission repository class. If no session is provided to constructor,
@@ -73,11 +127,13 @@ class PermissionRepo:
 
     def add(self, permission: Permission) -> None:
         """Add a permission to the session."""
+        invalidate(self.session, "permissions")
         try:
             self.session.add(permission)
         except Exception as e:
             print(f"Error adding permission: {e}")
 
+    @cached("permissions")
     def get_all(self) -> List[Permission]:
         """Return all permissions as a list."""
         try:
@@ -85,6 +141,7 @@ class PermissionRepo:
         except Exception as e:
             print(f"Error getting all permissions: {e}")
 
+    @cached("permissions")
     def get_by_id(self, permission_id: int) -> Optional[Permission]:
         """Return a permission by its id."""
         try:
@@ -92,17 +149,19 @@ class PermissionRepo:
         except Exception as e:
             print(f"Error getting permission by id: {e}")
 
+    @cached("permissions")
     def get_by_name(self, name: str) -> Optional[Permission]:
         """Return a permission by its name."""
         try:
             return self.session.execute(
-                select(Permission).filter_by(name=name)
+                SELECT_PERMISSION_BY_NAME, {"name": name}
             ).scalar_one_or_none()
         except Exception as e:
             print(f"Error getting permission by name: {e}")
 
     def delete(self, permission: Permission) -> None:
         """Mark a permission for deletion in the session."""
+        invalidate(self.session, "permissions")
         try:
             self.session.delete(permission)
         except Exception as e:
@@ -1,8 +1,41 @@
-from typing import List, Optional
-from sqlalchemy import select
+import functools
+from typing import Dict, List, Optional
+from sqlalchemy import Select, bindparam, select
+from sqlalchemy.orm import contains_eager, joinedload
 
+from epic_events_crm.cache import cached, invalidate
 from epic_events_crm.database import get_session
 from epic_events_crm.models.employees import Employee
+from epic_events_crm.models.departments_permissions import Department
+
+# Built once, see repositories/clients.py
+SELECT_BY_EMAIL = select(Employee).where(Employee.email == bindparam("email"))
+
+
+@functools.cache
+def async_statements() -> Dict[str, Select]:
+    """
+    Statements of AsyncEmployeeRepo, built once on first use (loader options
+    configure the mappers, which commands not querying employees do not need).
+    Async sessions cannot lazy load: employees come with their department, needed by
+    most business rules, and looked up ones with its permissions too.
+    """
+    with_department = joinedload(Employee.department)
+    with_permissions = joinedload(Employee.department).selectinload(
+        Department.permissions
+    )
+    return {
+        "all": select(Employee).options(with_department),
+        "by_id": select(Employee)
+        .options(with_permissions)
+        .where(Employee.id == bindparam("employee_id")),
+        "by_email": SELECT_BY_EMAIL.options(with_permissions),
+        "by_department_name": select(Employee)
+        .join(Department)
+        .options(contains_eager(Employee.department))
+        .filter(Department.name == bindparam("name"))
+        .order_by(Employee.id),
+    }
 
 
 class EmployeeRepo:
@@ -19,6 +52,7 @@ class EmployeeRepo:
 
     def add(self, employee: Employee) -> None:
         """Add an employee to the session."""
+        invalidate(self.session, "employees")
         try:
             self.session.add(employee)
         except Exception as e:
@@ -31,6 +65,7 @@ class EmployeeRepo:
         except Exception as e:
             print(f"Error getting all employees: {e}")
 
+    @cached("employees")
     def get_by_id(self, employee_id: int) -> Optional[Employee]:
         """Return an employee by its id."""
         try:
@@ -42,14 +77,96 @@ class EmployeeRepo:
         """Return an employee by its email."""
         try:
             return self.session.execute(
-                select(Employee).filter_by(email=email)
+                SELECT_BY_EMAIL, {"email": email}
             ).scalar_one_or_none()
         except Exception as e:
             print(f"Error getting employee by email: {e}")
 
+    def get_by_department_name(self, name: str) -> List[Employee]:
+        """Return all employees of a department, given its name."""
+        try:
+            return (
+                self.session.execute(
+                    select(Employee)
+                    .join(Department)
+                    .filter(Department.name == name)
+                    .order_by(Employee.id)
+                )
+                .scalars()
+                .all()
+            )
+        except Exception as e:
+            print(f"Error getting employees by department: {e}")
+
     def delete(self, employee: Employee) -> None:
         """Mark an employee for deletion in the session."""
+        invalidate(self.session, "employees")
         try:
             self.session.delete(employee)
         except Exception as e:
             print(f"Error deleting employee: {e}")
+
+
+class AsyncEmployeeRepo:
+    """
+    Employee repository on an AsyncSession (see database.get_async_session), with
+    the same methods as EmployeeRepo, awaited. Employees come with their department.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def add(self, employee: Employee) -> None:
+        """Add an employee to the session."""
+        invalidate(self.session, "employees")
+        try:
+            self.session.add(employee)
+        except Exception as e:
+            print(f"Error adding employee: {e}")
+
+    async def get_all(self) -> List[Employee]:
+        """Return all employees as a list."""
+        try:
+            result = await self.session.scalars(async_statements()["all"])
+            return result.all()
+        except Exception as e:
+            print(f"Error getting all employees: {e}")
+
+    @cached("employees")
+    async def get_by_id(self, employee_id: int) -> Optional[Employee]:
+        """Return an employee by its id."""
+        try:
+            result = await self.session.execute(
+                async_statements()["by_id"], {"employee_id": employee_id}
+            )
+            return result.scalar_one_or_none()
+        except Exception as e:
+            print(f"Error getting employee by id: {e}")
+
+    async def get_by_email(self, email: str) -> Optional[Employee]:
+        """Return an employee by its email."""
+        try:
+            result = await self.session.execute(
+                async_statements()["by_email"], {"email": email}
+            )
+            return result.scalar_one_or_none()
+        except Exception as e:
+            print(f"Error getting employee by email: {e}")
+
+    async def get_by_department_name(self, name: str) -> List[Employee]:
+        """Return all employees of a department, given its name."""
+        try:
+            result = await self.session.scalars(
+                async_statements()["by_department_name"], {"name": name}
+            )
+            return result.all()
+        except Exception as e:
+            print(f"Error getting employees by department: {e}")
+
+    async def delete(self, employee: Employee) -> None:
+        """Mark an employee for deletion in the session."""
+        invalidate(self.session, "employees")
+        try:
+            await self.session.delete(employee)
+        except Exception as e:
+            print(f"Error deleting employee: {e}")
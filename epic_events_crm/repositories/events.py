@@ -1,10 +1,28 @@
-from typing import Optional, List
-from sqlalchemy import select
+from datetime import datetime
+from typing import Dict, Optional, List
+from sqlalchemy import case, select, update
 
 from epic_events_crm.database import get_session
 from epic_events_crm.models.events import Event
 
 
+def select_assigned_to(support_person_id=None):
+    """Events of a support person (by id), or without one if no id is provided."""
+    return select(Event).filter(Event.support_person_id == support_person_id)
+
+
+def select_starting_between(
+    start: Optional[datetime] = None, end: Optional[datetime] = None
+):
+    """Events starting from start (included) to end (excluded)."""
+    query = select(Event)
+    if start is not None:
+        query = query.filter(Event.start_datetime >= start)
+    if end is not None:
+        query = query.filter(Event.start_datetime < end)
+    return query
+
+
 class EventRepo:
     """
     Event repository class. If no session is provided to constructor,
@@ -50,13 +68,199 @@ class EventRepo:
         Return all events assigned to a specified (by id) support person.
         If no id is provided, return all events without a support person.
         """
+        try:
+            return (
+                self.session.execute(select_assigned_to(support_person_id))
+                .scalars()
+                .all()
+            )
+        except Exception as e:
+            print(f"Error: {e}")
+
+    def reassign_support_person(self, old_id: int, new_id: int) -> Optional[int]:
+        """
+        Move all events of a support person to another one with a single UPDATE.
+        Return the number of events reassigned. Commit is left to the caller.
+        """
+        try:
+            result = self.session.execute(
+                update(Event)
+                .where(Event.support_person_id == old_id)
+                .values(support_person_id=new_id, version_id=Event.version_id + 1)
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount
+        except Exception as e:
+            print(f"Error reassigning events: {e}")
+
+    def get_starting_between(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Optional[List[Event]]:
+        """
+        Return events starting from start (included) to end (excluded), ordered by
+        start date. Filtering on start_datetime lets MySQL prune the partitions.
+        """
+        query = select_starting_between(start, end).order_by(Event.start_datetime)
+        try:
+            return self.session.execute(query).scalars().all()
+        except Exception as e:
+            print(f"Error getting events by start date: {e}")
+
+    def search_by_name(self, text: str) -> Optional[List[Event]]:
+        """Return all events whose name contains the given text."""
         try:
             return (
                 self.session.execute(
-                    select(Event).filter(Event.support_person_id == support_person_id)
+                    select(Event).filter(Event.name.contains(text, autoescape=True))
                 )
                 .scalars()
                 .all()
             )
+        except Exception as e:
+            print(f"Error searching events: {e}")
+
+    def get_unassigned_windows(self, after: datetime) -> Optional[List]:
+        """
+        Return (id, name, start, end) rows of events without a support person and
+        ending after the given datetime.
+        """
+        try:
+            return self.session.execute(
+                select(Event.id, Event.name, Event.start_datetime, Event.end_datetime)
+                .filter(
+                    Event.support_person_id == None,  # noqa: E711
+                    Event.end_datetime > after,
+                )
+                .order_by(Event.start_datetime)
+            ).all()
+        except Exception as e:
+            print(f"Error getting unassigned events: {e}")
+
+    def get_assigned_windows(self, after: datetime) -> Optional[List]:
+        """
+        Return (support person id, start, end) rows of events with a support person
+        and ending after the given datetime.
+        """
+        try:
+            return self.session.execute(
+                select(
+                    Event.support_person_id, Event.start_datetime, Event.end_datetime
+                ).filter(
+                    Event.support_person_id != None,  # noqa: E711
+                    Event.end_datetime > after,
+                )
+            ).all()
+        except Exception as e:
+            print(f"Error getting assigned events: {e}")
+
+    def assign_support_persons(self, assignments: Dict[int, int]) -> Optional[int]:
+        """
+        Set the support person of several events (event id -> support person id)
+        with a single UPDATE. Return the number of events updated.
+        Commit is left to the caller.
+        """
+        if not assignments:
+            return 0
+        try:
+            result = self.session.execute(
+                update(Event)
+                .where(Event.id.in_(assignments.keys()))
+                .values(
+                    support_person_id=case(assignments, value=Event.id),
+                    version_id=Event.version_id + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount
+        except Exception as e:
+            print(f"Error assigning support persons: {e}")
+
+
+class AsyncEventRepo:
+    """
+    Event repository on an AsyncSession (see database.get_async_session), with the
+    same methods as EventRepo, awaited.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def add(self, event: Event) -> None:
+        """Add an event to the session."""
+        try:
+            self.session.add(event)
+        except Exception as e:
+            print(f"Error adding event: {e}")
+
+    async def get_by_id(self, event_id: int) -> Optional[Event]:
+        """Return an event by its id."""
+        try:
+            return await self.session.get(Event, event_id)
+        except Exception as e:
+            print(f"Error getting event by id: {e}")
+
+    async def delete(self, event: Event) -> None:
+        """Mark an event for deletion in the session."""
+        try:
+            await self.session.delete(event)
+        except Exception as e:
+            print(f"Error deleting event: {e}")
+
+    async def get_all(self) -> Optional[List[Event]]:
+        """Return all events."""
+        try:
+            return (await self.session.scalars(select(Event))).all()
+        except Exception as e:
+            print(f"Error getting all events: {e}")
+
+    async def get_events_assigned_to(
+        self, support_person_id=None
+    ) -> Optional[List[Event]]:
+        """
+        Return all events assigned to a specified (by id) support person.
+        If no id is provided, return all events without a support person.
+        """
+        try:
+            result = await self.session.scalars(select_assigned_to(support_person_id))
+            return result.all()
         except Exception as e:
             print(f"Error: {e}")
+
+    async def reassign_support_person(self, old_id: int, new_id: int) -> Optional[int]:
+        """
+        Move all events of a support person to another one with a single UPDATE.
+        Return the number of events reassigned. Commit is left to the caller.
+        """
+        try:
+            result = await self.session.execute(
+                update(Event)
+                .where(Event.support_person_id == old_id)
+                .values(support_person_id=new_id, version_id=Event.version_id + 1)
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount
+        except Exception as e:
+            print(f"Error reassigning events: {e}")
+
+    async def get_starting_between(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Optional[List[Event]]:
+        """
+        Return events starting from start (included) to end (excluded), ordered by
+        start date.
+        """
+        query = select_starting_between(start, end).order_by(Event.start_datetime)
+        try:
+            return (await self.session.scalars(query)).all()
+        except Exception as e:
+            print(f"Error getting events by start date: {e}")
+
+    async def search_by_name(self, text: str) -> Optional[List[Event]]:
+        """Return all events whose name contains the given text."""
+        try:
+            result = await self.session.scalars(
+                select(Event).filter(Event.name.contains(text, autoescape=True))
+            )
+            return result.all()
+        except Exception as e:
+            print(f"Error searching events: {e}")
@@ -0,0 +1,85 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import func, select, tuple_
+
+from epic_events_crm.list_cache import probe
+
+
+class AsyncPageRepo:
+    """
+    Pages of the rows of a table on an AsyncSession, with only the requested
+    columns: lists of the HTTP API, whatever the model.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def get_page(
+        self,
+        model,
+        columns: Sequence[str],
+        filters: Dict[str, Any],
+        limit: int,
+        offset: int = 0,
+        after: Optional[int] = None,
+    ) -> Tuple[List[dict], int]:
+        """
+        Return the rows (as dicts) of a page ordered by id, and the number of rows
+        matching the filters (column equalities). Pages after an id are read from
+        the primary key index, however far they are, unlike large offsets.
+        """
+        table = model.__table__
+        conditions = [table.c[name] == value for name, value in filters.items()]
+        query = select(*(table.c[name] for name in columns)).where(*conditions)
+        if after is not None:
+            query = query.where(table.c.id > after)
+        query = query.order_by(table.c.id).limit(limit).offset(offset)
+        rows = (await self.session.execute(query)).all()
+        total = await self.session.scalar(
+            select(func.count()).select_from(table).where(*conditions)
+        )
+        return [row._asdict() for row in rows], total
+
+    async def get_versions(self, table_names: Iterable[str]) -> List:
+        """
+        Return MAX(last_updated) and COUNT(*) of tables followed by the database
+        NOW(), see list_cache.probe.
+        """
+        return await self.session.run_sync(probe, list(table_names))
+
+
+class PageRepo:
+    """
+    Keyset pages of ORM statements on a Session, for the listings fetched lazily by
+    the interactive pager (see controllers/listings.py).
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def get_page(
+        self,
+        statement,
+        keys: Sequence,
+        after: Optional[tuple] = None,
+        limit: int = 500,
+    ) -> Optional[Tuple[List, Optional[tuple]]]:
+        """
+        Return the entities of the page of a statement (selecting one entity) after
+        the given keys, ordered by keys (the last one unique), and the keys of its
+        last row, to get the next page. Each page is read from where the previous
+        one ended, without counting or skipping rows.
+        """
+        query = statement.add_columns(*keys).order_by(None).order_by(*keys)
+        if after is not None:
+            if len(keys) == 1:
+                query = query.where(keys[0] > after[0])
+            else:
+                query = query.where(tuple_(*keys) > tuple_(*after))
+        try:
+            rows = self.session.execute(query.limit(limit)).all()
+        except Exception as e:
+            print(f"Error getting page: {e}")
+            return None
+        if not rows:
+            return [], after
+        return [row[0] for row in rows], tuple(rows[-1][1:])
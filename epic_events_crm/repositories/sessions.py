@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, update
+
+from epic_events_crm.database import get_session
+from epic_events_crm.models.sessions import RefreshToken
+
+
+class RefreshTokenRepo:
+    """
+    Refresh token repository class. If no session is provided to constructor,
+    a new one is created.
+    """
+
+    def __init__(self, session=None):
+        if session is not None:
+            self.session = session
+        else:
+            self.session = get_session()
+
+    def add(self, refresh_token: RefreshToken) -> None:
+        """Add a refresh token to the session."""
+        try:
+            self.session.add(refresh_token)
+        except Exception as e:
+            print(f"Error adding refresh token: {e}")
+
+    def get_by_hash(self, token_hash: str) -> Optional[RefreshToken]:
+        """
+        Return a refresh token by its hash, locking its row until the end of the
+        transaction so that concurrent commands cannot rotate it twice.
+        """
+        try:
+            return self.session.execute(
+                select(RefreshToken)
+                .filter_by(token_hash=token_hash)
+                .with_for_update()
+            ).scalar_one_or_none()
+        except Exception as e:
+            print(f"Error getting refresh token by hash: {e}")
+
+    def revoke_all(self, employee_id: int, revoked_at: datetime) -> int:
+        """Revoke the active refresh tokens of an employee, return how many."""
+        try:
+            result = self.session.execute(
+                update(RefreshToken)
+                .where(
+                    RefreshToken.employee_id == employee_id,
+                    RefreshToken.revoked_at.is_(None),
+                )
+                .values(revoked_at=revoked_at)
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount
+        except Exception as e:
+            print(f"Error revoking refresh tokens: {e}")
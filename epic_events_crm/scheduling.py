@@ -0,0 +1,82 @@
+import heapq
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+Window = Tuple[datetime, datetime]
+
+
+class BusyCalendar:
+    """
+    Busy windows of one person, kept merged and sorted by start so that checking
+    if a new window is free only costs a binary search.
+    """
+
+    def __init__(self, windows: Iterable[Window] = ()):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        merged: List[List[datetime]] = []
+        for start, end in sorted(windows):
+            if merged and start < merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        for start, end in merged:
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        """Check that the window doesn't overlap any busy window."""
+        # Last busy window starting before the end of the new one is the only
+        # candidate for an overlap, as busy windows are disjoint
+        index = bisect_left(self.starts, end) - 1
+        return index < 0 or self.ends[index] <= start
+
+    def book(self, start: datetime, end: datetime) -> None:
+        """Add a window, which must be free, to the busy ones."""
+        index = bisect_left(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+
+
+def schedule_support(
+    events: Iterable[Tuple[int, datetime, datetime]],
+    assignments: Iterable[Tuple[int, datetime, datetime]],
+    support_ids: Iterable[int],
+) -> Tuple[Dict[int, int], List[int]]:
+    """
+    Assign events (id, start, end) to support people, given their current
+    assignments (support id, start, end). Events are handled by start date and each
+    one goes to the least loaded support person free on its window.
+    Return a dict event id -> support id and the list of event ids left unassigned.
+    """
+    windows: Dict[int, List[Window]] = defaultdict(list)
+    for support_id, start, end in assignments:
+        windows[support_id].append((start, end))
+
+    calendars = {}
+    # Min-heap of (load, support id) so the least loaded person is tried first
+    loads = []
+    for support_id in support_ids:
+        calendars[support_id] = BusyCalendar(windows[support_id])
+        loads.append((len(windows[support_id]), support_id))
+    heapq.heapify(loads)
+
+    result: Dict[int, int] = {}
+    unassigned: List[int] = []
+    for event_id, start, end in sorted(events, key=lambda event: event[1:]):
+        busy = []
+        while loads:
+            load, support_id = heapq.heappop(loads)
+            if calendars[support_id].is_free(start, end):
+                calendars[support_id].book(start, end)
+                result[event_id] = support_id
+                heapq.heappush(loads, (load + 1, support_id))
+                break
+            busy.append((load, support_id))
+        else:
+            unassigned.append(event_id)
+        for item in busy:
+            heapq.heappush(loads, item)
+    return result, unassigned
@@ -0,0 +1,286 @@
+"""
+Deterministic synthetic data for local tests at production scale (init seed command).
+Rows are generated as dictionaries with explicit ids, so that references between
+tables are known without reading anything back, and inserted by batches.
+The same seed and counts always give the same data.
+"""
+
+import datetime
+import random
+import time
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from argon2 import PasswordHasher
+from sqlalchemy import Table, func, insert, select
+from sqlalchemy.engine import Connection
+
+from epic_events_crm.models.departments_permissions import Department
+from epic_events_crm.models.employees import Employee
+from epic_events_crm.models.clients import Client
+from epic_events_crm.models.contracts import Contract
+from epic_events_crm.models.events import Event
+
+# fmt: off
+FIRST_NAMES = (
+    "Alice", "Bruno", "Chloé", "David", "Emma", "Farid", "Gaëlle", "Hugo", "Inès",
+    "Julien", "Karima", "Louis", "Manon", "Nathan", "Océane", "Paul", "Quentin",
+    "Rose", "Samir", "Théo", "Ursula", "Victor", "Wendy", "Yasmine", "Zoé",
+)
+LAST_NAMES = (
+    "MARTIN", "BERNARD", "DUBOIS", "THOMAS", "ROBERT", "RICHARD", "PETIT", "DURAND",
+    "LEROY", "MOREAU", "SIMON", "LAURENT", "LEFEBVRE", "MICHEL", "GARCIA", "DAVID",
+    "BERTRAND", "ROUX", "VINCENT", "FOURNIER", "MOREL", "GIRARD", "ANDRE", "MERCIER",
+)
+COMPANY_WORDS = (
+    "Atlas", "Boréal", "Cobalt", "Delta", "Éclat", "Fusion", "Horizon", "Lumen",
+    "Nova", "Orion", "Pixel", "Quartz", "Sirius", "Titan", "Vertex", "Zénith",
+)
+COMPANY_SUFFIXES = ("SARL", "SAS", "& Co", "Group", "Events", "Conseil")
+EVENT_KINDS = (
+    "Wedding", "Seminar", "Product launch", "Birthday party", "Gala dinner",
+    "Team building", "Conference", "Trade show", "Charity run", "Concert",
+)
+# fmt: on
+# (city, country, postal code prefix)
+PLACES = (
+    ("Paris", "France", "75"),
+    ("Lyon", "France", "69"),
+    ("Bordeaux", "France", "33"),
+    ("Lille", "France", "59"),
+    ("Bruxelles", "Belgique", "10"),
+    ("Genève", "Suisse", "12"),
+    ("Montréal", "Canada", "H2"),
+)
+STREETS = ("rue de la Paix", "avenue Victor Hugo", "boulevard Voltaire", "quai Nord")
+
+# Departments seeded employees belong to, with their weights
+DEPARTMENT_WEIGHTS = {"Management": 1, "Sales": 4, "Support": 5}
+# Created at dates are spread over that many days before the reference date
+HISTORY_DAYS = 3 * 365
+# Reference date, so that the data does not depend on the day it is generated
+REFERENCE_DATE = datetime.datetime(2026, 1, 1)
+
+
+def created_at(rng: random.Random) -> datetime.datetime:
+    """Return a creation datetime within HISTORY_DAYS before REFERENCE_DATE."""
+    return REFERENCE_DATE - datetime.timedelta(
+        seconds=rng.randrange(HISTORY_DAYS * 24 * 3600)
+    )
+
+
+def employee_rows(
+    rng: random.Random,
+    count: int,
+    first_id: int,
+    password_hash: str,
+    department_ids: Dict[str, int],
+) -> List[dict]:
+    """
+    Return rows of employees spread over departments (see DEPARTMENT_WEIGHTS).
+    All of them share the same password hash, computed once by the caller.
+    """
+    names = list(DEPARTMENT_WEIGHTS)
+    weights = list(DEPARTMENT_WEIGHTS.values())
+    rows = []
+    for employee_id in range(first_id, first_id + count):
+        fname, lname = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        department = rng.choices(names, weights)[0]
+        creation = created_at(rng)
+        rows.append(
+            {
+                "id": employee_id,
+                "fname": fname,
+                "lname": lname,
+                "email": f"{fname[0].lower()}{lname.lower()}{employee_id}"
+                f"@{department.lower()}.seed.test",
+                "password": password_hash,
+                "department_id": department_ids[department],
+                "created_at": creation,
+                "last_updated": creation,
+            }
+        )
+    return rows
+
+
+def client_rows(
+    rng: random.Random, count: int, first_id: int, salesperson_ids: Sequence[int]
+) -> Iterator[dict]:
+    """Yield rows of clients, each assigned to one of the given salespeople."""
+    for client_id in range(first_id, first_id + count):
+        fname, lname = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        company = f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}"
+        creation = created_at(rng)
+        yield {
+            "id": client_id,
+            "fname": fname,
+            "lname": lname,
+            "email": f"{fname[0].lower()}.{lname.lower()}{client_id}@client.seed.test",
+            # unique, as the phone column is
+            "phone": f"+33{client_id:09d}",
+            "company_name": company if rng.random() < 0.8 else None,
+            "salesperson_id": rng.choice(salesperson_ids),
+            "created_at": creation,
+            "last_updated": creation,
+        }
+
+
+def contract_rows(
+    rng: random.Random,
+    count: int,
+    first_id: int,
+    client_ids: Sequence[int],
+    signed_count: int,
+) -> Iterator[dict]:
+    """
+    Yield rows of contracts. The first signed_count ones are signed, so that events
+    can be attached to them, the others are signed or not at random.
+    """
+    for index, contract_id in enumerate(range(first_id, first_id + count)):
+        total = Decimal(rng.randrange(50_000, 5_000_000)) / 100
+        signed = index < signed_count or rng.random() < 0.5
+        paid_ratio = rng.choice((0, 0.3, 0.5, 1, 1)) if signed else 0
+        creation = created_at(rng)
+        yield {
+            "id": contract_id,
+            "client_id": rng.choice(client_ids),
+            "total_amount": total,
+            "due_amount": (total * Decimal(1 - paid_ratio)).quantize(Decimal("0.01")),
+            "signed": signed,
+            "created_at": creation,
+            "last_updated": creation,
+        }
+
+
+def event_rows(
+    rng: random.Random,
+    count: int,
+    first_id: int,
+    first_contract_id: int,
+    support_ids: Sequence[int],
+) -> Iterator[dict]:
+    """
+    Yield rows of events, one per contract starting from first_contract_id.
+    About one event in ten has no support person yet.
+    """
+    for index, event_id in enumerate(range(first_id, first_id + count)):
+        city, country, postal_prefix = rng.choice(PLACES)
+        creation = created_at(rng)
+        # events take place from a few days to two years after their creation
+        start = (creation + datetime.timedelta(days=rng.randrange(3, 730))).replace(
+            hour=rng.randrange(8, 20), minute=0, second=0
+        )
+        has_support = support_ids and rng.random() < 0.9
+        yield {
+            "id": event_id,
+            "name": f"{rng.choice(EVENT_KINDS)} {rng.choice(LAST_NAMES).title()}",
+            "start_datetime": start,
+            "end_datetime": start + datetime.timedelta(hours=rng.randrange(2, 72)),
+            "address_line1": f"{rng.randrange(1, 200)} {rng.choice(STREETS)}",
+            "city": city,
+            "country": country,
+            "postal_code": f"{postal_prefix}{rng.randrange(1000):03d}",
+            "attendees_number": rng.randrange(5, 1000),
+            "notes": None,
+            "contract_id": first_contract_id + index,
+            "support_person_id": rng.choice(support_ids) if has_support else None,
+            "created_at": creation,
+            "last_updated": creation,
+        }
+
+
+def batched(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    """Yield lists of at most size rows."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def insert_rows(
+    connection: Connection, table: Table, rows: Iterable[dict], batch_size: int
+) -> int:
+    """
+    Insert rows by batches, committing each of them, and return how many were
+    inserted. Each batch is sent as multi-row INSERT ... VALUES statements.
+    """
+    count = 0
+    for batch in batched(rows, batch_size):
+        connection.execute(insert(table), batch)
+        connection.commit()
+        count += len(batch)
+    return count
+
+
+def seed_database(
+    connection: Connection,
+    counts: Dict[str, int],
+    seed: int = 0,
+    batch_size: int = 5000,
+    password: str = "Passw0rd",
+) -> Iterator[Tuple[str, int, float]]:
+    """
+    Add counts["employees"], ["clients"], ["contracts"] and ["events"] rows after the
+    existing ones, yielding (table name, rows added, seconds) as each table is done.
+    Clients go to seeded salespeople (existing ones if none is seeded), events to
+    seeded contracts. Raise ValueError if the counts do not allow valid references.
+    """
+    employees, clients = counts.get("employees", 0), counts.get("clients", 0)
+    contracts, events = counts.get("contracts", 0), counts.get("events", 0)
+    if events > contracts:
+        raise ValueError("There cannot be more events than contracts.")
+    rng = random.Random(seed)
+
+    def next_id(model) -> int:
+        return (connection.scalar(select(func.max(model.id))) or 0) + 1
+
+    def ids_of(department_id: int, rows: List[dict]) -> List[int]:
+        ids = [row["id"] for row in rows if row["department_id"] == department_id]
+        if not ids:
+            ids = connection.scalars(
+                select(Employee.id).filter_by(department_id=department_id)
+            ).all()
+        return ids
+
+    department_ids = dict(
+        connection.execute(select(Department.name, Department.id)).all()
+    )
+    # Argon2 is slow on purpose: hash once for all employees
+    password_hash = PasswordHasher().hash(password)
+    seeded_employees = employee_rows(
+        rng, employees, next_id(Employee), password_hash, department_ids
+    )
+    salesperson_ids = ids_of(department_ids["Sales"], seeded_employees)
+    support_ids = ids_of(department_ids["Support"], seeded_employees)
+    if clients and not salesperson_ids:
+        raise ValueError("No salesperson to assign the clients to.")
+    first_client_id = next_id(Client)
+    client_ids = range(first_client_id, first_client_id + clients)
+    if contracts and not client_ids:
+        client_ids = connection.scalars(select(Client.id)).all()
+        if not client_ids:
+            raise ValueError("No client to attach the contracts to.")
+    first_contract_id = next_id(Contract)
+
+    # Generators: rows of a table are only generated when it is inserted
+    tables = (
+        (Employee, seeded_employees),
+        (Client, client_rows(rng, clients, first_client_id, salesperson_ids)),
+        (
+            Contract,
+            contract_rows(rng, contracts, first_contract_id, client_ids, events),
+        ),
+        (
+            Event,
+            event_rows(rng, events, next_id(Event), first_contract_id, support_ids),
+        ),
+    )
+    for model, rows in tables:
+        started = time.perf_counter()
+        count = insert_rows(connection, model.__table__, rows, batch_size)
+        if count:
+            yield model.__tablename__, count, time.perf_counter() - started
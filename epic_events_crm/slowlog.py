@@ -0,0 +1,242 @@
+"""
+Slow query log: statements of the app engine slower than a threshold are written to
+a rotating local file, one JSON object per line, with their parameters redacted (only
+their types are kept), the repository method that sent them and the query plan the
+database gives for them at that moment (EXPLAIN FORMAT=JSON on MySQL, EXPLAIN QUERY
+PLAN on SQLite). `eecrm slowlog` summarizes the log by statement fingerprint.
+"""
+
+import configparser
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from epic_events_crm.profiling import PROJECT_ROOT, fingerprint
+
+# get infos from the config file, regardless of the current working directory
+dir_path = os.path.dirname(os.path.realpath(__file__))
+config = configparser.ConfigParser()
+config.read(os.path.join(dir_path, "config.ini"))
+
+REPOSITORIES_DIRECTORY = os.path.join(dir_path, "repositories")
+SQLALCHEMY_DIRECTORY = os.path.dirname(os.path.dirname(event.__file__))
+# Statement prefixes each dialect can explain, and how
+EXPLAIN_PREFIXES = {"mysql": "EXPLAIN FORMAT=JSON ", "sqlite": "EXPLAIN QUERY PLAN "}
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "REPLACE", "WITH")
+
+
+def redact(parameters: Any) -> Any:
+    """Return the parameters with each value replaced by its type name."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def location(frame) -> str:
+    """Return file:line function of a frame, the file relative to the project."""
+    filename = frame.f_code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    return f"{filename}:{frame.f_lineno} {frame.f_code.co_qualname}"
+
+
+def find_repository_caller() -> str:
+    """
+    Return the repository method that sent the statement, as file:line function,
+    or the first caller outside SQLAlchemy if it was not sent by a repository.
+    """
+    frame = sys._getframe(2)
+    caller = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(REPOSITORIES_DIRECTORY):
+            return location(frame)
+        # generated code (<string>...) comes from SQLAlchemy decorators too
+        if caller is None and not filename.startswith((SQLALCHEMY_DIRECTORY, "<")):
+            caller = location(frame)
+        frame = frame.f_back
+    return caller or "unknown"
+
+
+def explain(conn, statement: str, parameters: Any) -> Any:
+    """
+    Return the plan of a statement from the database, None if it cannot be
+    explained. A separate DBAPI cursor is used so that no event is triggered.
+    """
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
+        cursor.close()
+    if conn.dialect.name == "mysql":
+        return json.loads(rows[0][0])
+    return [row[-1] for row in rows]
+
+
+def plan_summary(plan: Any) -> List[str]:
+    """
+    Return one line per table of a plan: how it is accessed, with which index and
+    how many rows are examined. A full scan (ALL, SCAN) usually misses an index.
+    """
+    if isinstance(plan, list):
+        return [str(step) for step in plan]
+    if not isinstance(plan, dict):
+        return []
+    if "error" in plan:
+        return [f"EXPLAIN failed: {plan['error']}"]
+    lines = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if "table_name" in node and "access_type" in node:
+                lines.append(
+                    f"{node['table_name']}: {node['access_type']}"
+                    f" key={node.get('key', '-')}"
+                    f" rows={node.get('rows_examined_per_scan', '?')}"
+                )
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(plan)
+    return lines
+
+
+class SlowQueryLog:
+    """Log the statements slower than threshold_ms of the engines it is attached to."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.enabled = config.getboolean("slow-query-log", "enabled", fallback=True)
+        self.threshold = (
+            config.getfloat("slow-query-log", "threshold_ms", fallback=250) / 1000
+        )
+        self.explain = config.getboolean("slow-query-log", "explain", fallback=True)
+        path = path or config.get("slow-query-log", "path", fallback="")
+        self.path = path or os.path.join(
+            os.path.expanduser("~"), ".cache", "eecrm", "slow_queries.log"
+        )
+        self.max_bytes = config.getint(
+            "slow-query-log", "max_bytes", fallback=1_000_000
+        )
+        self.backup_count = config.getint("slow-query-log", "backup_count", fallback=3)
+        self._logger = None
+
+    @property
+    def logger(self) -> logging.Logger:
+        """The logger writing to the rotating file, created on the first slow query."""
+        if self._logger is None:
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            self._logger = logging.getLogger(f"eecrm.slowlog.{self.path}")
+            if not self._logger.handlers:
+                handler = logging.handlers.RotatingFileHandler(
+                    self.path, maxBytes=self.max_bytes, backupCount=self.backup_count
+                )
+                self._logger.addHandler(handler)
+            self._logger.propagate = False
+            self._logger.setLevel(logging.INFO)
+        return self._logger
+
+    def attach(self, engine: Engine) -> None:
+        """Start timing the statements of an engine, if the log is enabled."""
+        if self.enabled:
+            event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+
+    def before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("slowlog_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        duration = time.perf_counter() - conn.info["slowlog_started"].pop()
+        if duration < self.threshold:
+            return
+        entry = {
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "duration_ms": round(duration * 1000, 1),
+            "fingerprint": fingerprint(statement),
+            "statement": " ".join(statement.split()),
+            "parameters": redact(parameters),
+            "caller": find_repository_caller(),
+        }
+        if self.explain and not executemany:
+            entry["plan"] = explain(conn, statement, parameters)
+        try:
+            self.logger.info(json.dumps(entry, default=str))
+        except OSError:
+            pass  # the log must never make a command fail
+
+    def entries(self) -> Iterator[dict]:
+        """Yield the logged entries, oldest first, rotated files included."""
+        paths = [f"{self.path}.{index}" for index in range(self.backup_count, 0, -1)]
+        for path in paths + [self.path]:
+            try:
+                with open(path) as file:
+                    lines = file.readlines()
+            except OSError:
+                continue
+            for line in lines:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+@dataclass
+class SlowStatement:
+    """Logged executions of a statement fingerprint."""
+
+    fingerprint: str
+    durations: List[float] = field(default_factory=list)
+    callers: Dict[str, int] = field(default_factory=dict)
+    last_time: str = ""
+    last_plan: Any = None
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.durations)
+
+
+def summarize(entries: Iterator[dict], since: str = "") -> List[SlowStatement]:
+    """
+    Group entries logged since an ISO datetime by fingerprint, the statements
+    costing the most time first.
+    """
+    statements = {}
+    for entry in entries:
+        if entry.get("time", "") < since:
+            continue
+        stats = statements.setdefault(
+            entry["fingerprint"], SlowStatement(entry["fingerprint"])
+        )
+        stats.durations.append(entry["duration_ms"])
+        caller = entry.get("caller", "unknown")
+        stats.callers[caller] = stats.callers.get(caller, 0) + 1
+        stats.last_time = entry["time"]
+        if entry.get("plan") is not None:
+            stats.last_plan = entry["plan"]
+    return sorted(statements.values(), key=lambda stats: -stats.total_ms)
+
+
+slow_query_log = SlowQueryLog()
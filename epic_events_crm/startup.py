@@ -0,0 +1,106 @@
+"""
+Cold-start report of eecrm (--startup-report): what a command pays before running.
+A new interpreter imports eecrm with -X importtime then configures the mappers, so
+the report does not depend on what the current process has already imported.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Seconds a new process may take to import eecrm and configure the mappers
+COLD_START_BUDGET = 1.0
+# Modules whose import is deferred until a command needs them
+LAZY_MODULES = ("argon2", "jwt", "rich.table", "sentry_sdk")
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import eecrm
+imported = time.perf_counter()
+from sqlalchemy.orm import configure_mappers
+configure_mappers()
+configured = time.perf_counter()
+print(json.dumps({"imports": imported - started, "mappers": configured - imported}))
+"""
+# import time: <self us> | <cumulative us> | <indentation><module>
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+@dataclass
+class StartupReport:
+    """Cold start of eecrm, in seconds."""
+
+    process: float
+    imports: float
+    mappers: float
+    # Own import time of each module (microseconds), in import order
+    modules: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def interpreter(self) -> float:
+        """Time spent starting and stopping the interpreter itself."""
+        return max(self.process - self.imports - self.mappers, 0.0)
+
+    @property
+    def cold_start(self) -> float:
+        """Time before a command can run, interpreter startup excluded."""
+        return self.imports + self.mappers
+
+    def by_package(self, limit: Optional[int] = None) -> List[tuple]:
+        """
+        Return (package, seconds) of the slowest imports, most expensive first.
+        Modules are grouped by top level package, except the project ones.
+        """
+        packages = defaultdict(int)
+        for module, microseconds in self.modules.items():
+            if module.startswith("epic_events_crm."):
+                packages[module] += microseconds
+            else:
+                packages[module.split(".")[0]] += microseconds
+        slowest = sorted(packages.items(), key=lambda item: -item[1])[:limit]
+        return [(package, microseconds / 1e6) for package, microseconds in slowest]
+
+
+def parse_import_times(output: str) -> Dict[str, int]:
+    """Return the own import time (microseconds) of each module of -X importtime."""
+    modules = {}
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(1))
+    return modules
+
+
+def measure(env: Optional[dict] = None) -> StartupReport:
+    """
+    Import eecrm in a new interpreter and return its startup report.
+    Raise RuntimeError if the import fails.
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    process = time.perf_counter() - started
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        raise RuntimeError(f"Could not import eecrm: {error[-1] if error else ''}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return StartupReport(
+        process=process,
+        imports=timings["imports"],
+        mappers=timings["mappers"],
+        modules=parse_import_times(result.stderr),
+    )
@@ -0,0 +1,122 @@
+"""
+Storage of the JWT token of the logged in employee, in a private directory of the
+current OS user (so employees sharing a host do not overwrite each other's token).
+Files are written to a temporary file then atomically replaced, so readers never see
+a partial write. The claims of a verified token are stored alongside, keyed by the
+token hash, so that following commands can skip decoding and signature checks.
+Those files are only readable by their OS user, who already holds the database
+credentials anyway.
+"""
+
+import configparser
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+# get infos from the config file, regardless of the current working directory
+dir_path = os.path.dirname(os.path.realpath(__file__))
+config = configparser.ConfigParser()
+config.read(os.path.join(dir_path, "config.ini"))
+
+TOKEN_FILE = "token"
+REFRESH_FILE = "refresh"
+CLAIMS_FILE = "claims.json"
+
+
+def token_hash(token: str) -> str:
+    """Return the SHA-256 hex digest of a token."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenStore:
+    """Token and verified claims of the current OS user."""
+
+    def __init__(self, directory: Optional[str] = None):
+        directory = directory or config.get("token-store", "directory", fallback="")
+        self.directory = directory or os.path.join(os.path.expanduser("~"), ".eecrm")
+        # claims verified during this process, by token hash
+        self._verified = {}
+
+    def _read(self, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, name)) as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def _write(self, name: str, content: str) -> None:
+        """Write a file readable by the current user only, atomically."""
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        file_descriptor = os.open(
+            temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+        )
+        with os.fdopen(file_descriptor, "w") as file:
+            file.write(content)
+        os.replace(temporary_path, path)
+
+    def _remove(self, name: str) -> None:
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+
+    def load(self) -> Optional[str]:
+        """Return the stored token, None if there is none."""
+        token = self._read(TOKEN_FILE)
+        return token.strip() if token else None
+
+    def save(self, token: str) -> None:
+        """Store a new token, dropping the claims of the previous one."""
+        self._remove(CLAIMS_FILE)
+        self._write(TOKEN_FILE, token)
+
+    def load_refresh(self) -> Optional[str]:
+        """Return the stored refresh token, None if there is none."""
+        refresh_token = self._read(REFRESH_FILE)
+        return refresh_token.strip() if refresh_token else None
+
+    def save_refresh(self, refresh_token: str) -> None:
+        """Store a new refresh token."""
+        self._write(REFRESH_FILE, refresh_token)
+
+    def clear(self) -> None:
+        """Remove the stored tokens and claims, logging the user out."""
+        self._remove(CLAIMS_FILE)
+        self._remove(TOKEN_FILE)
+        self._remove(REFRESH_FILE)
+        self._verified.clear()
+
+    def get_claims(self, token: str) -> Optional[dict]:
+        """
+        Return the claims verified for this token, None if they were not verified
+        yet or if the token has expired since.
+        """
+        key = token_hash(token)
+        claims = self._verified.get(key)
+        if claims is None:
+            try:
+                entry = json.loads(self._read(CLAIMS_FILE) or "{}")
+            except ValueError:
+                return None
+            if entry.get("token_hash") != key:
+                return None
+            claims = entry.get("claims")
+            if not isinstance(claims, dict):
+                return None
+            self._verified[key] = claims
+        if claims.get("exp", 0) <= time.time():
+            return None
+        return claims
+
+    def set_claims(self, token: str, claims: dict) -> None:
+        """Store the claims of a token whose signature has just been verified."""
+        key = token_hash(token)
+        self._verified[key] = claims
+        try:
+            self._write(CLAIMS_FILE, json.dumps({"token_hash": key, "claims": claims}))
+        except OSError:
+            pass  # the token will just be verified again by the next command
@@ -0,0 +1,113 @@
+"""
+Opt-in Sentry performance tracing: each eecrm command is a transaction, with child
+spans for the token decoding, the permissions check, the rendering and, through the
+SQLAlchemy integration, every query (with the code line that sent it).
+Tracing is enabled when SENTRY_DSN is set and the sample rate (tracing section of
+config.ini, or SENTRY_TRACES_SAMPLE_RATE) is above 0. Otherwise the helpers below
+return the functions unchanged or a shared no-op context: no overhead at all, and
+sentry_sdk is only imported when there is a DSN.
+"""
+
+import configparser
+import contextlib
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+# get infos from the config file, regardless of the current working directory
+dir_path = os.path.dirname(os.path.realpath(__file__))
+config = configparser.ConfigParser()
+config.read(os.path.join(dir_path, "config.ini"))
+
+load_dotenv()
+DSN = os.environ.get("SENTRY_DSN")
+TRACES_SAMPLE_RATE = float(
+    os.environ.get("SENTRY_TRACES_SAMPLE_RATE")
+    or config.getfloat("tracing", "traces_sample_rate", fallback=0.0)
+)
+ENABLED = bool(DSN) and TRACES_SAMPLE_RATE > 0
+
+NO_SPAN = contextlib.nullcontext()
+
+
+def init_sentry() -> None:
+    """
+    Initialize Sentry if a DSN is set. Without one, Sentry is not initialized at
+    all, as it would still register its integrations (SQLAlchemy listeners...).
+    """
+    if not DSN:
+        return
+    import sentry_sdk
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+
+    sentry_sdk.init(
+        dsn=DSN,
+        traces_sample_rate=TRACES_SAMPLE_RATE if ENABLED else None,
+        integrations=[SqlalchemyIntegration()],
+        enable_db_query_source=True,
+    )
+
+
+def span(op: str, description: Optional[str] = None):
+    """Return a context manager timing a block as a child span of the trace."""
+    if not ENABLED:
+        return NO_SPAN
+    import sentry_sdk
+
+    return sentry_sdk.start_span(op=op, description=description)
+
+
+def traced(op: str, description: Optional[str] = None):
+    """
+    Decorator making each call a child span of the trace. The function is returned
+    as is when tracing is disabled.
+    """
+
+    def decorator(func):
+        if not ENABLED:
+            return func
+        import sentry_sdk
+
+        def wrapper(*args, **kwargs):
+            with sentry_sdk.start_span(
+                op=op, description=description or func.__qualname__
+            ):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def command_transaction(name: str):
+    """
+    Trace a command as a transaction. Commands run by another one (batch mode) are
+    child spans of its transaction instead.
+    """
+    import sentry_sdk
+
+    if sentry_sdk.get_current_span() is not None:
+        with sentry_sdk.start_span(op="cli.command", description=name):
+            yield
+    else:
+        with sentry_sdk.start_transaction(op="cli.command", name=name, source="task"):
+            yield
+
+
+def set_user(claims: dict) -> None:
+    """Attach the logged in employee to the events and transactions."""
+    if ENABLED:
+        import sentry_sdk
+
+        sentry_sdk.set_user({"id": claims["uid"]})
+        sentry_sdk.set_tag("department_id", claims.get("department_id"))
+
+
+def capture_message(message: str, level: str = "info") -> None:
+    """Send a message to Sentry, if there is a DSN."""
+    if DSN:
+        import sentry_sdk
+
+        sentry_sdk.capture_message(message, level=level)
@@ -6,6 +6,10 @@ from epic_events_crm.views.console import console
 class BaseView:
     """Basic views for the CRM app."""
 
+    # Errors and warnings displayed so far, shared by all instances. Lets the batch
+    # mode know if a command failed, as commands display errors instead of raising.
+    issues_count = 0
+
     def __init__(self):
         self.console = console
 
@@ -17,13 +21,21 @@ class BaseView:
         """Ask for the app key."""
         return getpass.getpass("Please enter the application key: ")
 
-    def display_as(self, msg: str, level: str) -> None:
-        """Display a message with a specific style depending on the level."""
+    def display_as(self, msg: str, level: str, issue: bool = True) -> None:
+        """
+        Display a message with a specific style depending on the level. Warnings
+        and errors are counted in issues_count, unless issue is False (a warning
+        about a command that did what it was asked, like a dry run).
+        """
         if level == "info":
             self.console.print(msg, style="bold green")
         elif level == "warning":
+            if issue:
+                BaseView.issues_count += 1
             self.console.print(msg, style="bold gold1")
         elif level == "error":
+            if issue:
+                BaseView.issues_count += 1
             self.console.print(msg, style="bold red")
         else:
             self.console.print(msg)
@@ -1,7 +1,7 @@
-from typing import List, TYPE_CHECKING
-from rich.table import Table
+from typing import Iterable, Iterator, List, TYPE_CHECKING
 
-from epic_events_crm.views.console import console
+from epic_events_crm.views.console import PLAIN_THRESHOLD, console
+from epic_events_crm.views.plain import display_plain
 
 if TYPE_CHECKING:
     from epic_events_crm.models.clients import Client
@@ -10,21 +10,52 @@ if TYPE_CHECKING:
 class ClientView:
     """Client related views"""
 
+    # Columns of long listings, rendered as plain text (header, width)
+    PLAIN_COLUMNS = (
+        ("ID", 7),
+        ("Firstname", 16),
+        ("Lastname", 16),
+        ("Email", 30),
+        ("Phone", 20),
+        ("Company Name", 24),
+        ("Sales person (ID)", 40),
+    )
+
     def __init__(self):
         self.console = console
 
-    def display_clients(self, clients: List["Client"]) -> None:
+    def plain_rows(self, clients: Iterable["Client"]) -> Iterator[tuple]:
+        """Yield the rows of clients for the plain renderer."""
+        for client in clients:
+            yield (
+                client.id,
+                client.fname,
+                client.lname,
+                client.email,
+                client.phone,
+                client.company_name,
+                f"{client.salesperson.email} ({client.salesperson.id})",
+            )
+
+    def display_clients(self, clients: List["Client"], title: str = "CLIENTS") -> None:
         """Display a list of clients"""
+        from rich.table import Table
+
         if not clients:
             self.console.print("No clients found.", style="bold yellow")
             return
+        if len(clients) > PLAIN_THRESHOLD:
+            display_plain(
+                title, self.PLAIN_COLUMNS, self.plain_rows(clients), len(clients)
+            )
+            return
 
         # Create a table
         table = Table(
             show_header=True,
             header_style="bold magenta",
             style="on blue",
-            title="CLIENTS",
+            title=title,
             title_style="bold white",
         )
         table.add_column("ID")
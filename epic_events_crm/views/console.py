@@ -1,3 +1,91 @@
+import configparser
+import contextlib
+import os
+from typing import Callable, Iterator, Optional
+
 from rich.console import Console
 
-console = Console()
+from epic_events_crm.tracing import ENABLED as TRACING, span
+
+# get infos from the config file, regardless of the current working directory
+dir_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+config = configparser.ConfigParser()
+config.read(os.path.join(dir_path, "config.ini"))
+
+# Listings of more rows are rendered as plain text (see views/plain.py)
+PLAIN_THRESHOLD = config.getint("views", "plain_threshold", fallback=500)
+PAGER = os.environ.get("EECRM_PAGER", config.get("views", "pager", fallback=""))
+
+
+class TracedConsole(Console):
+    """Console whose prints are rendering spans of the current trace."""
+
+    def print(self, *objects, **kwargs) -> None:
+        with span("ui.render", "console.print"):
+            super().print(*objects, **kwargs)
+
+
+console = TracedConsole() if TRACING else Console()
+# Set while captured() is used: plain text then goes through the console capture
+capturing = False
+
+
+@contextlib.contextmanager
+def captured():
+    """Capture what is displayed, plain text included. Yield the rich Capture."""
+    global capturing
+    capturing = True
+    try:
+        with console.capture() as capture:
+            yield capture
+    finally:
+        capturing = False
+
+
+def interactive() -> bool:
+    """Return True if output goes to a terminal with a pager, not captured."""
+    return bool(PAGER) and console.is_terminal and not capturing
+
+
+@contextlib.contextmanager
+def pager_or_console(
+    lines_count: Optional[int] = None,
+) -> Iterator[Callable[[str], None]]:
+    """
+    Yield a function writing plain text, as it comes. Text longer than the terminal
+    (lines_count None if not known yet) goes through the pager (config [views]
+    pager, EECRM_PAGER overriding it) when interactive; captured text through the
+    console; the console file otherwise.
+    """
+    if capturing:
+        yield lambda text: console.out(text, end="", highlight=False)
+        return
+    console.file.flush()
+    too_long = lines_count is None or lines_count >= console.height
+    if not (interactive() and too_long):
+        yield console.file.write
+        return
+    import shlex
+    import subprocess
+
+    try:
+        pager = subprocess.Popen(
+            shlex.split(PAGER), stdin=subprocess.PIPE, text=True, errors="replace"
+        )
+    except OSError:  # pager not installed
+        yield console.file.write
+        return
+    try:
+        yield pager.stdin.write
+    except BrokenPipeError:
+        pass  # the pager was quit before the end
+    finally:
+        with contextlib.suppress(BrokenPipeError):
+            pager.stdin.close()
+        pager.wait()
+
+
+def write_text(text: str) -> None:
+    """Write plain text, through the pager if longer than the terminal."""
+    with pager_or_console(text.count("\n")) as write:
+        write(text)
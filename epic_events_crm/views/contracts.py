@@ -1,7 +1,7 @@
-from typing import List, TYPE_CHECKING
-from rich.table import Table
+from typing import Iterable, Iterator, List, TYPE_CHECKING
 
-from epic_events_crm.views.console import console
+from epic_events_crm.views.console import PLAIN_THRESHOLD, console
+from epic_events_crm.views.plain import display_plain
 
 if TYPE_CHECKING:
     from epic_events_crm.models.contracts import Contract
@@ -10,21 +10,57 @@ if TYPE_CHECKING:
 class ContractView:
     """Contract related views"""
 
+    # Columns of long listings, rendered as plain text (header, width)
+    PLAIN_COLUMNS = (
+        ("ID", 7),
+        ("Client Name (ID)", 36),
+        ("Price (EUR)", 12),
+        ("Due (EUR)", 12),
+        ("Signed", 6),
+        ("Event name (ID)", 40),
+    )
+
     def __init__(self):
         self.console = console
 
-    def display_contracts(self, contracts: List["Contract"]) -> None:
+    def plain_rows(self, contracts: Iterable["Contract"]) -> Iterator[tuple]:
+        """Yield the rows of contracts for the plain renderer."""
+        for contract in contracts:
+            yield (
+                contract.id,
+                f"{contract.client.fname} {contract.client.lname} "
+                f"({contract.client_id})",
+                contract.total_amount,
+                contract.due_amount,
+                contract.signed,
+                (
+                    f"{contract.event.name} ({contract.event.id})"
+                    if contract.event
+                    else ""
+                ),
+            )
+
+    def display_contracts(
+        self, contracts: List["Contract"], title: str = "CONTRACTS"
+    ) -> None:
         """Display a list of contracts"""
+        from rich.table import Table
+
         if not contracts:
             self.console.print("No contracts found.", style="bold yellow")
             return
+        if len(contracts) > PLAIN_THRESHOLD:
+            display_plain(
+                title, self.PLAIN_COLUMNS, self.plain_rows(contracts), len(contracts)
+            )
+            return
 
         # Create a table
         table = Table(
             show_header=True,
             header_style="bold magenta",
             style="on blue",
-            title="CONTRACTS",
+            title=title,
             title_style="bold white",
         )
         table.add_column("ID")
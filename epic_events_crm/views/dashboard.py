@@ -0,0 +1,40 @@
+from typing import List, TYPE_CHECKING
+
+from epic_events_crm.views.clients import ClientView
+from epic_events_crm.views.console import console
+from epic_events_crm.views.contracts import ContractView
+from epic_events_crm.views.events import EventView
+
+if TYPE_CHECKING:
+    from epic_events_crm.controllers.dashboard import Section
+    from epic_events_crm.models.employees import Employee
+
+
+class DashboardView:
+    """Dashboard related views"""
+
+    def __init__(self):
+        self.console = console
+        self.displays = {
+            "clients": ClientView().display_clients,
+            "contracts": ContractView().display_contracts,
+            "events": EventView().display_events,
+        }
+
+    def display_today(
+        self, user: "Employee", sections: List["Section"], seconds: float
+    ) -> None:
+        """Display the sections of the dashboard, then how long their queries took"""
+        self.console.rule(f"TODAY - {user.fname} {user.lname} ({user.department.name})")
+        for section in sections:
+            if not section.rows:
+                self.console.print(f"{section.title}: nothing.", style="bold yellow")
+                continue
+            self.displays[section.kind](section.rows, title=section.title)
+        slowest = max(section.seconds for section in sections)
+        self.console.print(
+            f"{len(sections)} queries in {seconds * 1000:.0f} ms"
+            f" (slowest {slowest * 1000:.0f} ms, sum"
+            f" {sum(section.seconds for section in sections) * 1000:.0f} ms)",
+            style="dim",
+        )
@@ -1,7 +1,7 @@
-from typing import List, TYPE_CHECKING
-from rich.table import Table
+from typing import Iterable, Iterator, List, TYPE_CHECKING
 
-from epic_events_crm.views.console import console
+from epic_events_crm.views.console import PLAIN_THRESHOLD, console
+from epic_events_crm.views.plain import display_plain
 
 if TYPE_CHECKING:
     from epic_events_crm.models.employees import Employee
@@ -10,14 +10,44 @@ if TYPE_CHECKING:
 class EmployeeView:
     """Employee related views"""
 
+    # Columns of long listings, rendered as plain text (header, width)
+    PLAIN_COLUMNS = (
+        ("ID", 7),
+        ("Firstname", 16),
+        ("Lastname", 16),
+        ("Email", 36),
+        ("Department (ID)", 24),
+    )
+
     def __init__(self):
         self.console = console
 
+    def plain_rows(self, employees: Iterable["Employee"]) -> Iterator[tuple]:
+        """Yield the rows of employees for the plain renderer."""
+        for employee in employees:
+            yield (
+                employee.id,
+                employee.fname,
+                employee.lname,
+                employee.email,
+                f"{employee.department.name} ({employee.department.id})",
+            )
+
     def display_employees(self, employees: List["Employee"]) -> None:
         """Display a list of employees"""
+        from rich.table import Table
+
         if not employees:
             self.console.print("No employees found.", style="bold yellow")
             return
+        if len(employees) > PLAIN_THRESHOLD:
+            display_plain(
+                "EMPLOYEES",
+                self.PLAIN_COLUMNS,
+                self.plain_rows(employees),
+                len(employees),
+            )
+            return
 
         # Create a table
         table = Table(
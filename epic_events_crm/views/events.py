@@ -1,7 +1,7 @@
-from typing import List, TYPE_CHECKING
-from rich.table import Table
+from typing import Iterable, Iterator, List, TYPE_CHECKING
 
-from epic_events_crm.views.console import console
+from epic_events_crm.views.console import PLAIN_THRESHOLD, console
+from epic_events_crm.views.plain import display_plain
 
 if TYPE_CHECKING:
     from epic_events_crm.models.events import Event
@@ -10,21 +10,60 @@ if TYPE_CHECKING:
 class EventView:
     """Event related views"""
 
+    # Columns of long listings, rendered as plain text (header, width)
+    PLAIN_COLUMNS = (
+        ("ID", 7),
+        ("Name", 28),
+        ("Start", 19),
+        ("End", 19),
+        ("Address", 40),
+        ("Guests", 6),
+        ("Contract", 8),
+        ("Support Person (ID)", 30),
+    )
+
     def __init__(self):
         self.console = console
 
-    def display_events(self, events: List["Event"]) -> None:
+    def plain_rows(self, events: Iterable["Event"]) -> Iterator[tuple]:
+        """Yield the rows of events for the plain renderer."""
+        for event in events:
+            yield (
+                event.id,
+                event.name,
+                event.start_datetime,
+                event.end_datetime,
+                f"{event.address_line1}, {event.postal_code} {event.city}, "
+                f"{event.country}",
+                event.attendees_number,
+                event.contract_id,
+                (
+                    f"{event.support_person.fname} {event.support_person.lname} "
+                    f"({event.support_person_id})"
+                    if event.support_person
+                    else ""
+                ),
+            )
+
+    def display_events(self, events: List["Event"], title: str = "EVENTS") -> None:
         """Display a list of events"""
+        from rich.table import Table
+
         if not events:
             self.console.print("No events found.", style="bold yellow")
             return
+        if len(events) > PLAIN_THRESHOLD:
+            display_plain(
+                title, self.PLAIN_COLUMNS, self.plain_rows(events), len(events)
+            )
+            return
 
         # Create a table
         table = Table(
             show_header=True,
             header_style="bold magenta",
             style="on blue",
-            title="EVENTS",
+            title=title,
             title_style="bold white",
         )
         table.add_column("ID")
@@ -59,3 +98,44 @@ class EventView:
             )
 
         self.console.print(table)
+
+    def display_assignments(
+        self, planned: List[tuple], unassigned: List[tuple]
+    ) -> None:
+        """Display planned support assignments and events left without support."""
+        from rich.table import Table
+
+        if not planned and not unassigned:
+            self.console.print("No events without support.", style="bold yellow")
+            return
+
+        table = Table(
+            show_header=True,
+            header_style="bold magenta",
+            style="on blue",
+            title="SUPPORT ASSIGNMENTS",
+            title_style="bold white",
+        )
+        table.add_column("Event ID")
+        table.add_column("Name")
+        table.add_column("Start")
+        table.add_column("End")
+        table.add_column("Support Person (ID)")
+        for event, support_person in planned:
+            table.add_row(
+                str(event.id),
+                event.name,
+                str(event.start_datetime),
+                str(event.end_datetime),
+                f"{support_person.fname} {support_person.lname} ({support_person.id})",
+            )
+        for event in unassigned:
+            table.add_row(
+                str(event.id),
+                event.name,
+                str(event.start_datetime),
+                str(event.end_datetime),
+                "No one available",
+            )
+
+        self.console.print(table)
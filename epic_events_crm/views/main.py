@@ -3,6 +3,9 @@ from epic_events_crm.views.employees import EmployeeView
 from epic_events_crm.views.clients import ClientView
 from epic_events_crm.views.contracts import ContractView
 from epic_events_crm.views.events import EventView
+from epic_events_crm.views.dashboard import DashboardView
+from epic_events_crm.views.metrics import MetricsView
+from epic_events_crm.views.profiler import ProfilerView
 
 
 class MainView:
@@ -14,3 +17,6 @@ class MainView:
         self.client = ClientView()
         self.contract = ContractView()
         self.event = EventView()
+        self.dashboard = DashboardView()
+        self.profiler = ProfilerView()
+        self.metrics = MetricsView()
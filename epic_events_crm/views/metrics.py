@@ -0,0 +1,61 @@
+from typing import List, Optional, TYPE_CHECKING
+
+from epic_events_crm.views.console import console
+
+if TYPE_CHECKING:
+    from epic_events_crm.metrics import CommandStats
+
+
+def as_percent(ratio: Optional[float]) -> str:
+    return "-" if ratio is None else f"{ratio * 100:.0f} %"
+
+
+class MetricsView:
+    """Local metrics related views"""
+
+    def __init__(self):
+        self.console = console
+
+    def display_stats(self, stats: List["CommandStats"], window: str) -> None:
+        """
+        Display the latency percentiles of each command, its queries per run, cache
+        hit ratios and mean Argon2 verification time
+        """
+        from rich.table import Table
+
+        if not stats:
+            self.console.print(f"No command run in the last {window}.", style="bold")
+            return
+
+        table = Table(
+            show_header=True,
+            header_style="bold magenta",
+            title=f"COMMANDS (last {window})",
+        )
+        table.add_column("Command", no_wrap=True)
+        table.add_column("Runs", justify="right")
+        table.add_column("Failed", justify="right")
+        table.add_column("p50 ms", justify="right")
+        table.add_column("p95 ms", justify="right")
+        table.add_column("p99 ms", justify="right")
+        table.add_column("Max ms", justify="right")
+        table.add_column("Queries", justify="right")
+        table.add_column("List cache", justify="right")
+        table.add_column("Ref. cache", justify="right")
+        table.add_column("Argon2 ms", justify="right")
+        for command_stats in stats:
+            argon2 = command_stats.argon2_verify_mean
+            table.add_row(
+                command_stats.command,
+                str(command_stats.runs),
+                str(command_stats.failed),
+                *(
+                    f"{command_stats.percentile(rank) * 1000:.0f}"
+                    for rank in (50, 95, 99, 100)
+                ),
+                f"{command_stats.per_run('queries'):.1f}",
+                as_percent(command_stats.hit_ratio("list")),
+                as_percent(command_stats.hit_ratio("reference")),
+                "-" if argon2 is None else f"{argon2 * 1000:.0f}",
+            )
+        self.console.print(table)
@@ -0,0 +1,61 @@
+"""
+Plain renderer of long listings. rich tables measure every cell to lay out their
+columns, which takes seconds past a few thousand rows: above PLAIN_THRESHOLD rows,
+the list views use fixed-width columns instead. Widths are given, not measured, so
+each row is formatted by one precompiled format string, and written as soon as it
+is made (through the pager when longer than the terminal). Values longer than their
+column are cut.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from epic_events_crm.views.console import pager_or_console
+
+# Rows formatted before each write, to the console or the pager
+CHUNK_ROWS = 256
+
+
+class PlainTable:
+    """Fixed-width table: columns are (header, width), the last one is not padded."""
+
+    def __init__(self, title: str, columns: Sequence[Tuple[str, int]]):
+        self.title = title
+        widths = [width for _, width in columns]
+        self.format = "  ".join(
+            [f"{{:<{width}.{width}}}" for width in widths[:-1]]
+            + [f"{{:.{widths[-1]}}}"]
+        )
+        self.header = self.format.format(*(header for header, _ in columns))
+        self.rule = "  ".join("-" * width for width in widths)
+
+    def lines(self, rows: Iterable[Sequence]) -> Iterator[str]:
+        """Yield the lines of the table, each row formatted when reached."""
+        yield self.title
+        yield self.header
+        yield self.rule
+        line = self.format.format
+        for row in rows:
+            yield line(*["" if value is None else str(value) for value in row])
+
+
+def display_plain(
+    title: str,
+    columns: Sequence[Tuple[str, int]],
+    rows: Iterable[Sequence],
+    count: Optional[int] = None,
+) -> None:
+    """
+    Write the rows (count of them, unknown for rows fetched lazily) as a PlainTable,
+    by chunks of CHUNK_ROWS.
+    """
+    table = PlainTable(title, columns)
+    with pager_or_console(None if count is None else count + 3) as write:
+        chunk: List[str] = []
+        for line in table.lines(rows):
+            chunk.append(line)
+            if len(chunk) == CHUNK_ROWS:
+                chunk.append("")
+                write("\n".join(chunk))
+                chunk = []
+        chunk.append("")
+        write("\n".join(chunk))
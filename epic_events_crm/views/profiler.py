@@ -0,0 +1,124 @@
+from typing import List, TYPE_CHECKING
+
+from epic_events_crm.views.console import console
+
+if TYPE_CHECKING:
+    from epic_events_crm.profiling import QueryProfiler
+    from epic_events_crm.slowlog import SlowStatement
+    from epic_events_crm.startup import StartupReport
+
+
+class ProfilerView:
+    """Query profiler related views"""
+
+    def __init__(self):
+        self.console = console
+
+    def display_report(self, profiler: "QueryProfiler") -> None:
+        """Display the queries count and time, slowest and repeated statements"""
+        from rich.table import Table
+
+        self.console.print(
+            f"\n{profiler.count} queries, {profiler.total_time * 1000:.1f} ms in the "
+            "database.",
+            style="bold cyan",
+        )
+        if not profiler.count:
+            return
+
+        table = Table(show_header=True, header_style="bold magenta", title="SLOWEST")
+        table.add_column("ms", justify="right")
+        table.add_column("Statement")
+        for duration, statement in profiler.slowest():
+            table.add_row(f"{duration * 1000:.2f}", " ".join(statement.split()))
+        self.console.print(table)
+
+        repeated = profiler.repeated()
+        if not repeated:
+            return
+        table = Table(
+            show_header=True,
+            header_style="bold magenta",
+            title="REPEATED STATEMENTS (possible N+1)",
+            title_style="bold yellow",
+        )
+        table.add_column("Count", justify="right")
+        table.add_column("ms", justify="right")
+        table.add_column("Fingerprint")
+        table.add_column("Sent from")
+        for stats in repeated:
+            callers = sorted(stats.callers.items(), key=lambda item: -item[1])
+            table.add_row(
+                str(stats.count),
+                f"{stats.total_time * 1000:.1f}",
+                stats.statement,
+                "\n".join(f"{caller} ({count})" for caller, count in callers[:3]),
+            )
+        self.console.print(table)
+
+    def display_startup_report(self, report: "StartupReport", budget: float) -> None:
+        """Display the cold start breakdown and the slowest imports"""
+        from rich.table import Table
+
+        table = Table(show_header=True, header_style="bold magenta", title="COLD START")
+        table.add_column("Step")
+        table.add_column("ms", justify="right")
+        table.add_row("Interpreter", f"{report.interpreter * 1000:.1f}")
+        table.add_row("Imports", f"{report.imports * 1000:.1f}")
+        table.add_row("Mappers configuration", f"{report.mappers * 1000:.1f}")
+        table.add_row("Whole process", f"{report.process * 1000:.1f}")
+        self.console.print(table)
+
+        table = Table(
+            show_header=True,
+            header_style="bold magenta",
+            title="SLOWEST IMPORTS (-X importtime, own time)",
+        )
+        table.add_column("Package")
+        table.add_column("ms", justify="right")
+        for package, seconds in report.by_package(limit=15):
+            table.add_row(package, f"{seconds * 1000:.1f}")
+        self.console.print(table)
+
+        style = "bold green" if report.cold_start <= budget else "bold red"
+        self.console.print(
+            f"Imports and mappers: {report.cold_start * 1000:.0f} ms "
+            f"(budget {budget * 1000:.0f} ms).",
+            style=style,
+        )
+
+    def display_slow_statements(
+        self, statements: List["SlowStatement"], window: str
+    ) -> None:
+        """Display the slow statements, their callers and their last query plan"""
+        from rich.table import Table
+
+        from epic_events_crm.slowlog import plan_summary
+
+        if not statements:
+            self.console.print(f"No slow query in the last {window}.", style="bold")
+            return
+
+        table = Table(
+            show_header=True,
+            header_style="bold magenta",
+            title=f"SLOW QUERIES (last {window})",
+            show_lines=True,
+        )
+        table.add_column("Count", justify="right")
+        table.add_column("Total ms", justify="right")
+        table.add_column("Max ms", justify="right")
+        table.add_column("Fingerprint")
+        table.add_column("Sent from")
+        table.add_column("Last plan")
+        for stats in statements:
+            callers = sorted(stats.callers.items(), key=lambda item: -item[1])
+            table.add_row(
+                str(len(stats.durations)),
+                f"{stats.total_ms:.0f}",
+                f"{max(stats.durations):.0f}",
+                stats.fingerprint,
+                "\n".join(f"{caller} ({count})" for caller, count in callers[:3]),
+                "\n".join(plan_summary(stats.last_plan)) or "-",
+            )
+        self.console.print(table)
@@ -1,3 +1,4 @@
+import datetime
 import os
 import pytest
 from dotenv import load_dotenv
@@ -5,7 +6,9 @@ from alembic import command
 from alembic.config import Config
 from sqlalchemy import delete
 
-from epic_events_crm.database import get_test_session
+from epic_events_crm.database import get_backend, get_test_session
+from epic_events_crm.init_db import create_schema
+from epic_events_crm.models import Base
 from epic_events_crm.views.base import BaseView
 
 view = BaseView()
@@ -14,6 +17,14 @@ view = BaseView()
 @pytest.fixture(scope="session", autouse=True)
 def run_migrations():
     """Run the alembic migrations on the test database."""
+    if get_backend() == "sqlite":
+        # No migrations on SQLite: tables are created from the models
+        engine = get_test_session().get_bind()
+        create_schema(engine)
+        yield
+        Base.metadata.drop_all(engine)
+        return
+
     load_dotenv()
     config = Config("alembic.ini")  # Tests run from the root directory
     db_test_name = os.getenv("DB_TEST_NAME")
@@ -170,8 +181,8 @@ contracts_kwargs = [
 events_kwargs = [
     {
         "name": "Event name 1",
-        "start_datetime": "2026-01-01 08:00",
-        "end_datetime": "2026-01-02 18:00",
+        "start_datetime": datetime.datetime(2026, 1, 1, 8, 0),
+        "end_datetime": datetime.datetime(2026, 1, 2, 18, 0),
         "address_line1": "69 rue Sophie Fic",
         "city": "Sophia Antipolis",
         "country": "France",
@@ -183,8 +194,8 @@ events_kwargs = [
     },
     {
         "name": "Event name 2",
-        "start_datetime": "2026-02-01 08:00",
-        "end_datetime": "2026-02-01 18:00",
+        "start_datetime": datetime.datetime(2026, 2, 1, 8, 0),
+        "end_datetime": datetime.datetime(2026, 2, 1, 18, 0),
         "address_line1": "69 rue de la teuf",
         "city": "Fun City",
         "country": "Dreamland",
@@ -195,8 +206,8 @@ events_kwargs = [
     },
     {
         "name": "Event name 3",
-        "start_datetime": "2026-07-01 08:00",
-        "end_datetime": "2026-08-01 18:00",
+        "start_datetime": datetime.datetime(2026, 7, 1, 8, 0),
+        "end_datetime": datetime.datetime(2026, 8, 1, 18, 0),
         "address_line1": "77A beach avenue",
         "city": "Beach City",
         "country": "Dreamland",
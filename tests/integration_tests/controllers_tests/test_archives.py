@@ -0,0 +1,101 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from epic_events_crm.controllers.archives import ArchiveController
+from epic_events_crm.controllers.contracts import ContractController
+from epic_events_crm.controllers.events import EventController
+from epic_events_crm.models.archives import ContractArchive, EventArchive
+from epic_events_crm.models.contracts import Contract
+from epic_events_crm.models.events import Event
+from epic_events_crm.repositories.archives import shared_columns
+
+
+class TestArchiveController:
+    """
+    Test ArchiveController class.
+    Take into account the 'populate_db' fixture from conftest.py.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def setup(cls, session):
+        cls.session = session
+        cls.controller = ArchiveController(session)
+
+    def test_archive_raises_errors(self):
+        """Test that an invalid chunk size raises an error."""
+        with pytest.raises(ValueError):
+            self.controller.archive(datetime(2000, 1, 1), chunk_size=0)
+
+    def test_archive_nothing_to_archive(self):
+        """Test that nothing is archived when no event ended before the date."""
+        assert self.controller.archive(datetime(2000, 1, 1)) == 0
+
+    def test_archive(self):
+        """
+        Test that a signed and paid contract whose event is over is moved to the
+        archive tables, with its event, their columns unchanged.
+        """
+        contract = Contract(client_id=3, total_amount=100, due_amount=0, signed=True)
+        self.session.add(contract)
+        self.session.flush()
+        event = Event(
+            name="Past event",
+            start_datetime=datetime(2020, 6, 1, 8, 0),
+            end_datetime=datetime(2020, 6, 1, 18, 0),
+            address_line1="1 rue du Test",
+            city="Test City",
+            country="France",
+            postal_code="12345",
+            attendees_number=10,
+            notes="Archived with its contract.",
+            contract_id=contract.id,
+            support_person_id=6,
+        )
+        self.session.add(event)
+        self.session.commit()
+        rows = {}
+        for obj, archive_table in (
+            (contract, ContractArchive.__table__),
+            (event, EventArchive.__table__),
+        ):
+            columns = shared_columns(obj.__table__, archive_table)
+            rows[archive_table.name] = {name: getattr(obj, name) for name in columns}
+        contract_id, event_id = contract.id, event.id
+        try:
+            # contract 3 (event in 2026) is not over yet
+            assert self.controller.archive(datetime(2021, 1, 1)) == 1
+            self.session.expunge_all()
+            assert self.count(Contract, contract_id) == 0
+            assert self.count(Event, event_id) == 0
+            assert self.count(Contract, 3) == 1
+            archived_contract = self.session.get(ContractArchive, contract_id)
+            archived_event = self.session.get(EventArchive, event_id)
+            for archived in (archived_contract, archived_event):
+                for name, value in rows[archived.__tablename__].items():
+                    assert getattr(archived, name) == value, name
+            assert archived_event.contract_id == contract_id
+
+            contracts = ContractController(self.session).get_all(include_archived=True)
+            assert contract_id in {
+                c.id for c in contracts if type(c) is ContractArchive
+            }
+            events = EventController(self.session).get_all(include_archived=True)
+            assert event_id in {e.id for e in events if type(e) is EventArchive}
+        finally:
+            self.session.rollback()
+            self.session.execute(
+                delete(EventArchive).where(EventArchive.id == event_id)
+            )
+            self.session.execute(
+                delete(ContractArchive).where(ContractArchive.id == contract_id)
+            )
+            self.session.commit()
+
+    def count(self, model, id: int) -> int:
+        """Return the number of rows of a model with the given id."""
+        return self.session.scalar(
+            select(func.count()).select_from(model).where(model.id == id)
+        )
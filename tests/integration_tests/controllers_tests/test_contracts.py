@@ -5,6 +5,8 @@ from decimal import Decimal
 
 from epic_events_crm.models.contracts import Contract
 from epic_events_crm.controllers.contracts import ContractController
+from epic_events_crm.database import ConcurrentUpdateError, get_test_session
+from epic_events_crm.repositories.contracts import ContractRepo
 from epic_events_crm.authentication import log_in, valid_token_in_env
 from epic_events_crm.models.employees import Employee
 from epic_events_crm.repositories.employees import EmployeeRepo
@@ -106,6 +108,49 @@ class TestContractController:
         )
         assert contract.client_id == 2
 
+    def test_concurrent_updates(self, mocker):
+        """
+        Test that a payment is applied again after a concurrent update, while other
+        changes fail with a retryable error instead of overwriting it.
+        """
+        log_in("aquentin@sales.com", "Passw0rd", self.employee_repo)
+        mocker.patch(
+            "epic_events_crm.controllers.contracts.get_current_user",
+            new=self.get_current_user_test,
+        )
+        get_by_id = self.controller.repo.get_by_id
+        concurrent_payments = []
+
+        def get_then_pay_elsewhere(contract_id):
+            """Read the contract, then once per update pay 100 from another session."""
+            contract = get_by_id(contract_id)
+            if concurrent_payments:
+                concurrent_payments.pop()
+                other_session = get_test_session()
+                other = ContractRepo(other_session).get_by_id(contract_id)
+                other.due_amount -= 100
+                other_session.commit()
+                other_session.close()
+            return contract
+
+        contract = get_by_id(self.created_id)
+        due_amount, version = contract.due_amount, contract.version_id
+        mocker.patch.object(
+            self.controller.repo, "get_by_id", side_effect=get_then_pay_elsewhere
+        )
+        concurrent_payments.append(True)
+        with pytest.raises(ConcurrentUpdateError, match="please retry"):
+            self.controller.update(contract_id=self.created_id, total_amount=2000)
+        # a payment commutes with the other one: applied again on the new version
+        concurrent_payments.append(True)
+        self.controller.update(contract_id=self.created_id, paid_amount=50)
+        mocker.stopall()
+
+        contract = get_by_id(self.created_id)
+        assert contract.due_amount == due_amount - 250
+        assert contract.total_amount != 2000
+        assert contract.version_id == version + 3
+
     def test_get_all(self):
         """Test that all contracts are returned."""
         contracts = self.controller.get_all()
@@ -0,0 +1,75 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from epic_events_crm.controllers.dashboard import DashboardController
+from epic_events_crm.repositories.employees import EmployeeRepo
+
+
+class TestDashboardController:
+    """
+    Test DashboardController class.
+    Take into account the 'populate_db' fixture from conftest.py.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def setup(cls, session):
+        cls.controller = DashboardController(session)
+        cls.employee_repo = EmployeeRepo(session)
+
+    def test_sales_sections(self):
+        """Test the sections of a salesperson, their rows loaded for the views."""
+        user = self.employee_repo.get_by_email("aquentin@sales.com")
+        sections = self.controller.get_today(user)
+        assert [s.title for s in sections] == [
+            "MY CLIENTS",
+            "MY CONTRACTS WITHOUT EVENT",
+            "UNSIGNED CONTRACTS",
+        ]
+        clients, no_event, unsigned = sections
+        assert {client.email for client in clients.rows} == {
+            "jdoe@mail.com",
+            "jdae@mail.com",
+            "gsophie@mail.com",
+        }
+        # worker sessions are closed: relationships must already be loaded
+        assert {client.salesperson.id for client in clients.rows} == {user.id}
+        assert all(contract.event is None for contract in no_event.rows)
+        assert all(not contract.signed for contract in unsigned.rows)
+        assert {contract.client.lname for contract in unsigned.rows} >= {"DOE"}
+
+    def test_support_sections(self):
+        user = self.employee_repo.get_by_email("pmercedes@supp.com")
+        mine, without_support = self.controller.get_today(user)
+        assert [event.name for event in mine.rows] == ["Event name 1"]
+        assert mine.rows[0].support_person.lname == "PINAR"
+        assert all(event.support_person is None for event in without_support.rows)
+
+    def test_queries_run_concurrently(self, monkeypatch):
+        """Test that each query runs on a worker thread, with a session of its own."""
+        threads = set()
+        sessions = []
+        run_section = DashboardController.run_section
+
+        def recording_run_section(self, section, query, user_id):
+            def recording_query(session, uid):
+                threads.add(threading.get_ident())
+                sessions.append(session)
+                return query(session, uid)
+
+            return run_section(self, section, recording_query, user_id)
+
+        monkeypatch.setattr(DashboardController, "run_section", recording_run_section)
+        user = self.employee_repo.get_by_email("flionel@manager.com")
+        sections = self.controller.get_today(user)
+        assert len({id(session) for session in sessions}) == len(sections)
+        assert threading.get_ident() not in threads
+        # rows of a union statement get the display loads too
+        assert all(contract.client.email for contract in sections[1].rows)
+
+    def test_unknown_department(self):
+        user = SimpleNamespace(id=1, department=SimpleNamespace(name="Accounting"))
+        with pytest.raises(ValueError, match="No dashboard"):
+            self.controller.get_today(user)
@@ -1,7 +1,13 @@
+import datetime
+
 import pytest
+from sqlalchemy import delete, select
 
+from epic_events_crm.models.archives import ContractArchive, EventArchive
 from epic_events_crm.models.employees import Employee
+from epic_events_crm.models.events import Event
 from epic_events_crm.controllers.employees import EmployeeController
+from epic_events_crm.repositories.clients import ClientRepo
 
 superuser_kwargs = {
     "fname": "Super",
@@ -115,6 +121,76 @@ class TestEmployeeController:
         assert employee.lname == "EMPLOYEE"
         assert employee.department_id == 3
 
+    def test_reassign_with_wrong_arguments(self):
+        """Test that the expected errors are raised with invalid arguments."""
+        # same employee as source and target
+        with pytest.raises(ValueError):
+            self.controller.reassign(5, 5, clients=True)
+        # non-existing employees
+        with pytest.raises(ValueError):
+            self.controller.reassign(999, 8, clients=True)
+        with pytest.raises(ValueError):
+            self.controller.reassign(5, 999, clients=True)
+        # target is not from the support department
+        with pytest.raises(ValueError):
+            self.controller.reassign(7, 8, events=True)
+        # nothing to reassign for a manager
+        with pytest.raises(ValueError):
+            self.controller.reassign(2, 8)
+
+    def test_reassign(self):
+        """Test that clients are moved back and forth between two salespeople."""
+        clients_count, events_count = self.controller.reassign(5, 8, clients=True)
+        assert clients_count == 1 and events_count == 0
+        client_repo = ClientRepo(self.controller.session)
+        assert client_repo.get_by_email("blyah@mail.com").salesperson_id == 8
+        # department of the source employee is used when no flag is set
+        clients_count, events_count = self.controller.reassign(8, 5)
+        assert clients_count == 1 and events_count == 0
+        assert client_repo.get_by_email("blyah@mail.com").salesperson_id == 5
+
+    def test_reassign_archived_events(self):
+        """Test that archived events follow the events of a support person."""
+        session = self.controller.session
+        date = datetime.datetime(2020, 1, 1)
+        session.add(
+            ContractArchive(
+                id=900,
+                client_id=1,
+                total_amount=10,
+                due_amount=0,
+                signed=True,
+                created_at=date,
+            )
+        )
+        session.add(
+            EventArchive(
+                id=900,
+                name="Archived event",
+                start_datetime=date,
+                end_datetime=date,
+                address_line1="1 rue du Test",
+                city="Test City",
+                country="France",
+                postal_code="12345",
+                attendees_number=10,
+                contract_id=900,
+                support_person_id=6,
+                created_at=date,
+            )
+        )
+        session.commit()
+        try:
+            clients_count, events_count = self.controller.reassign(6, 7, events=True)
+            assert clients_count == 0 and events_count == 2  # 1 hot, 1 archived
+            assert session.get(EventArchive, 900).support_person_id == 7
+        finally:
+            session.execute(delete(EventArchive).where(EventArchive.id == 900))
+            session.execute(delete(ContractArchive).where(ContractArchive.id == 900))
+            event = session.scalars(select(Event).filter_by(contract_id=3)).one()
+            event.support_person_id = 6
+            session.commit()
+
     def test_delete(self):
         """Test that the delete method removes the employee from the database."""
         employee = self.controller.repo.get_by_id(8)
@@ -2,6 +2,8 @@ import pytest
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import exc
+
 from epic_events_crm.models.events import Event
 from epic_events_crm.controllers.events import EventController
 from epic_events_crm.authentication import log_in, valid_token_in_env
@@ -256,3 +258,45 @@ class TestEventController:
         assert isinstance(events, list)
         assert all(event.support_person is None for event in events)
         assert len(events) == 1
+
+    def test_auto_assign_dry_run(self, mocker):
+        """Test that auto_assign plans the events without support but saves nothing."""
+        mocker.patch(
+            "epic_events_crm.controllers.events.get_current_user",
+            new=self.get_current_user_test,
+        )
+        log_in("flionel@manager.com", "Passw0rd", self.employee_repo)
+        planned, unassigned = self.controller.auto_assign(
+            dry_run=True, after=datetime(2000, 1, 1)
+        )
+        assert [event.id for event, _ in planned] == [3]
+        assert all(person.department.name == "Support" for _, person in planned)
+        assert unassigned == []
+        assert len(self.controller.get_events_without_support()) == 1
+
+    def test_auto_assign_without_user(self, mocker):
+        mocker.patch(
+            "epic_events_crm.controllers.events.get_current_user", return_value=None
+        )
+        with pytest.raises(ValueError):
+            self.controller.auto_assign(dry_run=True)
+
+    def test_one_event_per_contract_constraint(self):
+        """Test that the database refuses a second event for a contract."""
+        session = self.controller.session
+        session.add(
+            Event(
+                name="Duplicate",
+                start_datetime=datetime(2028, 1, 1, 8, 0),
+                end_datetime=datetime(2028, 1, 1, 18, 0),
+                address_line1=self.c_address_line,
+                city=self.c_city,
+                country=self.c_country,
+                postal_code=self.c_postal_code,
+                attendees_number=10,
+                contract_id=3,
+            )
+        )
+        with pytest.raises(exc.IntegrityError):
+            session.flush()
+        session.rollback()
@@ -0,0 +1,97 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from epic_events_crm.controllers.listings import ListingController
+from epic_events_crm.models.clients import Client
+from epic_events_crm.models.employees import Employee
+from epic_events_crm.models.events import Event
+from epic_events_crm.repositories.pages import PageRepo
+
+
+class TestListingController:
+    """
+    Test ListingController class.
+    Take into account the 'populate_db' fixture from conftest.py.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def setup(cls, session):
+        cls.session = session
+        cls.controller = ListingController(session)
+
+    def test_pages_cover_the_listing(self):
+        """Test that pages follow each other by id, without gaps nor duplicates."""
+        pages = list(self.controller.get_pages(self.controller.employees(), 2))
+        assert all(len(page) == 2 for page in pages[:-1])
+        ids = [employee.id for page in pages for employee in page]
+        all_ids = self.session.scalars(select(Employee.id).order_by(Employee.id))
+        assert ids == all_ids.all()
+        # with a prefetch thread, its session is closed: relationships are loaded
+        assert all(employee.department.name for page in pages for employee in page)
+
+    def test_pages_with_several_keys(self):
+        listing = self.controller.clients()
+        clients = [c for page in self.controller.get_pages(listing, 1) for c in page]
+        assert len(clients) == self.session.query(Client).count()
+        keys = [(client.company_name or "", client.id) for client in clients]
+        assert keys == sorted(keys)
+
+        listing = self.controller.events(start=datetime(2000, 1, 1))
+        events = [e for page in self.controller.get_pages(listing, 2) for e in page]
+        assert len(events) == self.session.query(Event).count()
+        keys = [(event.start_datetime, event.id) for event in events]
+        assert keys == sorted(keys)
+        assert all(
+            event.support_person is None or event.support_person.lname
+            for event in events
+        )
+
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        """The arguments of the PageRepo.get_page calls."""
+        calls = []
+        get_page = PageRepo.get_page
+
+        def counting_get_page(self, *args, **kwargs):
+            calls.append(args)
+            return get_page(self, *args, **kwargs)
+
+        monkeypatch.setattr(PageRepo, "get_page", counting_get_page)
+        return calls
+
+    def test_one_page_ahead(self, calls, monkeypatch):
+        """Test that pages are only fetched one ahead of the one read."""
+        # the test database is in memory: pretend it has a pool of connections
+        monkeypatch.setattr(
+            "epic_events_crm.controllers.listings.StaticPool", type(None)
+        )
+        pages = self.controller.get_pages(self.controller.employees(), 1)
+        first = next(pages)
+        deadline = time.monotonic() + 5
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        assert len(first) == 1
+        assert len(calls) == 2  # the page read and the next one, no more
+        pages.close()
+        time.sleep(0.1)
+        assert len(calls) == 2
+
+    def test_single_connection_no_page_ahead(self, calls):
+        """Test that on in-memory SQLite, pages are fetched when asked for."""
+        pages = self.controller.get_pages(self.controller.employees(), 1)
+        assert len(next(pages)) == 1
+        assert len(next(pages)) == 1
+        time.sleep(0.1)
+        assert len(calls) == 2
+        assert "listing-prefetch" not in [t.name for t in threading.enumerate()]
+        pages.close()
+
+    def test_contracts_flags_are_exclusive(self):
+        with pytest.raises(ValueError):
+            self.controller.contracts(unpaid=True, noevent=True)
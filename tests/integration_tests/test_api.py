@@ -0,0 +1,277 @@
+import asyncio
+import datetime
+import json
+from http.client import HTTPConnection
+
+import pytest
+from sqlalchemy.orm import Session
+
+from epic_events_crm.api import APIServer
+from epic_events_crm.database import make_async_engine, make_engine, make_sqlite_url
+from epic_events_crm.init_db import create_schema
+from epic_events_crm.models.clients import Client
+from epic_events_crm.models.employees import Employee
+from epic_events_crm.repositories.pages import AsyncPageRepo
+
+pytest.importorskip("aiosqlite")
+
+
+class TestAPI:
+    """
+    Test the HTTP API on a SQLite database file of its own, through a real server
+    on a free port and one keep-alive connection per test.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def setup(cls, tmp_path_factory):
+        url = make_sqlite_url(str(tmp_path_factory.mktemp("api") / "crm.sqlite3"))
+        engine = make_engine(url)
+        create_schema(engine)
+        with Session(engine) as session:
+            session.add_all(
+                [
+                    # 1 Manager, 2 Sales, 3 Support
+                    Employee(
+                        fname="Lionel",
+                        lname="FERR",
+                        email="flionel@manager.com",
+                        password="Passw0rd",
+                        department_id=2,
+                    ),
+                    Employee(
+                        fname="Quentin",
+                        lname="ACHARD",
+                        email="aquentin@sales.com",
+                        password="Passw0rd",
+                        department_id=3,
+                    ),
+                    Employee(
+                        fname="Paul",
+                        lname="SUPPORT",
+                        email="spaul@support.com",
+                        password="Passw0rd",
+                        department_id=4,
+                    ),
+                ]
+                + [
+                    Client(
+                        fname="Client",
+                        lname=f"NUMBER{i}",
+                        email=f"client{i}@client.com",
+                        salesperson_id=2,
+                        # before the current second, so that lists get an ETag
+                        last_updated=datetime.datetime(2020, 1, 1),
+                    )
+                    for i in range(5)
+                ]
+            )
+            session.commit()
+
+        server = APIServer(
+            make_async_engine(url), jwt_secret="api-test-secret-" + "0" * 32
+        )
+        loop = asyncio.new_event_loop()
+        tcp_server = loop.run_until_complete(
+            asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+        )
+        cls.loop = loop
+        cls.port = tcp_server.sockets[0].getsockname()[1]
+        cls.tokens = {}
+        yield
+        tcp_server.close()
+        # connections closed by the client, their handlers finish on the next run
+        tasks = asyncio.all_tasks(loop)
+        if tasks:  # gather() without tasks would be bound to another loop
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.run_until_complete(tcp_server.wait_closed())
+        loop.close()
+
+    def request(self, connection, method, path, body=None, token=None, headers=None):
+        """Send a request, run the server loop until it is answered."""
+        headers = dict(headers or {})
+        if token is not None:
+            headers["Authorization"] = f"Bearer {token}"
+        data = json.dumps(body) if body is not None else None
+        if data is not None:
+            headers["Content-Type"] = "application/json"
+
+        def send():
+            connection.request(method, path, body=data, headers=headers)
+            response = connection.getresponse()
+            return response, response.read()
+
+        response, raw = self.loop.run_until_complete(asyncio.to_thread(send))
+        return response, json.loads(raw) if raw else None
+
+    def token(self, connection, email):
+        if email not in self.tokens:
+            response, data = self.request(
+                connection, "POST", "/login", {"email": email, "password": "Passw0rd"}
+            )
+            assert response.status == 200
+            self.tokens[email] = data["access_token"]
+        return self.tokens[email]
+
+    @pytest.fixture
+    def connection(self):
+        connection = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        yield connection
+        connection.close()
+
+    def test_login(self, connection):
+        response, data = self.request(
+            connection,
+            "POST",
+            "/login",
+            {"email": "aquentin@sales.com", "password": "x"},
+        )
+        assert response.status == 401
+        response, data = self.request(connection, "GET", "/clients")
+        assert response.status == 401
+        assert response.getheader("WWW-Authenticate") == "Bearer"
+        response, data = self.request(connection, "GET", "/clients", token="not.a.jwt")
+        assert response.status == 401
+        token = self.token(connection, "aquentin@sales.com")
+        response, data = self.request(connection, "GET", "/clients", token=token)
+        assert response.status == 200
+
+    def test_paginated_projected_list(self, connection):
+        token = self.token(connection, "aquentin@sales.com")
+        response, first = self.request(
+            connection, "GET", "/clients?limit=2&fields=email", token=token
+        )
+        assert response.status == 200
+        assert first["total"] >= 5
+        assert [sorted(item) for item in first["items"]] == [["email", "id"]] * 2
+        response, second = self.request(
+            connection,
+            "GET",
+            f"/clients?limit=2&fields=email&after={first['next_after']}",
+            token=token,
+        )
+        assert second["items"][0]["id"] > first["items"][-1]["id"]
+        response, data = self.request(
+            connection, "GET", "/employees?department_id=3", token=token
+        )
+        assert [item["email"] for item in data["items"]] == ["aquentin@sales.com"]
+        assert "password" not in data["items"][0]
+        response, data = self.request(
+            connection, "GET", "/clients?fields=password", token=token
+        )
+        assert response.status == 400
+        response, data = self.request(
+            connection, "GET", "/clients?limit=100000", token=token
+        )
+        assert response.status == 400
+
+    def test_conditional_get(self, connection):
+        token = self.token(connection, "aquentin@sales.com")
+        response, data = self.request(connection, "GET", "/clients", token=token)
+        etag = response.getheader("ETag")
+        response, data = self.request(
+            connection, "GET", "/clients", token=token, headers={"If-None-Match": etag}
+        )
+        assert response.status == 304 and data is None
+        response, data = self.request(
+            connection,
+            "POST",
+            "/clients",
+            {"fname": "new", "lname": "client", "email": "new@client.com"},
+            token=token,
+        )
+        assert response.status == 201
+        assert data["salesperson_id"] == 2
+        response, data = self.request(
+            connection, "GET", "/clients", token=token, headers={"If-None-Match": etag}
+        )
+        assert response.status == 200
+        assert response.getheader("ETag") != etag
+
+    def test_no_etag_after_a_change_in_the_same_second(self, connection, mocker):
+        """Test that a list changed during the current second is not cacheable."""
+        token = self.token(connection, "aquentin@sales.com")
+        now = datetime.datetime(2024, 5, 2, 10, 0, 0)
+        mocker.patch.object(AsyncPageRepo, "get_versions", return_value=[now, 5, now])
+        response, data = self.request(connection, "GET", "/clients", token=token)
+        assert response.status == 200 and data["items"]
+        assert response.getheader("ETag") is None
+        assert response.getheader("Cache-Control") == "no-store"
+
+    def test_permissions(self, connection):
+        token = self.token(connection, "spaul@support.com")
+        response, data = self.request(
+            connection,
+            "POST",
+            "/clients",
+            {"fname": "no", "lname": "way", "email": "no@client.com"},
+            token=token,
+        )
+        assert response.status == 403
+        response, data = self.request(
+            connection, "PUT", "/clients/1", {"fname": "x"}, token=token
+        )
+        assert response.status == 405
+
+    def test_write_cycle(self, connection):
+        token = self.token(connection, "flionel@manager.com")
+        response, contract = self.request(
+            connection,
+            "POST",
+            "/contracts",
+            {"client_id": 1, "due_amount": 1500},
+            token=token,
+        )
+        assert response.status == 201
+        assert contract["due_amount"] == "1500.00"
+        response, data = self.request(
+            connection,
+            "PATCH",
+            f"/contracts/{contract['id']}",
+            {"paid_amount": 500, "signed": True},
+            token=token,
+        )
+        assert response.status == 200
+        assert (data["due_amount"], data["signed"]) == ("1000.00", True)
+        response, data = self.request(
+            connection,
+            "PATCH",
+            f"/contracts/{contract['id']}",
+            {"unknown": 1},
+            token=token,
+        )
+        assert response.status == 400
+        response, employee = self.request(
+            connection,
+            "POST",
+            "/employees",
+            {
+                "fname": "eva",
+                "lname": "new",
+                "email": "eva@crm.com",
+                "password": "Passw0rd",
+                "department_id": 3,
+            },
+            token=token,
+        )
+        assert response.status == 201 and "password" not in employee
+        response, data = self.request(
+            connection, "DELETE", f"/employees/{employee['id']}", token=token
+        )
+        assert response.status == 204
+        response, data = self.request(
+            connection, "GET", f"/employees/{employee['id']}", token=token
+        )
+        assert response.status == 404
+
+    def test_too_many_headers(self, connection, mocker):
+        mocker.patch("epic_events_crm.api.MAX_HEADERS", 5)
+        headers = {f"X-Header-{i}": "x" for i in range(6)}
+        response, data = self.request(connection, "GET", "/clients", headers=headers)
+        assert response.status == 431
+        assert response.getheader("Connection") == "close"
+
+    def test_headers_too_large(self, connection):
+        headers = {"X-Header": "x" * 20_000}
+        response, data = self.request(connection, "GET", "/clients", headers=headers)
+        assert response.status == 431
@@ -0,0 +1,205 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+
+from epic_events_crm.controllers.clients import AsyncClientController
+from epic_events_crm.controllers.contracts import AsyncContractController
+from epic_events_crm.controllers.employees import AsyncEmployeeController
+from epic_events_crm.controllers.events import AsyncEventController
+from epic_events_crm.database import make_async_engine, make_engine, make_sqlite_url
+from epic_events_crm.init_db import create_schema
+from epic_events_crm.models.clients import Client
+from epic_events_crm.models.employees import Employee
+from epic_events_crm.repositories.employees import AsyncEmployeeRepo
+
+pytest.importorskip("aiosqlite")
+
+
+class TestAsyncLayer:
+    """
+    Test the async repositories and controllers on a SQLite database file of their
+    own, whatever the backend of the test database.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def setup(cls, tmp_path_factory):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        url = make_sqlite_url(str(tmp_path_factory.mktemp("async") / "crm.sqlite3"))
+        engine = make_engine(url)
+        create_schema(engine)
+        with Session(engine) as session:
+            session.add_all(
+                [
+                    # 1 Manager, 2 and 3 Sales, 4 Support
+                    Employee(
+                        fname="Lionel",
+                        lname="FERR",
+                        email="flionel@manager.com",
+                        password="Passw0rd",
+                        department_id=2,
+                    ),
+                    Employee(
+                        fname="Quentin",
+                        lname="ACHARD",
+                        email="aquentin@sales.com",
+                        password="Passw0rd",
+                        department_id=3,
+                    ),
+                    Employee(
+                        fname="Anna",
+                        lname="BELL",
+                        email="banna@sales.com",
+                        password="Passw0rd",
+                        department_id=3,
+                    ),
+                    Employee(
+                        fname="Paul",
+                        lname="SUPPORT",
+                        email="spaul@support.com",
+                        password="Passw0rd",
+                        department_id=4,
+                    ),
+                    Client(
+                        fname="Jean",
+                        lname="CLIENT",
+                        email="jean@client.com",
+                        salesperson_id=2,
+                    ),
+                ]
+            )
+            session.commit()
+        async_engine = make_async_engine(url)
+        cls.new_session = async_sessionmaker(async_engine, expire_on_commit=False)
+        yield
+        asyncio.run(async_engine.dispose())
+
+    def run(self, coroutine_function):
+        """Run a coroutine function on a new session, return its result."""
+
+        async def main():
+            async with self.new_session() as session:
+                return await coroutine_function(session)
+
+        return asyncio.run(main())
+
+    def user(self, session, employee_id: int):
+        return AsyncEmployeeRepo(session).get_by_id(employee_id)
+
+    def test_employees_come_with_their_department(self):
+        """Test that employees can be used without lazy loading."""
+
+        async def get(session):
+            repo = AsyncEmployeeRepo(session)
+            employee = await repo.get_by_email("aquentin@sales.com")
+            # Cached by id, as with the blocking repository
+            cached = await repo.get_by_id(employee.id)
+            assert await repo.get_by_id(employee.id) is cached
+            sales = await repo.get_by_department_name("Sales")
+            return employee.department.name, [e.department.name for e in sales]
+
+        assert self.run(get) == ("Sales", ["Sales", "Sales"])
+
+    def test_client_rules(self):
+        """Test that the client rules are those of ClientController."""
+
+        async def create_and_update(session):
+            controller = AsyncClientController(session, await self.user(session, 2))
+            await controller.create(
+                "marie", "durand", "marie@client.com", 2, phone="06-12 34 56 78"
+            )
+            with pytest.raises(ValueError, match="Email already in use."):
+                await controller.create("marie", "durand", "marie@client.com", 2)
+            with pytest.raises(ValueError, match="Invalid phone number."):
+                await controller.create("paul", "x", "paul@client.com", 2, phone="1")
+            with pytest.raises(ValueError, match="Employee must be a salesperson."):
+                await controller.update(email="marie@client.com", salesperson_id=4)
+            await controller.update(email="marie@client.com", salesperson_id=3)
+            other = AsyncClientController(session, await self.user(session, 2))
+            with pytest.raises(PermissionError):
+                await other.update(email="marie@client.com", fname="Marion")
+            return await controller.repo.get_by_email("marie@client.com")
+
+        client = self.run(create_and_update)
+        assert (client.fname, client.lname) == ("Marie", "DURAND")
+        assert client.phone == "0612345678"
+        assert client.salesperson_id == 3
+
+    def test_contract_and_event(self):
+        """Test a contract signed then its event, through the async controllers."""
+
+        async def sign_and_plan(session):
+            contracts = AsyncContractController(session, await self.user(session, 1))
+            contract_id = await contracts.create(client_id=1, due_amount=1000)
+            salesperson = AsyncContractController(session, await self.user(session, 3))
+            with pytest.raises(PermissionError):
+                await salesperson.update(contract_id, signed=True)
+            owner = AsyncContractController(session, await self.user(session, 2))
+            await owner.update(contract_id, total_amount=1200, paid_amount=200)
+            await owner.update(contract_id, signed=True)
+
+            events = AsyncEventController(session, await self.user(session, 2))
+            with pytest.raises(ValueError, match="Start date must be before"):
+                await events.create(
+                    "party", "2026-09-01 18:00", "2026-09-01 08:00", "1 rue",
+                    "paris", "france", "75000", 50, contract_id,
+                )  # fmt: skip
+            event_id = await events.create(
+                "party", "2026-09-01 08:00", "2026-09-01 18:00", "1 rue",
+                "paris", "france", "75000", 50, contract_id, notes="Bring cake",
+            )  # fmt: skip
+            with pytest.raises(ValueError, match="already exists"):
+                await events.create(
+                    "again", "2026-09-02 08:00", "2026-09-02 18:00", "1 rue",
+                    "paris", "france", "75000", 50, contract_id,
+                )  # fmt: skip
+            managers = AsyncEventController(session, await self.user(session, 1))
+            with pytest.raises(ValueError, match="not from support"):
+                await managers.update(event_id, support_person_id=2)
+            await managers.update(event_id, support_person_id=4, city="lyon")
+            support = AsyncEventController(session, await self.user(session, 4))
+            await support.update(event_id, notes="Cake bought", append=True)
+            return (
+                await contracts.repo.get_by_id(contract_id),
+                await events.repo.get_by_id(event_id),
+            )
+
+        contract, event = self.run(sign_and_plan)
+        assert contract.signed is True
+        assert contract.total_amount == Decimal("1200")
+        assert contract.due_amount == Decimal("1000")
+        assert event.support_person_id == 4
+        assert event.city == "Lyon"
+        assert "Bring cake" in event.notes and event.notes.endswith("Cake bought")
+
+    def test_employee_creation(self):
+        """Test that employees are created with a hashed password."""
+
+        async def create(session):
+            controller = AsyncEmployeeController(session, await self.user(session, 1))
+            with pytest.raises(PermissionError):
+                await controller.create("su", "per", "su@crm.com", "Passw0rd", 1)
+            with pytest.raises(ValueError, match="Department id not found"):
+                await controller.create("no", "body", "no@crm.com", "Passw0rd", 9)
+            await controller.create("eva", "new", "eva@crm.com", "Passw0rd", 3)
+            return await controller.repo.get_by_email("eva@crm.com")
+
+        employee = self.run(create)
+        assert employee.department.name == "Sales"
+        assert employee.check_password("Passw0rd")
+
+    def test_concurrent_sessions(self):
+        """Test that sessions run concurrently on one event loop."""
+
+        async def count_clients():
+            async with self.new_session() as session:
+                return len(await AsyncClientController(session, None).get_all())
+
+        async def main():
+            return await asyncio.gather(*(count_clients() for _ in range(10)))
+
+        counts = asyncio.run(main())
+        assert len(set(counts)) == 1 and counts[0] >= 1
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import delete, select
+
+from epic_events_crm import audit
+from epic_events_crm.controllers.employees import EmployeeController
+from epic_events_crm.models.audit import AuditRecord
+
+
+class TestAuditLog:
+    """
+    Test the audit log outbox and its drainer.
+    Take into account the 'populate_db' fixture from conftest.py.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def setup(cls, session):
+        cls.session = session
+        cls.controller = EmployeeController(session)
+        # start from an empty log, whatever the other tests recorded
+        session.execute(delete(AuditRecord))
+        session.commit()
+
+        yield
+        session.execute(delete(AuditRecord))
+        session.commit()
+
+    def pending(self):
+        return self.session.scalars(
+            select(AuditRecord).where(AuditRecord.sent_at.is_(None))
+        ).all()
+
+    def test_record_committed_with_the_change(self, mocker):
+        """Test that controllers add the record to the transaction of the change."""
+        mocker.patch(
+            "epic_events_crm.controllers.employees.get_current_user", return_value=None
+        )
+        self.controller.update(employee_id=3, fname="sabrina")
+        records = self.pending()
+        assert [r.action for r in records] == ["employee.update"]
+        assert "updated <Employee Sabrina HEURT" in records[0].message
+
+        # a rolled back change leaves no record
+        audit.record(self.session, None, "employee.update", "never committed")
+        self.session.rollback()
+        assert len(self.pending()) == 1
+
+    def test_failing_sink_keeps_records_pending(self):
+        def failing_sink(records):
+            raise ConnectionError("sink unreachable")
+
+        with pytest.raises(ConnectionError):
+            audit.drain(self.session, failing_sink)
+        assert len(self.pending()) == 1
+
+    def test_drain(self):
+        """Test that pending records are forwarded by batches, then marked sent."""
+        audit.record(self.session, None, "employee.reassign", "second record")
+        self.session.commit()
+        batches = []
+
+        def sink(records):
+            batches.append([r.message for r in records])
+
+        assert audit.drain(self.session, sink, batch_size=1) == 2
+        assert len(batches) == 2 and batches[1] == ["second record"]
+        assert self.pending() == []
+        assert audit.drain(self.session, sink) == 0
+
+    def test_get_sink(self, mocker):
+        mocker.patch("epic_events_crm.audit.DSN", None)
+        assert audit.get_sink("sentry") is None
+        assert audit.get_sink("none") is None
+        assert audit.get_sink("log") is audit.log_sink
+        with pytest.raises(ValueError, match="Unknown audit sink"):
+            audit.get_sink("kafka")
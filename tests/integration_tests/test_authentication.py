@@ -1,10 +1,13 @@
 import pytest
-from dotenv import set_key
 
 from epic_events_crm.models.employees import Employee
 from epic_events_crm.repositories.employees import EmployeeRepo
+from epic_events_crm.repositories.sessions import RefreshTokenRepo
 from epic_events_crm.authentication import (
+    token_store,
     log_in,
+    log_out,
+    renew_session,
     valid_token_in_env,
     get_current_user,
     requires_auth,
@@ -28,8 +31,8 @@ class TestAuthentication:
 
     def test_login_process(self):
         """Test the login process."""
-        # reset the token in the .env file
-        set_key(".env", "JWT_TOKEN", "")
+        # log out by removing the stored token
+        token_store.clear()
         # @requires_auth decorator prevents the function from running
         result = some_function()
         assert result is None
@@ -46,3 +49,24 @@ class TestAuthentication:
         # the function can now run
         result = some_function()
         assert result == "Hello world!"
+
+    def test_session_renewal(self, mocker):
+        """Test that an expired access token is silently renewed, and revocation."""
+        refresh_repo = RefreshTokenRepo(self.repo.session)
+        mocker.patch("epic_events_crm.authentication.refresh_repo", refresh_repo)
+        mocker.patch("epic_events_crm.authentication.ACCESS_MINUTES", -1)
+        assert log_in("aquentin@sales.com", "Passw0rd", self.repo) is True
+        first_refresh_token = token_store.load_refresh()
+        mocker.patch("epic_events_crm.authentication.ACCESS_MINUTES", 15)
+        # the access token has expired, the refresh token gives a new one
+        assert renew_session(refresh_repo)["uid"] == 4
+        assert token_store.load_refresh() != first_refresh_token
+        assert some_function() == "Hello world!"
+        # a rotated refresh token used again ends every session of the employee
+        second_refresh_token = token_store.load_refresh()
+        token_store.save_refresh(first_refresh_token)
+        assert renew_session(refresh_repo) is False
+        token_store.save_refresh(second_refresh_token)
+        assert renew_session(refresh_repo) is False
+        log_out(refresh_repo)
+        assert token_store.load() is None
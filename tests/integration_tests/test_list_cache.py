@@ -0,0 +1,84 @@
+import datetime
+
+import pytest
+from sqlalchemy import update
+
+from epic_events_crm.list_cache import ListCache, probe
+from epic_events_crm.models.clients import Client
+from epic_events_crm.repositories.clients import ClientRepo
+from epic_events_crm.repositories.employees import EmployeeRepo
+from epic_events_crm.views.console import console
+
+PAST = datetime.datetime(2020, 1, 1)
+
+
+class TestListCache:
+    """
+    Test the list commands cache against the test database.
+    Take into account the 'populate_db' fixture from conftest.py.
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, session, tmp_path, mocker):
+        self.session = session
+        self.employee_repo = EmployeeRepo(session)
+        self.user_id = 4  # a salesperson
+        mocker.patch(
+            "epic_events_crm.list_cache.get_current_user",
+            new=lambda: self.employee_repo.get_by_id(self.user_id),
+        )
+        # Stamps older than the probe second, or the entries would not be stored
+        session.execute(update(Client).values(last_updated=PAST))
+        session.commit()
+        self.cache = ListCache(session, directory=str(tmp_path))
+        self.runs = 0
+
+        @self.cache.listing(("clients",))
+        def list_clients():
+            self.runs += 1
+            emails = sorted(client.email for client in ClientRepo(session).get_all())
+            console.print(", ".join(emails))
+
+        self.list_clients = list_clients
+
+    def test_probe(self):
+        """Test that the probe returns the stamp and count of tables, then NOW()."""
+        last_updated, count, now = probe(self.session, ["clients"])
+        assert last_updated == PAST
+        assert count == self.session.query(Client).count()
+        assert now > PAST
+
+    def test_listing_invalidated_by_an_update(self, capsys):
+        """Test that a listing is reused until a row of its tables changes."""
+        self.list_clients()
+        self.list_clients()
+        assert self.runs == 1
+        first, second = capsys.readouterr().out.splitlines()
+        assert first == second and "jdoe@mail.com" in first
+
+        client = ClientRepo(self.session).get_by_email("jdoe@mail.com")
+        client.email = "jdoe.updated@mail.com"
+        self.session.commit()
+        try:
+            self.list_clients()
+            assert self.runs == 2
+            assert "jdoe.updated@mail.com" in capsys.readouterr().out
+        finally:
+            client.email = "jdoe@mail.com"
+            self.session.commit()
+
+    def test_listing_not_reused_after_a_role_change(self):
+        """Test that the department of the user is part of the key."""
+        self.list_clients()
+        self.list_clients()
+        assert self.runs == 1
+        employee = self.employee_repo.get_by_id(self.user_id)
+        department_id = employee.department_id
+        employee.department_id = 2  # Management
+        self.session.commit()
+        try:
+            self.list_clients()
+            assert self.runs == 2
+        finally:
+            employee.department_id = department_id
+            self.session.commit()
@@ -74,9 +74,9 @@ class TestTestingSetup:
                 ORDER BY d.id
                 """
             )
-        )
-        # Check that the table is not empty
-        assert department_permissions.rowcount > 0
+        ).all()
+        # Check that the table is not empty (rowcount is -1 for SELECT on SQLite)
+        assert len(department_permissions) > 0
 
         # # Print the tables in the database if run with -s option
         # print("\nDepartment_permissions:")
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+import pytest
+
+from epic_events_crm.repositories.archives import ArchiveRepo
+
+
+class TestArchiveRepo:
+    """
+    Test ArchiveRepo class.
+    Take into account the 'populate_db' fixture from conftest.py.
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def setup(cls, session):
+        cls.repo = ArchiveRepo(session)
+
+    def test_get_archivable_contract_ids(self):
+        """Test that only paid and signed contracts with a past event are returned."""
+        # contract 3 is the only one fully paid, signed, with an event over
+        assert self.repo.get_archivable_contract_ids(datetime(2026, 3, 1), 10) == [3]
+        assert self.repo.get_archivable_contract_ids(datetime(2000, 1, 1), 10) == []
+
+    def test_get_all_contracts_and_events(self):
+        """Test that archives are retrieved as lists (empty, nothing archived)."""
+        assert self.repo.get_all_contracts() == []
+        assert self.repo.get_all_events() == []
+        assert self.repo.search_events("Event") == []
@@ -1,3 +1,5 @@
+import datetime
+
 import pytest
 from sqlalchemy import inspect
 
@@ -17,8 +19,8 @@ class TestEventRepo:
         cls.repo = EventRepo(session)
         cls.event_kwargs = {
             "name": "Test event 4",
-            "start_datetime": "2026-09-01 08:00",
-            "end_datetime": "2026-09-01 18:00",
+            "start_datetime": datetime.datetime(2026, 9, 1, 8, 0),
+            "end_datetime": datetime.datetime(2026, 9, 1, 18, 0),
             "address_line1": "77A test avenue",
             "city": "Test City",
             "country": "Testland",
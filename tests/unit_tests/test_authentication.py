@@ -6,7 +6,9 @@ from epic_events_crm.models.employees import Employee
 from epic_events_crm.repositories.employees import EmployeeRepo
 from epic_events_crm.authentication import (
     authenticate,
+    log_in,
     make_jwt_token,
+    renew_session,
     valid_token_in_env,
 )
 
@@ -34,6 +36,19 @@ class TestAuthentication:
         result = authenticate(email, password)
         assert result == expected
 
+    def test_log_in_gets_employee_once(self, mocker):
+        """Test that logging in only queries the employee once."""
+        employee = mocker.Mock(spec=Employee)
+        employee.check_password.return_value = True
+        get_by_email = mocker.patch.object(
+            EmployeeRepo, "get_by_email", return_value=employee
+        )
+        open_session = mocker.patch("epic_events_crm.authentication.open_session")
+
+        assert log_in("existing@email.test", "correct_pwd") is True
+        get_by_email.assert_called_once_with("existing@email.test")
+        open_session.assert_called_once()
+
     def test_make_jwt_token(self, mocker):
         """Test the make_jwt_token function."""
         # Mock an employee
@@ -75,12 +90,19 @@ class TestAuthentication:
     )
     def test_valid_token_in_env(self, mocker, token, secret, expected):
         """Test the valid_token_in_env function."""
-        # Mock os.getenv and get_jwt_secret
-        mocker.patch("os.getenv", return_value=token)
+        # Mock the token store (without verified claims) and get_jwt_secret
+        token_store = mocker.patch("epic_events_crm.authentication.token_store")
+        token_store.load.return_value = token
+        token_store.get_claims.return_value = None
         mocker.patch(
             "epic_events_crm.authentication.get_jwt_secret", return_value=secret
         )
 
+        # An expired token cannot be renewed here
+        mocker.patch(
+            "epic_events_crm.authentication.renew_session", return_value=False
+        )
+
         # Mock jwt.decode
         def mock_decode(token, secret, algorithms):
             if token == "valid_token" and secret == "jwt_test_secret":
@@ -96,3 +118,29 @@ class TestAuthentication:
 
         result = valid_token_in_env()
         assert result == expected
+        if expected:
+            token_store.set_claims.assert_called_once_with(token, expected)
+
+    def test_valid_token_in_env_with_verified_claims(self, mocker):
+        """Test that claims already verified skip the signature check."""
+        token_store = mocker.patch("epic_events_crm.authentication.token_store")
+        token_store.load.return_value = "valid_token"
+        token_store.get_claims.return_value = {"uid": 1}
+        decode = mocker.patch("jwt.decode")
+
+        assert valid_token_in_env() == {"uid": 1}
+        decode.assert_not_called()
+
+    def test_renew_session_with_reused_refresh_token(self, mocker):
+        """Test that a refresh token used twice revokes all sessions of its owner."""
+        token_store = mocker.patch("epic_events_crm.authentication.token_store")
+        token_store.load_refresh.return_value = "refresh_token"
+        refresh_repo = mocker.Mock()
+        stored = refresh_repo.get_by_hash.return_value
+        stored.employee_id = 4
+        stored.expires_at = datetime.datetime.now() + datetime.timedelta(hours=1)
+        stored.revoked_at = datetime.datetime.now()
+
+        assert renew_session(refresh_repo) is False
+        refresh_repo.revoke_all.assert_called_once()
+        assert refresh_repo.revoke_all.call_args.args[0] == 4
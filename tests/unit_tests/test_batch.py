@@ -0,0 +1,44 @@
+import pytest
+from click.testing import CliRunner
+
+import eecrm
+
+
+class TestBatch:
+    """Tests related to the lines the batch command refuses to run."""
+
+    @pytest.mark.parametrize(
+        "args, expected",
+        [
+            (["batch", "other.txt"], "no nested batch."),
+            # group options before the command do not hide it
+            (["--profile", "batch"], "no nested batch."),
+            (["login", "a@b.com"], "login would prompt for --password"),
+            (["add-emp", "-fn", "A", "-ln", "B", "-e", "a@b.com"], "for --did"),
+            (["delete-client", "-id", "1"], "add --yes."),
+            (["delete-emp", "-id", "1"], "add --yes."),
+        ],
+    )
+    def test_refused_lines(self, args, expected):
+        assert expected in eecrm.batch_refusal(args)
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            ["login", "a@b.com", "-p", "Passw0rd"],
+            ["delete-client", "-id", "1", "--yes"],
+            ["--profile", "list-emp"],
+            ["no-such-command"],  # reported when run
+        ],
+    )
+    def test_accepted_lines(self, args):
+        assert eecrm.batch_refusal(args) is None
+
+    def test_prompts_do_not_read_the_next_lines(self):
+        """Test that a refused line stops the batch, the next one left unread."""
+        result = CliRunner().invoke(
+            eecrm.eecrm, ["batch"], input="delete-client -id 1\ny\n"
+        )
+        assert "Line 1: delete-client would ask for confirmation" in result.output
+        assert "Line 2" not in result.output
+        assert "0 command(s) committed." in result.output
@@ -0,0 +1,67 @@
+from sqlalchemy.orm import Session
+
+from epic_events_crm.cache import LRUCache, MISSING, cached, invalidate
+
+
+class FakeRepo:
+    """Repository-like class counting the calls reaching the 'database'."""
+
+    def __init__(self, session):
+        self.session = session
+        self.calls = 0
+
+    @cached("fakes")
+    def get_by_id(self, fake_id):
+        self.calls += 1
+        return None if fake_id == 0 else {"id": fake_id}
+
+
+class TestCache:
+    """Tests related to the reference data cache."""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # 'b' is now the least recently used
+        cache.set("c", 3)
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.hits == 3 and cache.misses == 1
+
+    def test_ttl_expiration(self, mocker):
+        """Test that entries expire after their time to live."""
+        monotonic = mocker.patch("epic_events_crm.cache.time.monotonic")
+        monotonic.return_value = 100
+        cache = LRUCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        monotonic.return_value = 105
+        assert cache.get("a") == 1
+        monotonic.return_value = 111
+        assert cache.get("a") is MISSING
+        assert len(cache) == 0
+
+    def test_cached_read_through_and_invalidation(self):
+        """Test that results are cached per session and cleared on demand."""
+        session = Session()
+        repo = FakeRepo(session)
+        assert repo.get_by_id(1) == {"id": 1}
+        assert repo.get_by_id(1) == {"id": 1}
+        assert repo.calls == 1
+        # None is never cached
+        repo.get_by_id(0)
+        repo.get_by_id(0)
+        assert repo.calls == 3
+        # another session has its own cache
+        other_repo = FakeRepo(Session())
+        other_repo.get_by_id(1)
+        assert other_repo.calls == 1
+        invalidate(session, "fakes")
+        repo.get_by_id(1)
+        assert repo.calls == 4
+        # a rollback clears the caches too
+        session.begin()
+        session.rollback()
+        repo.get_by_id(1)
+        assert repo.calls == 5
@@ -1,9 +1,29 @@
 import os
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy.engine.url import URL
 
-from epic_events_crm.database import make_test_db_url, make_db_url, get_test_session
+from epic_events_crm.database import (
+    FOREIGN_KEY,
+    NOT_NULL,
+    UNIQUE,
+    ConcurrentUpdateError,
+    ConstraintViolation,
+    commit_with_retry,
+    constraint_violation,
+    deferred_commits,
+    is_deferred,
+    make_engine,
+    make_sqlite_url,
+    make_test_db_url,
+    make_db_url,
+    get_test_session,
+)
 
 
 class TestDatabase:
@@ -15,6 +35,7 @@ class TestDatabase:
         mocker.patch.dict(
             os.environ,
             {
+                "EECRM_BACKEND": "mysql",
                 "APP_USER": "test_user",
                 "DB_HOST": "localhost",
                 "DB_PORT": "3306",
@@ -38,6 +59,51 @@ class TestDatabase:
         assert isinstance(result, URL)
         assert str(result) == expected
 
+    def test_sqlite_uri_making(self, mocker):
+        """Test that the SQLite backend uses the configured files."""
+        mocker.patch.dict(os.environ, {"EECRM_BACKEND": "sqlite"})
+        assert make_db_url().get_backend_name() == "sqlite"
+        assert make_sqlite_url("/tmp/crm.sqlite3").database == "/tmp/crm.sqlite3"
+        assert make_sqlite_url(":memory:").database is None
+
+    def test_in_memory_engine_is_shared(self):
+        """Test that sessions share one in-memory database."""
+        url = make_sqlite_url(":memory:")
+        assert make_engine(url) is make_engine(url)
+
+    def test_wal_only_for_database_files(self, tmp_path):
+        """Test that the write-ahead log is used by database files, not in memory."""
+        file_engine = make_engine(make_sqlite_url(str(tmp_path / "crm.sqlite3")))
+        with file_engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        file_engine.dispose()
+        with make_engine(make_sqlite_url(":memory:")).connect() as connection:
+            assert (
+                connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "memory"
+            )
+            assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+
+    def test_constraint_violation(self):
+        """Test that integrity errors of both backends are recognized."""
+
+        def integrity_error(*args):
+            return exc.IntegrityError("INSERT ...", {}, sqlite3.IntegrityError(*args))
+
+        assert constraint_violation(
+            integrity_error("NOT NULL constraint failed: clients.salesperson_id")
+        ) == ConstraintViolation(NOT_NULL, "salesperson_id")
+        assert constraint_violation(
+            integrity_error("FOREIGN KEY constraint failed")
+        ) == ConstraintViolation(FOREIGN_KEY)
+        assert constraint_violation(
+            integrity_error(1048, "Column 'salesperson_id' cannot be null")
+        ) == ConstraintViolation(NOT_NULL, "salesperson_id")
+        assert constraint_violation(
+            integrity_error(1062, "Duplicate entry 'a' for key 'clients.email'")
+        ) == ConstraintViolation(UNIQUE, "email")
+        assert constraint_violation(integrity_error(1213, "Deadlock")) is None
+        assert constraint_violation(ValueError("not an integrity error")) is None
+
     def test_get_test_session(self):
         """
         Test to verify that an SQLAlchemy session is returned.
@@ -46,3 +112,30 @@ class TestDatabase:
         session = get_test_session()
         assert isinstance(session, Session)
         assert isinstance(session.bind, Engine)
+
+    def test_deferred_commits(self):
+        """Test that commits only flush inside the context manager."""
+        session = Session()
+        with deferred_commits(session) as commit:
+            assert session.commit == session.flush
+            assert commit != session.commit
+            assert is_deferred(session)
+        assert session.commit != session.flush
+        assert not is_deferred(session)
+
+    def test_commit_with_retry(self, mocker):
+        """Test that only retryable changes are applied again after a conflict."""
+        session = mocker.Mock(spec=Session, info={})
+        session.commit.side_effect = [StaleDataError(), None]
+        apply = mocker.Mock(return_value="result")
+        assert commit_with_retry(session, apply, "Contract 1", retry=True) == "result"
+        assert apply.call_count == 2
+        assert session.rollback.call_count == 1
+
+        session.commit.side_effect = StaleDataError()
+        with pytest.raises(ConcurrentUpdateError, match="Contract 1 was changed"):
+            commit_with_retry(session, apply, "Contract 1", retry=True, attempts=3)
+        assert apply.call_count == 5
+        with pytest.raises(ConcurrentUpdateError):
+            commit_with_retry(session, apply, "Contract 1")
+        assert apply.call_count == 6
@@ -0,0 +1,45 @@
+import datetime
+import os
+import stat
+
+from epic_events_crm.list_cache import ListCache
+
+NOW = datetime.datetime(2024, 5, 2, 10, 0, 0)
+PROBE = [datetime.datetime(2024, 5, 2, 9, 30, 0), 12, NOW]
+
+
+class TestListCache:
+    """Tests related to the list commands output cache."""
+
+    def test_set_and_get(self, tmp_path):
+        """Test that an entry is reused only while the probe does not change."""
+        cache = ListCache(session=None, directory=str(tmp_path))
+        cache.set("key.json", PROBE, "a table")
+        later = NOW + datetime.timedelta(minutes=5)
+        assert cache.get("key.json", PROBE[:-1] + [later]) == "a table"
+        assert cache.get("key.json", [PROBE[0], 13, later]) is None
+        assert cache.get("other.json", PROBE) is None
+
+    def test_entries_are_private(self, tmp_path):
+        """Test that only the current user can read the cached outputs."""
+        directory = tmp_path / "lists"
+        cache = ListCache(session=None, directory=str(directory))
+        cache.set("key.json", PROBE, "a table")
+        assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+        assert stat.S_IMODE(os.stat(directory / "key.json").st_mode) == 0o600
+
+    def test_change_in_current_second_is_not_cached(self, tmp_path):
+        """Test that nothing is stored if a table changed during the probe second."""
+        cache = ListCache(session=None, directory=str(tmp_path))
+        cache.set("key.json", [NOW, 12, NOW], "a table")
+        assert cache.get("key.json", [NOW, 12, NOW]) is None
+
+    def test_prune(self, tmp_path):
+        """Test that the oldest entries are removed above max_entries."""
+        cache = ListCache(session=None, directory=str(tmp_path))
+        cache.max_entries = 2
+        for index in range(3):
+            cache.set(f"{index}.json", PROBE, "a table")
+            os.utime(tmp_path / f"{index}.json", (index, index))
+        cache.prune()
+        assert sorted(os.listdir(tmp_path)) == ["1.json", "2.json"]
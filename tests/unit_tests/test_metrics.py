@@ -0,0 +1,65 @@
+import pytest
+
+from epic_events_crm.metrics import Metrics, MetricsStore, parse_window, percentile
+
+
+@pytest.fixture
+def local_metrics(tmp_path):
+    """Return metrics stored in a temporary SQLite file."""
+    metrics = Metrics(MetricsStore(str(tmp_path / "metrics.sqlite3"), 30))
+    metrics.enabled = True
+    return metrics
+
+
+class TestMetrics:
+    """Tests related to the local metrics of commands."""
+
+    def test_percentile(self):
+        """Test the nearest-rank percentiles."""
+        values = [float(value) for value in range(100, 0, -1)]
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile(values, 100) == 100
+        assert percentile([3.0], 95) == 3
+
+    def test_parse_window(self):
+        """Test that windows are converted to seconds."""
+        assert parse_window("30m") == 1800
+        assert parse_window("7d") == 7 * 86400
+        with pytest.raises(ValueError):
+            parse_window("24")
+
+    def test_nested_commands(self, local_metrics):
+        """Test that a command run by another one is counted by both."""
+        local_metrics.start("batch")
+        local_metrics.start("list-clients")
+        local_metrics.count("list_cache_hits")
+        local_metrics.count("queries", 2)
+        local_metrics.stop()
+        local_metrics.count("queries")
+        local_metrics.start("add-client")
+        local_metrics.stop(failed=True)
+        local_metrics.stop()
+        stats = {stats.command: stats for stats in local_metrics.store.stats(0)}
+        assert sorted(stats) == ["add-client", "batch", "list-clients"]
+        assert stats["batch"].counters["queries"] == 3
+        assert stats["list-clients"].counters["queries"] == 2
+        assert stats["list-clients"].hit_ratio("list") == 1
+        assert stats["list-clients"].hit_ratio("reference") is None
+        assert stats["add-client"].failed == 1
+
+    def test_count_without_command(self, local_metrics):
+        """Test that nothing is counted nor stored outside of a command."""
+        local_metrics.count("queries")
+        local_metrics.stop()
+        assert local_metrics.store.stats(0) == []
+
+    def test_old_runs_are_dropped(self, local_metrics):
+        """Test that runs older than the retention are removed."""
+        local_metrics.start("list-emp")
+        local_metrics.samples[0].started_at -= 31 * 86400
+        local_metrics.stop()
+        local_metrics.start("list-emp")
+        local_metrics.stop()
+        [stats] = local_metrics.store.stats(0)
+        assert stats.runs == 1
@@ -0,0 +1,57 @@
+from datetime import date
+
+import pytest
+
+from epic_events_crm.partitioning import (
+    build_partitions,
+    next_period,
+    parse_partition_name,
+    period_start,
+    roll_forward_statement,
+)
+
+
+class TestPartitioning:
+    """Tests related to the events table partitions helpers."""
+
+    @pytest.mark.parametrize(
+        "granularity, expected_start, expected_next",
+        [
+            ("year", date(2026, 1, 1), date(2027, 1, 1)),
+            ("quarter", date(2026, 10, 1), date(2027, 1, 1)),
+        ],
+    )
+    def test_periods(self, granularity, expected_start, expected_next):
+        """Test that periods start and follow each other as expected."""
+        start = period_start(date(2026, 11, 19), granularity)
+        assert start == expected_start
+        assert next_period(start, granularity) == expected_next
+
+    def test_parse_partition_name(self):
+        """Test that partition names are parsed back to their period."""
+        assert parse_partition_name("p2026") == (date(2026, 1, 1), "year")
+        assert parse_partition_name("p2026q3") == (date(2026, 7, 1), "quarter")
+        assert parse_partition_name("pmax") is None
+
+    def test_build_partitions(self):
+        """Test that partitions are built from the first to the last period."""
+        partitions = build_partitions(date(2026, 5, 3), date(2026, 12, 31), "quarter")
+        assert partitions == [
+            ("p2026q2", date(2026, 7, 1)),
+            ("p2026q3", date(2026, 10, 1)),
+            ("p2026q4", date(2027, 1, 1)),
+        ]
+
+    def test_roll_forward_statement(self):
+        """Test that only missing partitions are added, before pmax."""
+        statement = roll_forward_statement(
+            ["p2025", "p2026", "pmax"], date(2026, 10, 19), 2, "quarter"
+        )
+        assert "REORGANIZE PARTITION pmax" in statement
+        assert "p2026" not in statement
+        assert "PARTITION p2027 VALUES LESS THAN (TO_DAYS('2028-01-01'))" in statement
+        assert "PARTITION p2028 " in statement
+        assert statement.index("p2028") < statement.index("pmax VALUES")
+        # nothing to add when partitions already exist far enough
+        statement = roll_forward_statement(["p2030", "pmax"], date(2026, 1, 1), 2, "year")
+        assert statement is None
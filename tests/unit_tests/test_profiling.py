@@ -0,0 +1,77 @@
+import os
+import pytest
+from typing import List
+from sqlalchemy import ForeignKey, create_engine, select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+from sqlalchemy.orm import relationship, selectinload
+
+from epic_events_crm.profiling import QueryProfiler, fingerprint, raise_on_lazy_loads
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Parent(Base):
+    __tablename__ = "parents"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    children: Mapped[List["Child"]] = relationship(back_populates="parent")
+
+
+class Child(Base):
+    __tablename__ = "children"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    parent_id: Mapped[int] = mapped_column(ForeignKey("parents.id"))
+    parent: Mapped[Parent] = relationship(back_populates="children")
+
+
+@pytest.fixture
+def sqlite_session():
+    """Return a session on an in-memory SQLite database with 5 parents."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    session.add_all([Parent(id=i, children=[Child(), Child()]) for i in range(5)])
+    session.commit()
+    session.expunge_all()
+    yield session
+    session.close()
+
+
+class TestProfiling:
+    """Tests related to the query profiler."""
+
+    def test_fingerprint(self):
+        """Test that values and IN lists do not change the fingerprint."""
+        first = fingerprint("SELECT a FROM t WHERE id IN (?, ?, ?) AND name = 'x'")
+        second = fingerprint("SELECT a\n FROM t WHERE id IN (%s) AND name = 'y z'")
+        assert first == second == "SELECT a FROM t WHERE id IN (?) AND name = ?"
+
+    def test_profiler_finds_n_plus_one(self, sqlite_session):
+        """Test that lazy loads in a loop are reported as repeated statements."""
+        profiler = QueryProfiler()
+        profiler.attach()
+        try:
+            for parent in sqlite_session.scalars(select(Parent)).all():
+                parent.children  # lazy load
+        finally:
+            profiler.detach()
+        assert profiler.count == 6
+        repeated = profiler.repeated()
+        assert len(repeated) == 1 and repeated[0].count == 5
+        # lazy loads are attributed to the line using the relationship
+        [caller] = repeated[0].callers
+        assert caller.startswith(os.path.join("tests", "unit_tests", "test_profiling"))
+
+    def test_raise_on_lazy_loads(self, sqlite_session):
+        """Test that only relationships loaded by an eager option can be used."""
+        raise_on_lazy_loads(sqlite_session)
+        parent = sqlite_session.scalars(
+            select(Parent).options(selectinload(Parent.children))
+        ).first()
+        assert len(parent.children) == 2
+        with pytest.raises(InvalidRequestError):
+            parent.children[0].parent
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from epic_events_crm.scheduling import BusyCalendar, schedule_support
+
+
+def dt(day: int, hour: int) -> datetime:
+    """Shortcut to build datetimes of a same month."""
+    return datetime(2028, 3, day, hour)
+
+
+class TestScheduling:
+    """Tests related to the automatic assignment of support people."""
+
+    def test_busy_calendar(self):
+        """Test that overlapping windows are detected, adjacent ones are not."""
+        calendar = BusyCalendar([(dt(2, 8), dt(2, 18)), (dt(1, 8), dt(2, 10))])
+        assert not calendar.is_free(dt(1, 20), dt(1, 22))
+        assert not calendar.is_free(dt(2, 17), dt(3, 8))
+        assert calendar.is_free(dt(2, 18), dt(3, 8))
+        assert calendar.is_free(dt(1, 0), dt(1, 8))
+        calendar.book(dt(3, 8), dt(3, 18))
+        assert not calendar.is_free(dt(3, 10), dt(3, 12))
+
+    def test_schedule_support_balances_load(self):
+        """Test that events go to the least loaded free support person."""
+        events = [(1, dt(5, 8), dt(5, 18)), (2, dt(6, 8), dt(6, 18))]
+        assignments = [(6, dt(1, 8), dt(1, 18))]
+        planning, unassigned = schedule_support(events, assignments, [6, 7])
+        assert planning == {1: 7, 2: 6}
+        assert unassigned == []
+
+    def test_schedule_support_avoids_overlaps(self):
+        """Test that no one gets overlapping events and leftovers are returned."""
+        events = [
+            (1, dt(5, 8), dt(5, 18)),
+            (2, dt(5, 10), dt(5, 12)),
+            (3, dt(5, 11), dt(5, 20)),
+        ]
+        assignments = [(7, dt(5, 0), dt(5, 9))]
+        planning, unassigned = schedule_support(events, assignments, [6, 7])
+        assert planning == {1: 6, 2: 7}
+        assert unassigned == [3]
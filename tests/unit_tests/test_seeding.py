@@ -0,0 +1,57 @@
+import random
+
+from epic_events_crm import seeding
+
+DEPARTMENT_IDS = {"Superuser": 1, "Management": 2, "Sales": 3, "Support": 4}
+
+
+def generate(seed):
+    """Return employees, clients, contracts and events rows for a seed."""
+    rng = random.Random(seed)
+    employees = seeding.employee_rows(rng, 30, 10, "hash", DEPARTMENT_IDS)
+    sales = [row["id"] for row in employees if row["department_id"] == 3]
+    support = [row["id"] for row in employees if row["department_id"] == 4]
+    clients = list(seeding.client_rows(rng, 100, 5, sales))
+    client_ids = [row["id"] for row in clients]
+    contracts = list(seeding.contract_rows(rng, 200, 7, client_ids, 150))
+    events = list(seeding.event_rows(rng, 150, 1, 7, support))
+    return employees, clients, contracts, events
+
+
+class TestSeeding:
+    """Tests related to the synthetic data generator."""
+
+    def test_same_seed_same_data(self):
+        """Test that the data only depends on the seed."""
+        assert generate(1) == generate(1)
+        assert generate(1) != generate(2)
+
+    def test_references_are_valid(self):
+        """Test that generated rows reference rows that make sense."""
+        employees, clients, contracts, events = generate(3)
+        departments = {row["id"]: row["department_id"] for row in employees}
+        assert all(departments[row["salesperson_id"]] == 3 for row in clients)
+        client_ids = {row["id"] for row in clients}
+        assert all(row["client_id"] in client_ids for row in contracts)
+        signed = {row["id"] for row in contracts if row["signed"]}
+        assert all(row["contract_id"] in signed for row in events)
+        assert len({row["contract_id"] for row in events}) == len(events)
+        assert all(
+            row["support_person_id"] is None
+            or departments[row["support_person_id"]] == 4
+            for row in events
+        )
+        assert all(0 <= row["due_amount"] <= row["total_amount"] for row in contracts)
+        assert all(row["start_datetime"] < row["end_datetime"] for row in events)
+
+    def test_unique_values(self):
+        """Test that values of unique columns are unique."""
+        employees, clients, _, _ = generate(4)
+        assert len({row["email"] for row in employees}) == len(employees)
+        assert len({row["email"] for row in clients}) == len(clients)
+        assert len({row["phone"] for row in clients}) == len(clients)
+
+    def test_batched(self):
+        """Test that rows are split in batches of at most the given size."""
+        batches = list(seeding.batched(({"id": i} for i in range(7)), 3))
+        assert [len(batch) for batch in batches] == [3, 3, 1]
@@ -0,0 +1,70 @@
+from sqlalchemy import create_engine, text
+
+from epic_events_crm.slowlog import SlowQueryLog, plan_summary, redact, summarize
+
+MYSQL_PLAN = {
+    "query_block": {
+        "select_id": 1,
+        "nested_loop": [
+            {"table": {"table_name": "contracts", "access_type": "ALL"}},
+            {
+                "table": {
+                    "table_name": "clients",
+                    "access_type": "eq_ref",
+                    "key": "PRIMARY",
+                    "rows_examined_per_scan": 1,
+                }
+            },
+        ],
+    }
+}
+
+
+class TestSlowlog:
+    """Tests related to the slow query log."""
+
+    def test_redact(self):
+        """Test that only the types of the parameters are kept."""
+        assert redact({"email": "a@b.c", "id": 4}) == {"email": "str", "id": "int"}
+        assert redact(("a@b.c", None)) == ["str", "NoneType"]
+
+    def test_plan_summary(self):
+        """Test that each table of a MySQL plan gets its access type and index."""
+        assert plan_summary(MYSQL_PLAN) == [
+            "contracts: ALL key=- rows=?",
+            "clients: eq_ref key=PRIMARY rows=1",
+        ]
+        assert plan_summary({"error": "denied"}) == ["EXPLAIN failed: denied"]
+        assert plan_summary(None) == []
+
+    def test_slow_statements_are_logged(self, tmp_path):
+        """Test that statements above the threshold are logged with their plan."""
+        log = SlowQueryLog(str(tmp_path / "slow.log"))
+        log.enabled, log.threshold = True, 0
+        engine = create_engine("sqlite://")
+        log.attach(engine)
+        with engine.connect() as connection:
+            connection.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, x)"))
+            for value in (1, 2):
+                statement = text("SELECT x FROM t WHERE id = :id")
+                connection.execute(statement, {"id": value})
+        entries = list(log.entries())
+        assert [entry["parameters"] for entry in entries[1:]] == [["int"], ["int"]]
+        assert entries[0]["plan"] is None  # CREATE cannot be explained
+        assert "USING INTEGER PRIMARY KEY" in entries[1]["plan"][0]
+        assert entries[1]["caller"].startswith("tests/unit_tests/test_slowlog.py:")
+
+        statements = summarize(entries, "")
+        assert sorted(len(stats.durations) for stats in statements) == [1, 2]
+        assert summarize(entries, "9999") == []
+
+    def test_fast_statements_are_not_logged(self, tmp_path):
+        """Test that nothing is written below the threshold."""
+        log = SlowQueryLog(str(tmp_path / "slow.log"))
+        log.enabled, log.threshold = True, 60
+        engine = create_engine("sqlite://")
+        log.attach(engine)
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        assert list(log.entries()) == []
+        assert not (tmp_path / "slow.log").exists()
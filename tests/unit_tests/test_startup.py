@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from epic_events_crm.startup import COLD_START_BUDGET, LAZY_MODULES
+from epic_events_crm.startup import measure, parse_import_times
+
+
+class TestStartup:
+    """Tests related to the cold start of eecrm."""
+
+    def test_parse_import_times(self):
+        """Test that each module gets its own import time."""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     rich._loop\n"
+            "import time:      3000 |       3120 |   rich.console\n"
+        )
+        assert parse_import_times(output) == {"rich._loop": 120, "rich.console": 3000}
+
+    def test_lazy_modules_not_imported(self):
+        """
+        Test that a new process imports eecrm and configures the mappers without
+        importing the modules only needed by some commands (from -X importtime).
+        """
+        env = {**os.environ, "EECRM_DB_URL": "sqlite://", "SENTRY_DSN": ""}
+        report = measure(env)
+        assert not [
+            module
+            for module in report.modules
+            for lazy_module in LAZY_MODULES
+            if module == lazy_module or module.startswith(f"{lazy_module}.")
+        ]
+
+    @pytest.mark.skipif(
+        not os.getenv("EECRM_TIMING_TESTS"),
+        reason="wall-clock timing, set EECRM_TIMING_TESTS=1 to run it",
+    )
+    def test_cold_start_budget(self):
+        """Test that the cold start of a new process is within the budget."""
+        env = {**os.environ, "EECRM_DB_URL": "sqlite://", "SENTRY_DSN": ""}
+        assert measure(env).cold_start < COLD_START_BUDGET
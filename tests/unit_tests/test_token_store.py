@@ -0,0 +1,39 @@
+import os
+import stat
+import time
+
+from epic_events_crm.token_store import TokenStore
+
+
+class TestTokenStore:
+    """Tests related to the token store of the current OS user."""
+
+    def test_save_and_load(self, tmp_path):
+        """Test that the token is stored in a file only readable by its user."""
+        store = TokenStore(str(tmp_path / "eecrm"))
+        assert store.load() is None
+        store.save("first_token")
+        store.save("second_token")
+        assert store.load() == "second_token"
+        token_path = tmp_path / "eecrm" / "token"
+        assert stat.S_IMODE(os.stat(token_path).st_mode) == 0o600
+        assert os.listdir(tmp_path / "eecrm") == ["token"]  # no temporary file left
+        store.clear()
+        assert store.load() is None
+
+    def test_claims(self, tmp_path):
+        """Test that verified claims are only returned for their token."""
+        claims = {"uid": 1, "exp": int(time.time()) + 60}
+        TokenStore(str(tmp_path)).set_claims("token", claims)
+        # a new store, as in the next command, reads them from the file
+        store = TokenStore(str(tmp_path))
+        assert store.get_claims("token") == claims
+        assert store.get_claims("another_token") is None
+        store.save("another_token")
+        assert TokenStore(str(tmp_path)).get_claims("token") is None
+
+    def test_expired_claims(self, tmp_path):
+        """Test that claims of an expired token are not returned."""
+        store = TokenStore(str(tmp_path))
+        store.set_claims("token", {"uid": 1, "exp": int(time.time()) - 1})
+        assert store.get_claims("token") is None
@@ -0,0 +1,56 @@
+import sentry_sdk
+
+from epic_events_crm import tracing
+
+
+class TestTracing:
+    """Tests related to the Sentry performance tracing."""
+
+    def test_disabled_tracing_adds_nothing(self, mocker):
+        """Test that functions and blocks are left as is without tracing."""
+        mocker.patch("epic_events_crm.tracing.ENABLED", False)
+        start_span = mocker.patch("sentry_sdk.start_span")
+
+        def func():
+            pass
+
+        assert tracing.traced("test")(func) is func
+        with tracing.span("test"):
+            pass
+        start_span.assert_not_called()
+
+    def test_init_sentry_without_dsn(self, mocker):
+        """Test that Sentry is not initialized without a DSN."""
+        mocker.patch("epic_events_crm.tracing.DSN", None)
+        init = mocker.patch("sentry_sdk.init")
+        tracing.init_sentry()
+        init.assert_not_called()
+
+    def test_command_transaction(self, mocker):
+        """Test that a command is a transaction with its spans as children."""
+        mocker.patch("epic_events_crm.tracing.ENABLED", True)
+        transactions = []
+
+        def keep(event, hint):
+            transactions.append(event)
+            return None  # nothing is sent
+
+        sentry_sdk.init(
+            dsn="https://key@sentry.invalid/1",
+            traces_sample_rate=1.0,
+            before_send_transaction=keep,
+            default_integrations=False,
+        )
+        try:
+            with tracing.command_transaction("eecrm list-clients"):
+                tracing.traced("db.repository")(lambda: None)()
+                with tracing.command_transaction("eecrm nested"):
+                    pass
+        finally:
+            sentry_sdk.init(dsn=None, default_integrations=False)
+        [transaction] = transactions
+        assert transaction["transaction"] == "eecrm list-clients"
+        assert [span["op"] for span in transaction["spans"]] == [
+            "db.repository",
+            "cli.command",
+        ]
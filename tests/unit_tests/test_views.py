@@ -0,0 +1,78 @@
+import datetime
+import io
+from types import SimpleNamespace
+
+from rich.console import Console
+
+from epic_events_crm.views import console as console_module
+from epic_events_crm.views.console import captured, write_text
+from epic_events_crm.views.events import EventView
+from epic_events_crm.views.plain import PlainTable
+
+
+def make_event(event_id, support_person=None):
+    return SimpleNamespace(
+        id=event_id,
+        name=f"Event name {event_id}",
+        start_datetime=datetime.datetime(2024, 6, 1, 10, 0),
+        end_datetime=datetime.datetime(2024, 6, 1, 18, 0),
+        address_line1="1 rue de la Paix",
+        postal_code="75002",
+        city="Paris",
+        country="France",
+        attendees_number=50,
+        contract_id=event_id,
+        support_person=support_person,
+        support_person_id=support_person and 5,
+    )
+
+
+class TestViews:
+    """Tests related to the plain renderer of long listings and the pager."""
+
+    def test_plain_table(self):
+        """Test that columns have their fixed width, longer values being cut."""
+        table = PlainTable("TITLE", (("ID", 3), ("Name", 5), ("Note", 4)))
+        lines = list(table.lines([(1, "Ann", None), (22, "Bernadette", "long note")]))
+        assert lines == [
+            "TITLE",
+            "ID   Name   Note",
+            "---  -----  ----",
+            "1    Ann    ",
+            "22   Berna  long",
+        ]
+
+    def test_long_listing_is_plain(self, monkeypatch):
+        """Test that listings above the threshold are not rich tables."""
+        monkeypatch.setattr("epic_events_crm.views.events.PLAIN_THRESHOLD", 2)
+        support_person = SimpleNamespace(fname="Pierre", lname="MERCEDES")
+        events = [make_event(1, support_person), make_event(2), make_event(3)]
+        with captured() as capture:
+            EventView().display_events(events, title="MY EVENTS")
+        lines = capture.get().splitlines()
+        assert lines[0] == "MY EVENTS"
+        assert len(lines) == 3 + len(events)
+        assert "1 rue de la Paix, 75002 Paris, France" in lines[3]
+        assert lines[3].endswith("Pierre MERCEDES (5)")
+        assert lines[4].startswith("2 ")
+
+        with captured() as capture:
+            EventView().display_events(events[:2])
+        assert "│" in capture.get() or "┃" in capture.get()
+
+    def test_pager(self, monkeypatch, tmp_path):
+        """Test that only text longer than the terminal goes through the pager."""
+        terminal = Console(file=io.StringIO(), force_terminal=True, height=5)
+        monkeypatch.setattr(console_module, "console", terminal)
+        paged = tmp_path / "paged.txt"
+        monkeypatch.setattr(console_module, "PAGER", f"sh -c 'cat > {paged}'")
+
+        write_text("short\n")
+        assert terminal.file.getvalue() == "short\n"
+        write_text("line\n" * 10)
+        assert paged.read_text() == "line\n" * 10
+        assert terminal.file.getvalue() == "short\n"
+
+        monkeypatch.setattr(console_module, "PAGER", "")
+        write_text("line\n" * 10)
+        assert terminal.file.getvalue().count("line") == 10